@@ -0,0 +1,38 @@
+"""
+Benchmark rendering AniList results into embeds, as done by the anime, manga and ln commands.
+
+Compares rendering from scratch with `make_embed` against the cog's embed cache,
+using the sample media payloads in `data/anilist_media.json`.
+
+    python benchmarks/anilist_embed.py
+"""
+import json
+from pathlib import Path
+from timeit import Timer
+
+from cardinal.cache import ResponseCache
+from cardinal.cogs.anilist import Anilist, make_embed
+
+SAMPLES = Path(__file__).parent / "data" / "anilist_media.json"
+NUMBER = 2000
+
+
+def run(name, render, items):
+    # Best of several repeats, to filter out noise
+    timer = Timer(lambda: [render(item) for item in items])
+    best = min(timer.repeat(repeat=5, number=NUMBER // len(items)))
+    per_call = best / (NUMBER // len(items) * len(items))
+    print(f"{name}: {per_call * 1e6:.1f}us per embed")
+
+
+def main():
+    items = json.loads(SAMPLES.read_text())
+    cog = Anilist(None, ResponseCache())
+
+    print(f"{len(items)} sample payloads")
+    run("make_embed", make_embed, items)
+    run("cached", cog._render_embed, items)
+
+
+if __name__ == "__main__":
+    main()
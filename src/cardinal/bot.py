@@ -1,4 +1,5 @@
 import sys
+from collections import Counter
 from contextvars import ContextVar
 from logging import getLogger
 
@@ -15,6 +16,7 @@ from discord.ext.commands import (
     TooManyArguments,
     UserInputError,
 )
+from sqlalchemy.orm import Session
 
 from .errors import UserBlacklisted
 from .utils import clean_prefix, format_message
@@ -25,9 +27,25 @@ intents = Intents.default()
 intents.members = True
 
 
+def _per_event(counter):
+    return (({"event": event_name}, count) for event_name, count in counter.items())
+
+
 # TODO: Implement server-specific prefixes
 class Bot(BaseBot):
-    def __init__(self, *args, context_factory, default_game, scoped_session, **kwargs):
+    def __init__(
+        self,
+        *args,
+        context_factory,
+        default_game,
+        metrics,
+        query_profiler,
+        scoped_session,
+        http_session=None,
+        metrics_server=None,
+        response_cache=None,
+        **kwargs,
+    ):
         game = None
         if default_game:
             game = Game(name=default_game)
@@ -37,23 +55,94 @@ class Bot(BaseBot):
         )
 
         self._context_factory = context_factory
+        self._http_session = http_session
+        self._metrics = metrics
+        self._metrics_server = metrics_server
+        self._query_profiler = query_profiler
+        self._response_cache = response_cache
         self._session = scoped_session
         self._event_counter = (
             0  # Dummy variable to have unique keys for `event_context`
         )
+        # Per event name: how many were dispatched and how many of those opened a session
+        self.event_counts = Counter()
+        self.session_event_counts = Counter()
+
+        metrics.register(
+            "cardinal_events_total",
+            "counter",
+            lambda: _per_event(self.event_counts),
+            "Dispatched events per listener invocation.",
+        )
+        metrics.register(
+            "cardinal_events_with_session_total",
+            "counter",
+            lambda: _per_event(self.session_event_counts),
+            "Dispatched events that opened a database session.",
+        )
+        metrics.describe(
+            "cardinal_event_duration_seconds",
+            "Wall-clock time spent in event listeners.",
+        )
+        metrics.describe(
+            "cardinal_command_duration_seconds",
+            "Wall-clock time spent invoking commands, including checks.",
+        )
 
     # Override to hook into event processing to manage event context
-    async def _run_event(self, *args, **kwargs):
+    async def _run_event(self, coro, event_name, *args, **kwargs):
         # No need for copy_context because events run a new task anyway
         self._event_counter = (
             self._event_counter + 1
         ) % sys.maxsize  # Cheap af "unique" ID system
         event_context.set(self._event_counter)
+        self.event_counts[event_name] += 1
+        labels = {
+            "event": event_name,
+            # Bound methods, i.e. cog listeners, are qualified with their class name
+            "listener": getattr(coro, "__qualname__", event_name),
+        }
 
         try:
-            await super()._run_event(*args, **kwargs)
+            with self._metrics.time(
+                "cardinal_event_duration_seconds", **labels
+            ), self._query_profiler.track("event", self._event_counter, **labels):
+                await super()._run_event(coro, event_name, *args, **kwargs)
         finally:
-            self._session.remove()
+            # Sessions are only created on first use, so most events never have one
+            # Skip the teardown entirely for those
+            if self._session.registry.has():
+                self.session_event_counts[event_name] += 1
+                self._session.remove()
+
+    async def invoke(self, ctx):
+        if ctx.command is None:
+            await super().invoke(ctx)
+            return
+
+        command_name = ctx.command.qualified_name
+        with self._metrics.time(
+            "cardinal_command_duration_seconds", command=command_name
+        ), self._query_profiler.track("command", ctx.message.id, command=command_name):
+            await super().invoke(ctx)
+
+    async def start(self, *args, **kwargs):
+        if self._metrics_server:
+            await self._metrics_server.start()
+
+        await super().start(*args, **kwargs)
+
+    async def close(self):
+        await super().close()
+
+        if self._metrics_server:
+            await self._metrics_server.stop()
+
+        if self._http_session:
+            await self._http_session.close()
+
+        if self._response_cache:
+            self._response_cache.close()
 
     async def on_ready(self):
         logger.info(f"Logged into Discord as {self.user}")
@@ -69,7 +158,7 @@ class Bot(BaseBot):
         # Needs to happen here instead of e.g. a command_completion handler
         # due to the latter having their own context, i.e. a different session.
         if not ctx.command_failed and ctx.session.registry.has():
-            ctx.session.commit()
+            await ctx.session.run_sync(Session.commit)
 
     async def on_command(self, ctx):
         logger.info(format_message(ctx.message))
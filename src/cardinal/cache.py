@@ -0,0 +1,298 @@
+import pickle
+import sqlite3
+from asyncio import get_event_loop
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Size-bounded mapping with least-recently-used eviction
+    and optional per-entry expiry.
+
+    All operations are guarded by a lock,
+    so instances can be shared between the event loop and executor threads.
+
+    Args:
+        maxsize (int): Maximum number of entries before the least recently used one is evicted.
+        ttl (typing.Optional[float]): Default lifetime of entries in seconds.
+            `None` keeps entries until they are evicted or removed.
+        clock (typing.Callable[[], float]): Monotonic time source, mainly for testing.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be strictly positive.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Look up a key, marking it as recently used.
+
+        Args:
+            key (typing.Hashable): Key to look up.
+            default: Value to return if the key is absent or expired.
+                Pass a sentinel to tell cached `None` values apart from misses.
+
+        Returns:
+            The cached value or `default`.
+        """
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Insert or replace an entry, evicting the least recently used one if full.
+
+        Args:
+            key (typing.Hashable): Key to store under.
+            value: Value to store.
+            ttl (typing.Optional[float]): Lifetime of this entry in seconds.
+                Defaults to the cache-wide lifetime.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else self._clock() + ttl
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Remove an entry.
+
+        Returns:
+            The removed value, regardless of expiry, or `default` if absent.
+        """
+        with self._lock:
+            try:
+                _, value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            return value
+
+    def discard_where(self, predicate):
+        """
+        Remove all entries whose key matches a predicate.
+
+        Args:
+            predicate (typing.Callable[[typing.Hashable], bool]): Predicate to test keys with.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _is_empty(value):
+    return not value
+
+
+class _SQLiteStore:
+    """
+    Persistent backing store for :class:`ResponseCache`.
+    Values are pickled, expiry times are wall-clock timestamps.
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time(),))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        expires_at, value = row
+        ttl = expires_at - time()
+        return (ttl, pickle.loads(value)) if ttl > 0 else None
+
+    def set(self, key, value, ttl):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, time() + ttl, pickle.dumps(value)),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CacheNamespace:
+    """
+    View of a :class:`ResponseCache` with its own lifetimes and counters,
+    usually one per cog. Create through :meth:`ResponseCache.namespace`.
+    """
+
+    def __init__(self, cache, name, ttl, negative_ttl, is_negative):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache = cache
+        self._is_negative = is_negative
+
+    async def fetch(self, key, fetch, *args, **kwargs):
+        """
+        Look up a response, awaiting `fetch(*args, **kwargs)` on a miss.
+        Exceptions raised by `fetch` propagate and are not cached.
+
+        Args:
+            key (typing.Hashable): Key identifying the request, e.g. its parameters.
+                Must have a stable `repr` if the cache is persistent.
+            fetch (typing.Callable[..., typing.Awaitable]): Function performing the request.
+            *args, **kwargs: Passed through to `fetch`.
+
+        Returns:
+            The cached or freshly fetched response.
+        """
+        value = await self._cache._get((self.name, key))
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await fetch(*args, **kwargs)
+        await self.set(key, value)
+        return value
+
+    async def set(self, key, value):
+        """
+        Store a response obtained by other means, e.g. as part of another response.
+
+        Args:
+            key (typing.Hashable): Key identifying the request, see :meth:`fetch`.
+            value: Response to store.
+        """
+        ttl = self.negative_ttl if self._is_negative(value) else self.ttl
+        if ttl:
+            await self._cache._set((self.name, key), value, ttl)
+
+
+class ResponseCache:
+    """
+    Size-bounded cache for responses of remote APIs, shared by all lookup cogs.
+
+    Entries live in memory and, if a path is given,
+    are also persisted to an SQLite database, so they survive restarts.
+    Disk access happens on the loop's default executor.
+
+    Args:
+        maxsize (int): Maximum number of entries kept in memory.
+        path (typing.Optional[str]): Path of the SQLite database to persist entries to.
+        loop (typing.Optional[asyncio.AbstractEventLoop]): Loop to schedule disk access from.
+    """
+
+    def __init__(self, maxsize=1024, path=None, loop=None):
+        self._memory = TTLCache(maxsize)
+        self._store = None if path is None else _SQLiteStore(path)
+        self._loop = loop
+        self._namespaces = {}
+
+    def namespace(self, name, ttl, negative_ttl=None, is_negative=_is_empty):
+        """
+        Get or create a namespace.
+
+        Args:
+            name (str): Unique name of the namespace, used as metric label.
+            ttl (float): Lifetime of responses in seconds.
+            negative_ttl (typing.Optional[float]): Lifetime of negative responses in seconds.
+                `None` or 0 disables caching them.
+            is_negative (typing.Callable[[typing.Any], bool]): Tells negative responses apart.
+                By default, all falsy responses, e.g. `None` or empty lists, are negative.
+
+        Returns:
+            CacheNamespace: The namespace.
+        """
+        try:
+            return self._namespaces[name]
+        except KeyError:
+            namespace = CacheNamespace(self, name, ttl, negative_ttl, is_negative)
+            self._namespaces[name] = namespace
+            return namespace
+
+    def collect(self, attr):
+        """
+        Yields:
+            tuple[dict, int]: Namespace label and value of a counter per namespace,
+            for use as a metrics collector.
+        """
+        for name, namespace in self._namespaces.items():
+            yield {"namespace": name}, getattr(namespace, attr)
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+
+    async def _get(self, key):
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING or self._store is None:
+            return value
+
+        entry = await self._run(self._store.get, repr(key))
+        if entry is None:
+            return _MISSING
+
+        ttl, value = entry
+        self._memory.set(key, value, ttl)
+        return value
+
+    async def _set(self, key, value, ttl):
+        self._memory.set(key, value, ttl)
+        if self._store is not None:
+            await self._run(self._store.set, repr(key), value, ttl)
+
+    async def _run(self, fn, *args):
+        loop = self._loop or get_event_loop()
+        return await loop.run_in_executor(None, fn, *args)
@@ -1,7 +1,6 @@
 from discord.ext.commands import check
 
 from .context import Context
-from .db import WhitelistedChannel
 from .errors import ChannelNotWhitelisted
 
 
@@ -10,6 +9,8 @@ def channel_whitelisted(exception_predicate=None):
     Decorator that marks a channel as required to be whitelisted by a previous command.
     Takes an optional predicate,
     that checks whether or not an exception should be made for the current context.
+    Lookups go through the in-memory whitelist index, which is only loaded from the database
+    if it has not been loaded yet or has been invalidated.
     Args:
         exception_predicate (typing.Callable): A predicate taking a context as its only argument,
         returning a boolean value.
@@ -18,11 +19,14 @@ def channel_whitelisted(exception_predicate=None):
         typing.Callable: Decorator to use on discord.py commands.
     """
 
-    def predicate(ctx: Context):
-        db_channel = ctx.session.query(WhitelistedChannel).get(ctx.channel.id)
+    async def predicate(ctx: Context):
+        whitelist = ctx.whitelist
+        if not whitelist.loaded:
+            await ctx.session.run_sync(whitelist.load)
 
         if not (
-            db_channel or (callable(exception_predicate) and exception_predicate(ctx))
+            ctx.channel.id in whitelist
+            or (callable(exception_predicate) and exception_predicate(ctx))
         ):
             raise ChannelNotWhitelisted(ctx)
 
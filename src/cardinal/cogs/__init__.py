@@ -42,13 +42,13 @@ class CogsContainer(DeclarativeContainer):
     # Accessing a Configuration through a DependenciesContainer does not work, so do it manually
     config = Configuration("config.cogs")
 
-    anilist = Singleton(Anilist, http=root.http)
+    anilist = Singleton(Anilist, http=root.http, response_cache=root.response_cache)
 
-    botadmin = Singleton(BotAdmin, http=root.http)
+    botadmin = Singleton(BotAdmin, http=root.http, metrics=root.metrics)
 
-    channels = Singleton(Channels)
+    channels = Singleton(Channels, role_counts=root.role_counts)
 
-    jisho = Singleton(Jisho, http=root.http)
+    jisho = Singleton(Jisho, http=root.http, response_cache=root.response_cache)
 
     moderation = Singleton(Moderation)
 
@@ -56,27 +56,47 @@ class CogsContainer(DeclarativeContainer):
         Mute,
         bot=root.bot,
         loop=root.loop,
+        guild_config=root.guild_config,
         scoped_session=root.scoped_session,
         sessionmaker=root.sessionmaker,
+        metrics=root.metrics,
+        catch_up_concurrency=config.mute.catch_up_concurrency,
+        catch_up_rate=config.mute.catch_up_rate,
     )
 
     newbie = Singleton(
         Newbies,
         bot=root.bot,
         loop=root.loop,
+        guild_config=root.guild_config,
         scoped_session=root.scoped_session,
         sessionmaker=root.sessionmaker,
+        metrics=root.metrics,
     )
 
-    notifications = Singleton(Notifications, scoped_session=root.scoped_session)
+    notifications = Singleton(
+        Notifications,
+        loop=root.loop,
+        guild_config=root.guild_config,
+        scoped_session=root.scoped_session,
+        burst_window=config.notifications.burst_window,
+        burst_threshold=config.notifications.burst_threshold,
+    )
 
-    roles = Singleton(Roles)
+    roles = Singleton(Roles, role_counts=root.role_counts)
 
-    saucenao = Singleton(SauceNAO, http=root.http, api_key=config.saucenao.api_key)
+    saucenao = Singleton(
+        SauceNAO,
+        http=root.http,
+        api_key=config.saucenao.api_key,
+        response_cache=root.response_cache,
+    )
 
     stop = Singleton(Stop)
 
-    whitelist = Singleton(Whitelisting)
+    whitelist = Singleton(
+        Whitelisting, scoped_session=root.scoped_session, whitelist=root.whitelist
+    )
 
 
 def load_cogs(root):
@@ -1,14 +1,29 @@
+import json
+from asyncio import get_event_loop, shield, sleep
 from calendar import month_name
+from copy import deepcopy
 from datetime import datetime
+from logging import getLogger
+from time import monotonic
 
 from aiohttp import ClientResponseError, ClientSession
 from discord import Embed
 from discord.ext.commands import Cog, command
 from markdownify import markdownify as md
 
+from ..cache import ResponseCache, TTLCache
 from ..utils import maybe_send
 
+logger = getLogger(__name__)
+
 ANILIST_GRAPHQL_URL = "https://graphql.anilist.co"
+BATCH_DELAY = 0.01  # Seconds to wait for more searches to batch with
+# Aliased fields per query, bounded by AniList's query complexity limit
+MAX_BATCH_SIZE = 10
+RATE_LIMIT = 90  # Requests per minute, until AniList tells otherwise
+RATE_LIMIT_RESERVE = 10  # Remaining requests below which requests are paced
+RATE_LIMIT_RETRIES = 2
+EMBED_CACHE_SIZE = 256  # Rendered embeds of the most recently looked up titles
 FORMAT_REPR = {
     "TV": "TV",
     "TV_SHORT": "TV Short",
@@ -21,33 +36,10 @@ FORMAT_REPR = {
     "NOVEL": "Light Novel",
     "ONE_SHOT": "One Shot",
 }
-QUERY = """
-query(
-    $isAnime: Boolean!,
-    $format: [MediaFormat],
-    $search: String!
-) {
-    anime: Media(
-        type: ANIME,
-        search: $search,
-        sort: SEARCH_MATCH
-    ) @include(if: $isAnime) {
-        ...baseFields
-        ...animeFields
-    }
-
-    manga: Media(
-        type: MANGA,
-        format_in: $format,
-        search: $search,
-        sort: SEARCH_MATCH
-    ) @skip(if: $isAnime) {
-        ...baseFields
-        ...mangaFields
-    }
-}
-
+# Fields of a result, shared by all aliased fields of a batched query
+FRAGMENTS = """
 fragment baseFields on Media {
+    id
     title { english romaji }
     coverImage { large }
     meanScore
@@ -77,6 +69,200 @@ fragment mangaFields on Media {
 """
 
 
+def _build_query(requests):
+    """
+    Combine requests into one GraphQL query, with one aliased field per request.
+
+    Args:
+        requests (list[tuple]): Either `("search", search, is_anime, formats)`
+            or `("id", media_id, is_anime)`.
+
+    Returns:
+        tuple[str, dict]: Query document and variables.
+            The result of the i-th request is found under alias "q{i}".
+    """
+    params = []
+    fields = []
+    variables = {}
+
+    for i, request in enumerate(requests):
+        if request[0] == "search":
+            _, search, is_anime, formats = request
+            params.append(f"$search{i}: String!")
+            variables[f"search{i}"] = search
+            if is_anime:
+                args = f"type: ANIME, search: $search{i}, sort: SEARCH_MATCH"
+            else:
+                params.append(f"$format{i}: [MediaFormat]")
+                variables[f"format{i}"] = list(formats)
+                args = (
+                    f"type: MANGA, format_in: $format{i}, "
+                    f"search: $search{i}, sort: SEARCH_MATCH"
+                )
+        else:
+            _, media_id, is_anime = request
+            params.append(f"$id{i}: Int!")
+            variables[f"id{i}"] = media_id
+            args = f"id: $id{i}"
+
+        fragment = "animeFields" if is_anime else "mangaFields"
+        fields.append(f"    q{i}: Media({args}) {{ ...baseFields ...{fragment} }}")
+
+    query = "query({}) {{\n{}\n}}\n{}".format(
+        ", ".join(params), "\n".join(fields), FRAGMENTS
+    )
+    return query, variables
+
+
+class AnilistClient:
+    """
+    AniList client that batches concurrent lookups into as few requests as possible.
+
+    Identical lookups in flight share one request.
+    Distinct lookups made within `batch_delay` seconds of each other are sent
+    as one query with an aliased field each.
+    Requests are paced once AniList's X-RateLimit-Remaining header runs low,
+    and results are cached both by search and by media ID.
+
+    Args:
+        http (aiohttp.ClientSession): Session to send requests with.
+        response_cache (cardinal.cache.ResponseCache): Cache to store results in.
+        batch_delay (float): Seconds to wait for more lookups before sending.
+        max_batch_size (int): Maximum number of lookups per request.
+    """
+
+    def __init__(
+        self,
+        http,
+        response_cache,
+        batch_delay=BATCH_DELAY,
+        max_batch_size=MAX_BATCH_SIZE,
+    ):
+        self._http = http
+        # Series data changes rarely, no results might be due to a new entry
+        self._searches = response_cache.namespace(
+            "anilist", ttl=6 * 3600, negative_ttl=600
+        )
+        self._media = response_cache.namespace("anilist_media", ttl=6 * 3600)
+        self._batch_delay = batch_delay
+        self._max_batch_size = max_batch_size
+        self._in_flight = {}  # Request -> future of its result
+        self._queued = []  # Requests waiting for the next batch
+        self._send_handle = None
+        self._limit = RATE_LIMIT
+        self._remaining = None
+        self._not_before = 0.0  # Monotonic time the next request may be sent at
+
+    async def search(self, search, is_anime, formats=()):
+        """
+        Look up the best match for a search term.
+
+        Args:
+            search (str): Term to search for.
+            is_anime (bool): Whether to search for anime or manga.
+            formats (typing.Iterable[str]): Manga formats to limit the search to.
+
+        Returns:
+            typing.Optional[dict]: Data of the matching media or `None` if nothing was found.
+        """
+        key = (search, is_anime, tuple(formats))
+        media_id = await self._searches.fetch(key, self._search, key)
+        if media_id is None:
+            return None
+
+        return await self._media.fetch(
+            media_id, self._request, ("id", media_id, is_anime)
+        )
+
+    async def _search(self, key):
+        media = await self._request(("search", *key))
+        if media is None:
+            return None
+
+        # Later lookups by ID, e.g. through other search terms, are hits
+        await self._media.set(media["id"], media)
+        return media["id"]
+
+    async def _request(self, request):
+        future = self._in_flight.get(request)
+        if future is None:
+            loop = get_event_loop()
+            future = self._in_flight[request] = loop.create_future()
+            self._queued.append(request)
+
+            if len(self._queued) >= self._max_batch_size:
+                self._send_queued()
+            elif self._send_handle is None:
+                self._send_handle = loop.call_later(
+                    self._batch_delay, self._send_queued
+                )
+
+        # A cancelled caller must not cancel the request for others waiting on it
+        return await shield(future)
+
+    def _send_queued(self):
+        if self._send_handle is not None:
+            self._send_handle.cancel()
+            self._send_handle = None
+
+        requests, self._queued = self._queued, []
+        get_event_loop().create_task(self._send_batch(requests))
+
+    async def _send_batch(self, requests):
+        try:
+            results = await self._post(requests)
+        except Exception as e:
+            for request in requests:
+                self._in_flight.pop(request).set_exception(e)
+        else:
+            for request, result in zip(requests, results):
+                self._in_flight.pop(request).set_result(result)
+
+    async def _post(self, requests):
+        query, variables = _build_query(requests)
+        body = {"query": query, "variables": variables}
+
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await self._pace()
+            async with self._http.post(
+                ANILIST_GRAPHQL_URL, json=body, raise_for_status=False
+            ) as resp:
+                self._update_rate_limit(resp)
+                if resp.status == 429 and attempt < RATE_LIMIT_RETRIES:
+                    continue
+
+                # AniList responds with 404 if a field has no match, the others still have data
+                if resp.status != 404:
+                    resp.raise_for_status()
+
+                data = (await resp.json()).get("data") or {}
+                logger.debug(f"Sent {len(requests)} lookup(s) in one request.")
+                return [data.get(f"q{i}") for i in range(len(requests))]
+
+    async def _pace(self):
+        now = monotonic()
+        delay = self._not_before - now
+        if self._remaining is not None and self._remaining <= RATE_LIMIT_RESERVE:
+            # Close to the limit, space requests out to the sustained rate
+            self._not_before = max(self._not_before, now) + 60 / self._limit
+
+        if delay > 0:
+            await sleep(delay)
+
+    def _update_rate_limit(self, resp):
+        headers = resp.headers
+        if "X-RateLimit-Limit" in headers:
+            self._limit = int(headers["X-RateLimit-Limit"])
+
+        if "X-RateLimit-Remaining" in headers:
+            self._remaining = int(headers["X-RateLimit-Remaining"])
+
+        if resp.status == 429:
+            retry_after = float(headers.get("Retry-After", 60))
+            logger.warning(f"Rate limited by AniList for {retry_after} seconds.")
+            self._not_before = monotonic() + retry_after
+
+
 class FuzzyDate:
     def __init__(self, **kwargs):
         self.year = kwargs.get("year")
@@ -197,32 +383,43 @@ def make_embed(item):
     return embed
 
 
+def _content_hash(item):
+    # Changes whenever AniList's data does, e.g. once the next episode aired
+    return hash(json.dumps(item, sort_keys=True))
+
+
 class Anilist(Cog):
     """
     Anilist lookup commands.
     """
 
-    def __init__(self, http: ClientSession):
-        self._http = http
+    def __init__(self, http: ClientSession, response_cache: ResponseCache):
+        self._client = AnilistClient(http, response_cache)
+        # (media ID, content hash) -> embed dict
+        self._embeds = TTLCache(EMBED_CACHE_SIZE)
 
-    async def _execute_graphql(self, **variables):
-        body = {"query": QUERY, "variables": variables}
+    def _render_embed(self, item):
+        """
+        Like :func:`make_embed`, but reuses embeds rendered from identical data.
 
-        async with self._http.post(ANILIST_GRAPHQL_URL, json=body) as resp:
-            res_body = await resp.json()
+        Returns:
+            discord.Embed: Embed for the item, owned by the caller.
+        """
+        key = (item["id"], _content_hash(item))
+        data = self._embeds.get(key)
+        if data is None:
+            data = make_embed(item).to_dict()
+            self._embeds.set(key, data)
 
-        return res_body["data"]
+        # Embeds share the dicts they are created from
+        return Embed.from_dict(deepcopy(data))
 
     async def _lookup_series(self, ctx, search: str, is_anime: bool, *formats: str):
         async with ctx.typing():
             try:
-                data = await self._execute_graphql(
-                    isAnime=is_anime, format=list(formats), search=search
-                )
+                media = await self._client.search(search, is_anime, formats)
             except ClientResponseError as e:
-                if e.status == 404:
-                    await maybe_send(ctx, "No results found.")
-                elif e.status >= 500:
+                if e.status >= 500:
                     await maybe_send(
                         ctx,
                         "Got an error from AniList. "
@@ -233,7 +430,11 @@ class Anilist(Cog):
 
                 return
 
-        await ctx.send(embed=make_embed(data["anime" if is_anime else "manga"]))
+        if media is None:
+            await maybe_send(ctx, "No results found.")
+            return
+
+        await ctx.send(embed=self._render_embed(media))
 
     @command(aliases=["ani", "al", "anilist"])
     async def anime(self, ctx, *, search: str):
@@ -10,8 +10,9 @@ class BotAdmin(Cog):
     Bot administration commands for the owner.
     """
 
-    def __init__(self, http: ClientSession):
+    def __init__(self, http: ClientSession, metrics):
         self._http = http
+        self._metrics = metrics
 
     @command(aliases=["makeinvite", "getinvite", "invitelink"])
     @is_owner()
@@ -99,6 +100,104 @@ class BotAdmin(Cog):
         activity = Activity(type=activity_type, name=text)
         await ctx.bot.change_presence(activity=activity)
 
+    @command()
+    @is_owner()
+    async def dbusage(self, ctx):
+        """
+        Show how many dispatched events needed a database session,
+        broken down by the most frequent events.
+
+        Required permissions:
+            - Bot owner
+        """
+        event_counts = ctx.bot.event_counts
+        session_event_counts = ctx.bot.session_event_counts
+
+        total = sum(event_counts.values())
+        with_session = sum(session_event_counts.values())
+        lines = "\n".join(
+            f"{event_name}: {session_event_counts[event_name]}/{count}"
+            for event_name, count in event_counts.most_common(20)
+        )
+        await maybe_send(
+            ctx,
+            f"{with_session} of {total} events used the database.\n```\n{lines}\n```",
+        )
+
+    @command(aliases=["latencies"])
+    @is_owner()
+    async def timings(self, ctx, kind: str = "events"):
+        """
+        Show where the bot spends its time, slowest in total first.
+
+        Required permissions:
+            - Bot owner
+
+        Parameters:
+            - [optional] kind: Either "events" for per-listener timings
+            or "commands" for per-command timings. Defaults to "events".
+        """
+        if kind == "events":
+            metric, label = "cardinal_event_duration_seconds", "listener"
+        elif kind == "commands":
+            metric, label = "cardinal_command_duration_seconds", "command"
+        else:
+            await maybe_send(ctx, f'"{kind}" is not a valid kind of timing.')
+            return
+
+        by_total = sorted(
+            self._metrics.histograms(metric).items(),
+            key=lambda item: item[1].sum,
+            reverse=True,
+        )
+        lines = "\n".join(
+            f"{dict(labels)[label]}: n={histogram.count}, "
+            f"mean={histogram.mean * 1000:.1f}ms, "
+            f"p95<={histogram.quantile(0.95) * 1000:.0f}ms, "
+            f"total={histogram.sum:.1f}s"
+            for labels, histogram in by_total[:15]
+        )
+        await maybe_send(ctx, f"```\n{lines or 'No data yet.'}\n```")
+
+    @command()
+    @is_owner()
+    async def queries(self, ctx, kind: str = "commands"):
+        """
+        Show how many SQL statements are executed per invocation,
+        most statements per invocation first.
+
+        Required permissions:
+            - Bot owner
+
+        Parameters:
+            - [optional] kind: Either "commands" for per-command statistics
+            or "events" for per-listener statistics. Defaults to "commands".
+        """
+        if kind == "commands":
+            scope, label = "command", "command"
+        elif kind == "events":
+            scope, label = "event", "listener"
+        else:
+            await maybe_send(ctx, f'"{kind}" is not a valid kind of statistic.')
+            return
+
+        counts = self._metrics.histograms(f"cardinal_{scope}_queries")
+        durations = self._metrics.histograms(f"cardinal_{scope}_db_seconds")
+        by_mean = sorted(counts.items(), key=lambda item: item[1].mean, reverse=True)
+
+        lines = []
+        for labels, histogram in by_mean[:15]:
+            db_time = durations[labels].sum if labels in durations else 0.0
+            lines.append(
+                f"{dict(labels)[label]}: n={histogram.count}, "
+                f"queries/inv={histogram.mean:.1f}, "
+                f"p95<={histogram.quantile(0.95):.0f}, "
+                f"db/inv={db_time / histogram.count * 1000:.1f}ms"
+            )
+
+        lines = "\n".join(lines)
+        await maybe_send(ctx, f"```\n{lines or 'No data yet.'}\n```")
+
     @command(aliases=["kill"])
     @is_owner()
     async def shutdown(self, ctx):
@@ -18,6 +18,9 @@ logger = getLogger(__name__)
 
 
 class Channels(Cog):
+    def __init__(self, role_counts):
+        self._role_counts = role_counts
+
     @group("channel", aliases=["channels"])
     @guild_only()
     @bot_has_permissions(manage_roles=True)
@@ -134,8 +137,7 @@ class Channels(Cog):
             None, (ctx.guild.get_role(db_channel.role_id) for db_channel in q)
         )
         role_dict = {
-            role: sum(1 for member in ctx.guild.members if role in member.roles)
-            for role in role_iter
+            role: self._role_counts.count(ctx.guild, role.id) for role in role_iter
         }
 
         em = Embed(title=f"Channel stats for {ctx.guild}", color=0x38CBF0)
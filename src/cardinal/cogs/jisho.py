@@ -3,6 +3,7 @@ from urllib.parse import quote_plus
 from aiohttp import ClientSession
 from discord.ext.commands import Cog, command
 
+from ..cache import ResponseCache
 from ..utils import maybe_send
 
 JISHO_API_URL = "https://jisho.org/api/v1/search/words"
@@ -67,8 +68,11 @@ class Jisho(Cog):
     a Japanese-English dictionary.
     """
 
-    def __init__(self, http: ClientSession):
+    def __init__(self, http: ClientSession, response_cache: ResponseCache):
         self._http = http
+        self._cache = response_cache.namespace(
+            "jisho", ttl=24 * 3600, negative_ttl=3600
+        )
 
     async def _lookup_term(self, term):
         """
@@ -80,6 +84,9 @@ class Jisho(Cog):
         Returns:
             typing.List[dict]: Results returned by the API.
         """
+        return await self._cache.fetch(term, self._fetch_term, term)
+
+    async def _fetch_term(self, term):
         query_params = {"keyword": quote_plus(term)}
 
         async with self._http.get(JISHO_API_URL, params=query_params) as resp:
@@ -1,11 +1,18 @@
-from asyncio import gather, sleep
-from collections import defaultdict
+from asyncio import sleep, wait
 from contextlib import closing, contextmanager
 from datetime import datetime, timedelta
 from itertools import chain
 from logging import getLogger
 
-from discord import Colour, Forbidden, HTTPException, Member, PermissionOverwrite, Role
+from discord import (
+    AllowedMentions,
+    Colour,
+    Forbidden,
+    HTTPException,
+    Member,
+    PermissionOverwrite,
+    Role,
+)
 from discord.ext.commands import (
     Cog,
     bot_has_permissions,
@@ -14,15 +21,43 @@ from discord.ext.commands import (
     guild_only,
     has_permissions,
 )
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    MetaData,
+    Table,
+    and_,
+    exists,
+    literal,
+    select,
+)
+from sqlalchemy.orm import Session, joinedload
 
 from ..db import MuteGuild, MuteUser
-from ..utils import maybe_send
+from ..scheduler import DeadlineScheduler, TaskRegistry
+from ..throttle import BulkProgress, RateLimiter, run_bulk
+from ..utils import clean_prefix, has_role, maybe_send
 
 logger = getLogger(__name__)
 # Overwrite to use for new channels
 new_channel_overwrite = PermissionOverwrite(
     add_reactions=False, send_messages=False, speak=False
 )
+# Limits for setting overwrites on all channels of a guild,
+# well below the global rate limit so other requests still get through
+OVERWRITE_CONCURRENCY = 4
+OVERWRITE_RATE = 10  # Per second
+# Scratch table to diff role members against stored mutes, private to a connection
+_role_members = Table(
+    "mute_sync_role_members",
+    MetaData(),
+    Column("user_id", BigInteger, primary_key=True, autoincrement=False),
+    prefixes=["TEMPORARY"],
+)
+SYNC_CHUNK_SIZE = 5000
+# Defaults for unmuting members whose mute ran out during downtime
+CATCH_UP_CONCURRENCY = 2
+CATCH_UP_RATE = 2  # Per second
 units = {
     "s": 1,
     "sec": 1,
@@ -87,16 +122,80 @@ def _to_timedelta(arg):
     return timedelta(seconds=value)
 
 
+async def _apply_overwrites(guild, mute_role):
+    """
+    Set the mute overwrite for a role on all channels of a guild that lack it.
+
+    Channels that already have the overwrite are skipped,
+    so running this again after a partial failure resumes where it left off.
+
+    Args:
+        guild (discord.Guild): Guild to process.
+        mute_role (discord.Role): Role to set the overwrite for.
+
+    Returns:
+        cardinal.throttle.BulkProgress: Number of updated and failed channels and throughput.
+    """
+    progress = BulkProgress()
+    # Shared between both passes, so the combined request rate stays bounded
+    limiter = RateLimiter(OVERWRITE_RATE)
+
+    def pending(channels):
+        return [
+            channel
+            for channel in channels
+            if channel.overwrites_for(mute_role) != new_channel_overwrite
+        ]
+
+    async def apply(channel):
+        await channel.set_permissions(
+            mute_role, overwrite=new_channel_overwrite, reason="Setting up mute role."
+        )
+
+    # Process all categories before touching specific channels
+    # Makes use of permission sync
+    await run_bulk(
+        apply,
+        pending(guild.categories),
+        concurrency=OVERWRITE_CONCURRENCY,
+        limiter=limiter,
+        progress=progress,
+    )
+
+    # Process channels unaffected by sync
+    # Note: Individual channel objects aren't updated with the new overwrites
+    # Only the channel lists on the guild object are updated
+    await run_bulk(
+        apply,
+        pending(chain(guild.text_channels, guild.voice_channels)),
+        concurrency=OVERWRITE_CONCURRENCY,
+        limiter=limiter,
+        progress=progress,
+    )
+
+    logger.info(f"Set mute role overwrites for guild {guild} ({guild.id}): {progress}.")
+    for channel, e in progress.errors:
+        logger.warning(
+            f"Setting mute role overwrite for channel {channel} ({channel.id}) failed: {e}"
+        )
+
+    return progress
+
+
 async def _init_role(ctx, db_guild=None):
     """
     Create a mute role and register it with the database.
 
+    The role is kept even if setting its overwrites fails for some channels,
+    as :func:`_apply_overwrites` can resume the setup later.
+
     Args:
         ctx (cardinal.context.Context): Context to create the role in.
         db_guild (cardinal.db.MuteGuild): Database binding for the guild if one exists.
 
     Returns:
-        discord.Role: Newly created role with permissions already set.
+        tuple[discord.Role, cardinal.throttle.BulkProgress]: Newly created role
+        and the progress of setting its overwrites.
     """
     mute_role = await ctx.guild.create_role(
         name="Muted", colour=Colour.red(), hoist=True, reason="Initialising mute role."
@@ -106,26 +205,6 @@ async def _init_role(ctx, db_guild=None):
         # Position mute role directly below own top role
         new_position = ctx.me.top_role.position - 1
         await mute_role.edit(position=new_position)
-
-        # Process all categories before touching specific channels
-        # Makes use of permission sync
-        await gather(
-            *(
-                category.set_permissions(mute_role, overwrite=new_channel_overwrite)
-                for category in ctx.guild.categories
-            )
-        )
-
-        # Process channels unaffected by sync
-        # Note: Individual channel objects aren't updated with the new overwrites
-        # Only the channel lists on the guild object are updated
-        await gather(
-            *(
-                channel.set_permissions(mute_role, overwrite=new_channel_overwrite)
-                for channel in chain(ctx.guild.text_channels, ctx.guild.voice_channels)
-                if channel.overwrites_for(mute_role) != new_channel_overwrite
-            )
-        )
     except HTTPException as e:
         logger.exception(
             "Setting up mute role for guild {} failed due to HTTP error {}.".format(
@@ -144,33 +223,18 @@ async def _init_role(ctx, db_guild=None):
         ctx.session.add(db_guild)
 
     ctx.session.commit()  # Ensure database entry is created/updated even if later calls fail
-    return mute_role
+    return mute_role, await _apply_overwrites(ctx.guild, mute_role)
 
 
-async def _unmute_member(
-    member, mute_role, channel=None, *, delay_until=None, delay_delta=None
-):
+async def _unmute_member(member, mute_role, channel=None):
     """
-    Unmute a given member, optionally after a given delay.
+    Unmute a given member whose mute ran out.
 
     Args:
         member (discord.Member): Member to unmute.
         mute_role (discord.Role): Role to remove.
         channel (discord.TextChannel): Channel to send the auto-unmute message in.
-        delay_until (datetime): Delay execution until a given timestamp passes.
-        delay_delta (timedelta): Delay execution for a given timespan.
     """
-    delay_seconds = 0
-
-    if delay_until:
-        delay_delta = delay_delta or (delay_until - datetime.utcnow())
-
-    if delay_delta:
-        delay_seconds = delay_delta.total_seconds()
-
-    if delay_seconds > 0:
-        await sleep(delay_seconds)
-
     try:
         await member.remove_roles(mute_role, reason="Mute duration ran out.")
     except Forbidden:
@@ -208,92 +272,286 @@ def _make_lock_key(member: Member):
     return member_id, guild_id
 
 
-def _process_guild(bot, db_guild):
-    guild = bot.get_guild(db_guild.guild_id)
-    if not guild:
-        return
+def _get_mute_user(session, user_id, guild_id):
+    return (
+        session.query(MuteUser)
+        .options(joinedload(MuteUser.guild))
+        .get((user_id, guild_id))
+    )
 
-    mute_role = guild.get_role(db_guild.role_id)
-    if not mute_role:
-        return
 
-    for db_mute in db_guild.mutes:
-        member = guild.get_member(db_mute.user_id)
-        if not member:
-            continue
+def _delete_mute_guild_by_role(session, role_id):
+    # Use Query.delete() to prevent redundant SELECT
+    # Role ID is indexed so delete is faster than querying by guild ID and comparing
+    session.query(MuteGuild).filter_by(role_id=role_id).delete(
+        synchronize_session=False
+    )
+    session.commit()
 
-        yield _unmute_member(
-            member,
-            mute_role,
-            guild.get_channel(db_mute.channel_id),
-            delay_until=db_mute.muted_until,
+
+def _sync_mute_users(session, guild_id, member_ids, chunk_size=SYNC_CHUNK_SIZE):
+    """
+    Make the stored mutes of a guild match a given set of members.
+
+    The members are loaded into a temporary table in chunks,
+    so the diff runs as two set-based statements regardless of their number.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session to run in. Not committed.
+        guild_id (int): Snowflake ID of the guild.
+        member_ids (typing.Sequence[int]): Snowflake IDs of all members that should be muted.
+        chunk_size (int): Number of rows per insert into the temporary table.
+
+    Returns:
+        tuple[int, int]: Number of added and deleted mutes.
+    """
+    session.flush()  # The guild row might be pending
+    conn = session.connection()
+    mute_users = MuteUser.__table__
+    members = _role_members.c
+
+    # No cleanup on errors, rolling back discards the table
+    _role_members.create(conn)
+    for i in range(0, len(member_ids), chunk_size):
+        conn.execute(
+            _role_members.insert(),
+            [{"user_id": user_id} for user_id in member_ids[i : i + chunk_size]],
         )
 
+    deleted = conn.execute(
+        mute_users.delete().where(
+            and_(
+                mute_users.c.guild_id == guild_id,
+                mute_users.c.user_id.notin_(select(members.user_id)),
+            )
+        )
+    ).rowcount
+
+    missing = select(members.user_id, literal(guild_id, BigInteger)).where(
+        ~exists().where(
+            and_(
+                mute_users.c.guild_id == guild_id,
+                mute_users.c.user_id == members.user_id,
+            )
+        )
+    )
+    added = conn.execute(
+        mute_users.insert().from_select(["user_id", "guild_id"], missing)
+    ).rowcount
+
+    _role_members.drop(conn)
+    return added, deleted
+
+
+def _get_timed_mutes(session):
+    return (
+        session.query(MuteUser.guild_id, MuteUser.user_id, MuteUser.muted_until)
+        .filter(MuteUser.muted_until.isnot(None))
+        .all()
+    )
+
+
+def _delete_mute_user(session, db_mute):
+    session.delete(db_mute)
+    session.commit()
+
 
 class Mute(Cog):
     """
     Mute utility commands.
     """
 
-    def __init__(self, bot, loop, scoped_session, sessionmaker, check_period=30):
+    def __init__(
+        self,
+        bot,
+        loop,
+        guild_config,
+        scoped_session,
+        sessionmaker,
+        metrics,
+        reconcile_period=600,
+        catch_up_concurrency=None,
+        catch_up_rate=None,
+    ):
+        self._bot = bot
+        self._loop = loop
+        self._guild_config = guild_config
         self._session = scoped_session
         self._sessionmaker = sessionmaker
-        self._check_period = check_period
-        self._locks = defaultdict(lambda: 0)
-        loop.create_task(self._check_mute_timeouts(bot))
+        self._reconcile_period = reconcile_period
+        # Lock counts of locked members only, so lookups never add entries
+        self._locks = {}
+        # Deadlines of timed mutes, keyed by (guild ID, user ID)
+        self._scheduler = DeadlineScheduler(self._on_mute_expired, loop)
+        # Unmutes in progress, same keys
+        self._unmute_tasks = TaskRegistry(loop)
+        # Mutes that ran out while the bot was offline are drained separately
+        self._catch_up_concurrency = catch_up_concurrency or CATCH_UP_CONCURRENCY
+        self._catch_up_limiter = RateLimiter(catch_up_rate or CATCH_UP_RATE)
+        self._catch_up = BulkProgress()  # Of the latest pass
+        self._caught_up = {"done": 0, "failed": 0}  # Of previous passes
+        guild_config.register(MuteGuild)
+        metrics.register(
+            "cardinal_mute_locked_members",
+            "gauge",
+            lambda: [({}, len(self._locks))],
+            "Members currently locked against mute detection.",
+        )
+        metrics.register(
+            "cardinal_mute_catch_up_remaining",
+            "gauge",
+            lambda: [({}, self._catch_up.remaining)],
+            "Overdue unmutes waiting to be processed.",
+        )
+        metrics.register(
+            "cardinal_mute_catch_up_total",
+            "counter",
+            lambda: [
+                ({"status": "done"}, self._caught_up["done"] + self._catch_up.done),
+                (
+                    {"status": "failed"},
+                    self._caught_up["failed"] + self._catch_up.failed,
+                ),
+            ],
+            "Processed overdue unmutes.",
+        )
+        loop.create_task(self._reconcile_mutes())
 
     @contextmanager
     def _lock_member(self, member):
         key = _make_lock_key(member)
 
-        self._locks[key] += 1
+        self._locks[key] = self._locks.get(key, 0) + 1
         try:
             yield
         finally:
-            self._locks[key] -= 1
-            assert self._locks[key] >= 0  # Leave this in until I know this works
-
-            if self._locks[key] == 0:
+            remaining = self._locks[key] - 1
+            if remaining:
+                self._locks[key] = remaining
+            else:
                 del self._locks[key]  # Expunge unused keys to reduce memory usage
 
     def _member_is_locked(self, member):
-        key = _make_lock_key(member)
-        return self._locks[key] > 0
+        return _make_lock_key(member) in self._locks
+
+    async def _reconcile_mutes(self):
+        """
+        Load the deadlines of all timed mutes once ready
+        and periodically re-sync them with the database afterwards,
+        as a safety net for changes made behind the bot's back.
 
-    def _get_unmutes(self, session):
-        # Query for mutes that run before the next iteration
-        # No need to delete by hand, self.on_guild_member_update() will clean up
-        next_iteration_timestamp = datetime.utcnow() + timedelta(
-            seconds=self._check_period
+        Entries for deleted rows are left alone, as expiry re-checks the row anyway.
+        """
+        await self._bot.wait_until_ready()
+
+        while True:
+            try:
+                await self._reconcile_once()
+            except Exception:
+                # Keep the safety net up, the next pass may well succeed
+                logger.exception("Failed to reconcile timed mutes.")
+
+            await sleep(self._reconcile_period)
+
+    async def _reconcile_once(self):
+        with closing(self._sessionmaker()) as session:
+            timed_mutes = await self._session.run_in_executor(_get_timed_mutes, session)
+
+        now = datetime.utcnow()
+        overdue = []
+        for guild_id, user_id, muted_until in timed_mutes:
+            key = (guild_id, user_id)
+            if muted_until > now:
+                self._scheduler.schedule(key, muted_until)
+            else:
+                self._scheduler.cancel(key)
+                overdue.append(key)
+
+        logger.debug(f"{len(self._scheduler)} timed mute(s) pending.")
+        if overdue:
+            await self._catch_up_unmutes(overdue)
+
+    async def _catch_up_unmutes(self, keys):
+        """
+        Unmute members whose mute ran out while the bot was offline.
+
+        After downtime, there can be hundreds of these at once,
+        so they are paced and run with bounded concurrency.
+        Mutes running out live skip this and are handled right away.
+        """
+        logger.info(f"Catching up on {len(keys)} overdue unmute(s).")
+        self._caught_up["done"] += self._catch_up.done
+        self._caught_up["failed"] += self._catch_up.failed
+        self._catch_up = BulkProgress()
+
+        async def unmute(key):
+            # Joins the live unmute if one is already running for the member
+            task = self._unmute_tasks.start(key, self._expire_mute(*key))
+            # Awaiting the task directly would also cancel the whole catch-up
+            # when a moderator unmutes or re-mutes the member in the meantime
+            await wait({task})
+            if not task.cancelled():
+                task.result()  # Let failures count towards the progress
+
+        await run_bulk(
+            unmute,
+            keys,
+            concurrency=self._catch_up_concurrency,
+            limiter=self._catch_up_limiter,
+            progress=self._catch_up,
         )
-        q = (
-            session.query(MuteGuild)
-            .join(MuteGuild.mutes)
-            .filter(
-                MuteUser.muted_until.isnot(None),
-                next_iteration_timestamp >= MuteUser.muted_until,
+        logger.info(f"Caught up on overdue unmutes: {self._catch_up}.")
+
+    def _on_mute_expired(self, key):
+        # Never run two unmutes for the same member at once
+        self._unmute_tasks.start(key, self._expire_mute(*key))
+
+    def _cancel_unmute(self, guild_id, user_id):
+        """
+        Drop the pending deadline and any unmute in progress for a member.
+
+        Returns:
+            bool: Whether an unmute was pending.
+        """
+        key = (guild_id, user_id)
+        scheduled = self._scheduler.cancel(key)
+        running = self._unmute_tasks.cancel(key)
+        return scheduled or running
+
+    async def _expire_mute(self, guild_id, user_id):
+        with closing(self._sessionmaker()) as session:
+            # Re-check the row, the deadline may be outdated
+            db_mute = await self._session.run_in_executor(
+                _get_mute_user, session, user_id, guild_id
             )
-        )
+            if not db_mute or not db_mute.muted_until:
+                return
 
-        return q
+            if db_mute.muted_until > datetime.utcnow():
+                self._scheduler.schedule((guild_id, user_id), db_mute.muted_until)
+                return
 
-    async def _check_mute_timeouts(self, bot):
-        await bot.wait_until_ready()
+            guild = self._bot.get_guild(guild_id)
+            if not guild:
+                return  # Unavailable, retried on the next reconciliation
 
-        while True:
-            with closing(self._sessionmaker()) as session:
-                db_guilds = self._get_unmutes(session)
-                await gather(
-                    *chain.from_iterable(
-                        _process_guild(bot, db_guild) for db_guild in db_guilds
-                    )
-                )
+            member = guild.get_member(user_id)
+            mute_role = guild.get_role(db_mute.guild.role_id)
+            if not (member and mute_role and mute_role in member.roles):
+                # Nobody to unmute, so the row would only linger
+                await self._session.run_in_executor(_delete_mute_user, session, db_mute)
+                return
 
-            await sleep(self._check_period)
+            channel = guild.get_channel(db_mute.channel_id)
+
+        # Member update handler deletes the row once the role is gone
+        await _unmute_member(member, mute_role, channel)
 
     @Cog.listener()
     async def on_guild_channel_create(self, channel):
-        db_guild = self._session.query(MuteGuild).get(channel.guild.id)
+        db_guild = await self._guild_config.fetch(
+            self._session, MuteGuild, channel.guild.id
+        )
         if not db_guild:
             return
 
@@ -306,20 +564,20 @@ class Mute(Cog):
     @Cog.listener()
     async def on_guild_role_delete(self, role):
         # Delete any bindings if the corresponding role is deleted
-        # Use Query.delete() to prevent redundant SELECT
-        # Role ID is indexed so delete is faster than querying by guild ID and comparing
-        self._session.query(MuteGuild).filter_by(role_id=role.id).delete(
-            synchronize_session=False
-        )
-        self._session.commit()
+        await self._session.run_sync(_delete_mute_guild_by_role, role.id)
 
     @Cog.listener()
     async def on_member_join(self, member):
-        db_mute = self._session.query(MuteUser).get((member.id, member.guild.id))
+        db_mute = await self._session.run_sync(
+            _get_mute_user, member.id, member.guild.id
+        )
+
+        if not db_mute:
+            return
 
         # Do not re-mute if mute should have run out already
-        # Leave cleanup to self.check_mute_timeouts()
-        if not db_mute or db_mute.muted_until <= datetime.utcnow():
+        # Leave cleanup to the expiry of the mute
+        if db_mute.muted_until and db_mute.muted_until <= datetime.utcnow():
             return
 
         role = member.guild.get_role(db_mute.guild.role_id)
@@ -334,31 +592,34 @@ class Mute(Cog):
         if self._member_is_locked(before):
             return  # Don't touch locked members
 
-        db_guild = self._session.query(MuteGuild).get(before.guild.id)
+        # Served from cache for all but the first update per guild and TTL
+        db_guild = await self._guild_config.fetch(
+            self._session, MuteGuild, before.guild.id
+        )
         if not db_guild:
             return
 
-        mute_role = before.guild.get_role(db_guild.role_id)
-        if not mute_role:
+        # Most updates do not touch the mute role, so bail before hitting the DB
+        was_muted = has_role(before, db_guild.role_id)
+        is_muted = has_role(after, db_guild.role_id)
+        if was_muted == is_muted:
             return
 
-        roles_before = set(before.roles)
-        roles_after = set(after.roles)
-
-        mute_removed = mute_role in (roles_before - roles_after)
-        mute_added = mute_role in (roles_after - roles_before)
-
-        db_mute = self._session.query(MuteUser).get((before.id, before.guild.id))
+        db_mute = await self._session.run_sync(
+            _get_mute_user, before.id, before.guild.id
+        )
 
-        if mute_removed and db_mute:
+        if was_muted and db_mute:
             self._session.delete(db_mute)
-
-        # Check if binding exists already to prevent double create
-        if mute_added and not db_mute:
+            self._scheduler.cancel((before.guild.id, before.id))
+        elif is_muted and not db_mute:
+            # Check if binding exists already to prevent double create
             db_mute = MuteUser(user_id=before.id, guild_id=before.guild.id)
             self._session.add(db_mute)
+        else:
+            return  # Rows already match
 
-        self._session.commit()
+        await self._session.run_sync(Session.commit)
 
     # Ensure this is neither parsed nor called for anything but the mute command itself
     @group(invoke_without_command=True, aliases=["gag"])
@@ -368,7 +629,7 @@ class Mute(Cog):
     async def mute(self, ctx, member: Member, *, duration: _to_timedelta = None):
         """
         Mute a user from chat, optionally specifying an automatic timeout.
-        Does nothing if the user is already muted.
+        If the user is already muted, the new duration replaces the old one.
 
         Arguments:
              - member: Member to mute.
@@ -392,35 +653,124 @@ class Mute(Cog):
 
         if not mute_role:
             # No role => create new and save to DB
-            mute_role = await _init_role(ctx, db_guild)
-
-        if mute_role in member.roles:  # Mute role already there, nothing to do here
-            return
+            mute_role, progress = await _init_role(ctx, db_guild)
+            if progress.failed:
+                await maybe_send(
+                    ctx,
+                    f"Could not set up the mute role for {progress.failed} channel(s). "
+                    f"Run `{clean_prefix(ctx)}mute setup` to retry.",
+                )
 
         # Add mute to DB prior to role assigment, member update handler triggers otherwise
-        is_short_mute = duration and duration.total_seconds() <= self._check_period
-        if not is_short_mute:
+        # Reuse the row of an existing mute to replace its duration
+        db_mute = ctx.session.query(MuteUser).get((member.id, ctx.guild.id))
+        if not db_mute:
             db_mute = MuteUser(user_id=member.id, guild_id=ctx.guild.id)
-            if duration:
-                db_mute.muted_until = datetime.utcnow() + duration
-                db_mute.channel_id = ctx.channel.id
-
             ctx.session.add(db_mute)
 
+        db_mute.muted_until = datetime.utcnow() + duration if duration else None
+        db_mute.channel_id = ctx.channel.id if duration else None
+
+        # Forget the old duration
+        self._cancel_unmute(ctx.guild.id, member.id)
+        already_muted = mute_role in member.roles
+
         with self._lock_member(member):  # Lock member until command terminates
-            await member.add_roles(mute_role, reason=f"Muted by {ctx.author}.")
+            if not already_muted:
+                await member.add_roles(mute_role, reason=f"Muted by {ctx.author}.")
+
+            # Commit before scheduling, expiry reads the row from its own session
+            ctx.session.commit()
+            if duration:
+                self._scheduler.schedule((ctx.guild.id, member.id), db_mute.muted_until)
 
             # TODO: Include duration in message
-            await maybe_send(
-                ctx, f"User {member.mention} was muted by {ctx.author.mention}."
+            if already_muted:
+                await maybe_send(
+                    ctx,
+                    f"Mute of user {member.mention} was updated by {ctx.author.mention}.",
+                )
+            else:
+                await maybe_send(
+                    ctx, f"User {member.mention} was muted by {ctx.author.mention}."
+                )
+
+    @mute.command(aliases=["list"])
+    @guild_only()
+    @has_permissions(manage_roles=True)
+    async def pending(self, ctx):
+        """
+        List the timed mutes on this server, soonest to run out first.
+
+        Required context: Server
+
+        Required permissions:
+            - Manage Roles
+        """
+        now = datetime.utcnow()
+        pending = [
+            (user_id, deadline)
+            for (guild_id, user_id), deadline in self._scheduler.items()
+            if guild_id == ctx.guild.id
+        ]
+        running = sum(
+            1 for guild_id, _ in self._unmute_tasks.keys() if guild_id == ctx.guild.id
+        )
+
+        lines = [
+            f"<@{user_id}>: runs out in "
+            f"{timedelta(seconds=max(int((deadline - now).total_seconds()), 0))}"
+            for user_id, deadline in pending[:20]
+        ]
+        if len(pending) > 20:
+            lines.append(f"... and {len(pending) - 20} more.")
+
+        if running:
+            lines.append(f"{running} unmute(s) in progress.")
+
+        if self._catch_up.remaining:
+            lines.append(
+                f"Catching up on overdue unmutes across all servers: {self._catch_up}."
             )
 
-            # User should be muted for less than one check period
-            # => queue unmute directly and don't touch DB from here
-            if is_short_mute:
-                await _unmute_member(
-                    member, mute_role, ctx.channel, delay_delta=duration
-                )
+        await maybe_send(
+            ctx,
+            "\n".join(lines) or "No timed mutes pending.",
+            allowed_mentions=AllowedMentions.none(),
+        )
+
+    @mute.command()
+    @guild_only()
+    @has_permissions(manage_roles=True)
+    @bot_has_permissions(manage_roles=True)
+    async def setup(self, ctx):
+        """
+        Set the mute role's permissions on all channels that lack them,
+        e.g. to finish setting up the role after an error.
+
+        Required context: Server
+
+        Required permissions:
+            - Manage Roles
+
+        Required bot permissions:
+            - Manage Roles
+        """
+
+        db_guild = ctx.session.query(MuteGuild).get(ctx.guild.id)
+        mute_role = db_guild and ctx.guild.get_role(db_guild.role_id)
+        if not mute_role:
+            await maybe_send(ctx, "No mute role is set up on this server.")
+            return
+
+        async with ctx.typing():
+            progress = await _apply_overwrites(ctx.guild, mute_role)
+
+        await maybe_send(
+            ctx,
+            f"Updated {progress.done} channel(s) at {progress.rate:.1f} per second, "
+            f"{progress.failed} failed.",
+        )
 
     @mute.command()
     @guild_only()
@@ -453,30 +803,20 @@ class Mute(Cog):
             db_guild = MuteGuild(guild_id=ctx.guild.id, role_id=role.id)
             ctx.session.add(db_guild)
 
-        # Remove usages of old role from DB
-        role_member_ids = {member.id for member in role.members}  # Set for later use
-        ctx.session.query(MuteUser).filter(
-            MuteUser.guild_id == ctx.guild.id,
-            MuteUser.user_id.notin_(
-                list(role_member_ids)
-            ),  # Make list because SQLAlchemy wants one
-        ).delete(synchronize_session=False)
-
-        # Query remaining mutes
-        existing_db_mute_ids = {
-            db_mute.user_id
-            for db_mute in ctx.session.query(MuteUser).filter_by(guild_id=ctx.guild.id)
-        }
-        # Make set with members that need to be added to DB
-        new_mute_member_ids = role_member_ids - existing_db_mute_ids
-        ctx.session.add_all(
-            MuteUser(user_id=member_id, guild_id=ctx.guild.id)
-            for member_id in new_mute_member_ids
+        # Mark exactly the members with the new role as muted
+        role_member_ids = [member.id for member in role.members]
+        added, deleted = await ctx.session.run_sync(
+            _sync_mute_users, ctx.guild.id, role_member_ids
+        )
+        logger.info(
+            f"Synced mutes for guild {ctx.guild} ({ctx.guild.id}) to role {role} ({role.id}): "
+            f"{added} added, {deleted} deleted."
         )
 
         await maybe_send(
+            ctx,
             f"Set mute role for {ctx.guild} to {role}. "
-            "It is your responsibility to ensure permissions are correct for existing channels."
+            "It is your responsibility to ensure permissions are correct for existing channels.",
         )
 
     @command()
@@ -506,6 +846,7 @@ class Mute(Cog):
             return
 
         # No need to manually delete DB row, member update handler will
+        self._cancel_unmute(ctx.guild.id, member.id)
         await member.remove_roles(mute_role, reason=f"Explicit unmute by {ctx.author}.")
         await maybe_send(
             ctx, f"User {member.mention} was unmuted by {ctx.author.mention}."
@@ -1,11 +1,20 @@
 import re
-from asyncio import sleep
+from asyncio import Lock, sleep
+from collections import namedtuple
 from contextlib import closing
 from datetime import datetime, timedelta
 from functools import partial, wraps
 from logging import getLogger
 
-from discord import Forbidden, HTTPException, Member, Message, Permissions, TextChannel
+from discord import (
+    Forbidden,
+    HTTPException,
+    Member,
+    Message,
+    Object,
+    Permissions,
+    TextChannel,
+)
 from discord.abc import PrivateChannel
 from discord.ext.commands import (
     Cog,
@@ -16,17 +25,226 @@ from discord.ext.commands import (
     has_permissions,
 )
 from discord.utils import get
+from sqlalchemy import and_, bindparam, inspect, select, tuple_
+from sqlalchemy.orm import Session, joinedload
 
 from ..context import Context
-from ..db import NewbieChannel, NewbieGuild, NewbieUser
+from ..db import NewbieChannel, NewbieGuild, NewbieRoleJob, NewbieUser
 from ..errors import PromptTimeout
-from ..utils import clean_prefix, prompt
+from ..scheduler import TaskRegistry
+from ..throttle import BulkProgress, RateLimiter, run_bulk
+from ..utils import clean_prefix, has_role, prompt
 
 logger = getLogger(__name__)
 
 # Matches either a channel mention of the form "<#id>" or a raw ID.
 # The actual ID can be extracted from the 'id' group of the match object
 channel_re = re.compile(r"((<#)|^)(?P<id>\d+)(?(2)>|(\s|$))")
+# Limits for kicking users whose verification timed out
+KICK_CONCURRENCY = 4
+KICK_RATE = 5  # Per second
+# Limits for prompting members who joined while the bot was offline
+ONBOARDING_CONCURRENCY = 4
+ONBOARDING_DM_RATE = 2  # Per second, across all guilds
+ONBOARDING_BATCH_SIZE = 100
+# Limits for giving existing members the member role after enabling
+BACKFILL_CONCURRENCY = 4
+BACKFILL_RATE = 5  # Per second, across all guilds
+BACKFILL_BATCH_SIZE = 50  # Members per saved progress step
+
+# Column values of a pending user, as kept in the in-memory index
+PendingUser = namedtuple(
+    "PendingUser", ["guild_id", "user_id", "message_id", "joined_at", "expires_at"]
+)
+
+TOS_NOTICE = (
+    'Please note that by staying on "{0}", '
+    "you agree that this bot stores your user ID for identification purposes.\n"
+    "It shall be deleted once you confirm the above message or leave the server."
+)
+
+
+def _get_newbie_guild(session, guild_id):
+    return session.query(NewbieGuild).get(guild_id)
+
+
+def _get_newbie_user(session, user_id, guild_id):
+    return (
+        session.query(NewbieUser)
+        .options(joinedload(NewbieUser.guild))
+        .get((user_id, guild_id))
+    )
+
+
+def _get_newbie_guilds(session):
+    return session.query(NewbieGuild).all()
+
+
+def _get_pending_users(session, user_id):
+    return (
+        session.query(NewbieUser)
+        .options(joinedload(NewbieUser.guild))
+        .filter(NewbieUser.user_id == user_id)
+        .all()
+    )
+
+
+def _get_overdue_users(session):
+    # Get users who have passed the timeout, served by the index on expires_at
+    return (
+        session.query(NewbieUser.guild_id, NewbieUser.user_id)
+        .filter(NewbieUser.expires_at <= datetime.utcnow())
+        .all()
+    )
+
+
+def _delete_newbie_users(session, keys):
+    # Single statement for all processed users of a sweep
+    session.query(NewbieUser).filter(
+        tuple_(NewbieUser.guild_id, NewbieUser.user_id).in_(keys)
+    ).delete(synchronize_session=False)
+    session.commit()
+
+
+def _get_all_pending_users(session):
+    return session.query(
+        *(getattr(NewbieUser, field) for field in PendingUser._fields)
+    ).all()
+
+
+def _snapshot_pending(db_user):
+    return PendingUser(*(getattr(db_user, field) for field in PendingUser._fields))
+
+
+def _insert_newbie_users(session, rows):
+    """
+    Record many pending users at once.
+
+    Users recorded in the meantime, e.g. by joining while being onboarded, are skipped.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session to run in. Committed.
+        rows (list[dict]): Column values of the users to insert.
+    """
+    keys = [(row["guild_id"], row["user_id"]) for row in rows]
+    existing = {
+        tuple(row)
+        for row in session.query(NewbieUser.guild_id, NewbieUser.user_id).filter(
+            tuple_(NewbieUser.guild_id, NewbieUser.user_id).in_(keys)
+        )
+    }
+    rows = [row for key, row in zip(keys, rows) if key not in existing]
+    if rows:
+        session.execute(NewbieUser.__table__.insert(), rows)
+
+    session.commit()
+
+
+def _make_prompt(db_guild, member):
+    return (
+        f"{db_guild.welcome_message}\n"
+        "Please reply with the following message to be granted access to "
+        f'"{member.guild}".\n'
+        f"```{db_guild.response_message}```"
+    )
+
+
+def _make_newbie_row(db_guild, member, message):
+    # Use utcnow() instead of join time to treat members who got the message too late fairly
+    joined_at = datetime.utcnow()
+    return {
+        "guild_id": member.guild.id,
+        "user_id": member.id,
+        "message_id": message.id,
+        "joined_at": joined_at,
+        "expires_at": joined_at + db_guild.timeout if db_guild.timeout else None,
+    }
+
+
+def _set_timeout(session, guild_id, timeout):
+    """
+    Change the timeout of a guild and the expiry of its pending users.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session to run in. Not committed.
+        guild_id (int): Snowflake ID of the guild.
+        timeout (typing.Optional[datetime.timedelta]): New timeout, `None` to disable.
+    """
+    session.query(NewbieGuild).get(guild_id).timeout = timeout
+    _update_expiry(session, guild_id, timeout)
+
+
+def _update_expiry(session, guild_id, timeout):
+    """
+    Recompute the expiry of all pending users of a guild after its timeout changed.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session to run in. Not committed.
+        guild_id (int): Snowflake ID of the guild.
+        timeout (typing.Optional[datetime.timedelta]): New timeout, `None` if disabled.
+    """
+    users = NewbieUser.__table__
+    if timeout is None:
+        session.execute(
+            users.update().where(users.c.guild_id == guild_id).values(expires_at=None)
+        )
+        return
+
+    # Compute in Python, as interval arithmetic differs between databases
+    rows = session.execute(
+        select(users.c.user_id, users.c.joined_at).where(users.c.guild_id == guild_id)
+    ).all()
+    if not rows:
+        return
+
+    session.execute(
+        users.update()
+        .where(
+            and_(
+                users.c.guild_id == guild_id,
+                users.c.user_id == bindparam("b_user_id"),
+            )
+        )
+        .values(expires_at=bindparam("b_expires_at")),
+        [
+            {"b_user_id": user_id, "b_expires_at": joined_at + timeout}
+            for user_id, joined_at in rows
+        ],
+    )
+
+
+def _get_role_job(session, guild_id):
+    return session.query(NewbieRoleJob).get(guild_id)
+
+
+def _get_unfinished_role_jobs(session):
+    return (
+        session.query(NewbieRoleJob).filter(NewbieRoleJob.finished_at.is_(None)).all()
+    )
+
+
+def _update_role_job(session, guild_id, **values):
+    session.query(NewbieRoleJob).filter(NewbieRoleJob.guild_id == guild_id).update(
+        values, synchronize_session=False
+    )
+    session.commit()
+
+
+def _restricted_permissions(everyone_role):
+    # Newbies can only see the channels made visible to them
+    permissions = everyone_role.permissions
+    permissions.read_messages = False
+    permissions.send_messages = False
+    permissions.read_message_history = False
+    return permissions
+
+
+def _delete_newbie_user(session, user_id, guild_id):
+    # Use query instead of object deletion to prevent redundant SELECT query
+    session.query(NewbieUser).filter(
+        NewbieUser.user_id == user_id, NewbieUser.guild_id == guild_id
+    ).delete(synchronize_session=False)
+    session.commit()
 
 
 def newbie_enabled(func):
@@ -42,7 +260,9 @@ def newbie_enabled(func):
         # No try-catch necessary, context is always passed since rewrite
         ctx = next(i for i in args if isinstance(i, Context))
 
-        if not (ctx.guild and ctx.session.query(NewbieGuild).get(ctx.guild.id)):
+        if not (
+            ctx.guild and await ctx.session.run_sync(_get_newbie_guild, ctx.guild.id)
+        ):
             await ctx.send(
                 "Newbie roling is not enabled on this server. "
                 "Please enable it before using these commands."
@@ -59,77 +279,283 @@ def newbie_enabled(func):
 
 
 class Newbies(Cog):
-    def __init__(self, bot, loop, scoped_session, sessionmaker, check_period=60):
+    def __init__(
+        self,
+        bot,
+        loop,
+        guild_config,
+        scoped_session,
+        sessionmaker,
+        metrics,
+        check_period=60,
+    ):
         self.bot = bot
         self._check_period = check_period
+        self._guild_config = guild_config
         self._session = scoped_session
         self._sessionmaker = sessionmaker
+        self._kick_limiter = RateLimiter(KICK_RATE)
+        self._dm_limiter = RateLimiter(ONBOARDING_DM_RATE)
+        self._onboarding = TaskRegistry(loop)
+        self._onboarding_progress = BulkProgress()
+        # Prompted members waiting to be recorded, in the same shape as the index
+        self._unsaved = {}
+        self._flush_lock = Lock()
+        # user_id -> {guild_id: PendingUser}, filled on the first ready.
+        # Only used to filter events, the database stays authoritative.
+        self._pending = {}
+        self._pending_loaded = False
+        # Role backfills after enabling, by guild ID
+        self._role_jobs = {}  # Start time of unfinished jobs
+        self._role_job_tasks = TaskRegistry(loop)
+        self._role_job_progress = {}  # Of the current run
+        self._role_limiter = RateLimiter(BACKFILL_RATE)
+        self._backfilled = {"done": 0, "failed": 0}  # Of finished runs
+        guild_config.register(NewbieGuild)
+        metrics.register(
+            "cardinal_newbie_role_backfill_remaining",
+            "gauge",
+            lambda: [({}, sum(p.remaining for p in self._role_job_progress.values()))],
+            "Members still waiting for the member role after enabling.",
+        )
+        metrics.register(
+            "cardinal_newbie_role_backfill_total",
+            "counter",
+            lambda: [
+                ({"status": status}, self._backfilled_count(status))
+                for status in ("done", "failed")
+            ],
+            "Members processed by member role backfills.",
+        )
         loop.create_task(self.check_timeouts())
 
+    def _index_pending(self, pending_user):
+        guilds = self._pending.setdefault(pending_user.user_id, {})
+        guilds[pending_user.guild_id] = pending_user
+
+    def _unindex_pending(self, guild_id, user_id):
+        guilds = self._pending.get(user_id)
+        if guilds is None:
+            return
+
+        guilds.pop(guild_id, None)
+        if not guilds:
+            del self._pending[user_id]
+
+    def _is_pending(self, guild_id, user_id):
+        return guild_id in self._pending.get(user_id, ())
+
+    def _maybe_unsaved(self, user_id):
+        # Users of a running flush are neither unsaved nor indexed until it is done
+        return user_id in self._unsaved or self._flush_lock.locked()
+
+    async def _load_pending(self):
+        """Fill the pending index from the database."""
+        with closing(self._sessionmaker()) as session:
+            rows = await self._session.run_in_executor(_get_all_pending_users, session)
+
+        for row in rows:
+            pending_user = PendingUser(*row)
+            # Do not overwrite users recorded while loading
+            guilds = self._pending.setdefault(pending_user.user_id, {})
+            guilds.setdefault(pending_user.guild_id, pending_user)
+
+        self._pending_loaded = True
+        logger.info(f"Loaded {len(rows)} pending user(s).")
+
+    def _backfilled_count(self, status):
+        running = sum(
+            getattr(progress, status) for progress in self._role_job_progress.values()
+        )
+        return self._backfilled[status] + running
+
+    def _start_role_job(self, guild_id, started_at):
+        self._role_jobs[guild_id] = started_at
+        self._role_job_tasks.start(guild_id, self._run_role_job(guild_id))
+
+    def _covered_by_role_job(self, member):
+        # Members who joined after enabling are newbies and have to verify
+        started_at = self._role_jobs.get(member.guild.id)
+        return started_at is not None and (
+            member.joined_at is None or member.joined_at <= started_at
+        )
+
+    async def _resume_role_jobs(self):
+        with closing(self._sessionmaker()) as session:
+            jobs = await self._session.run_in_executor(
+                _get_unfinished_role_jobs, session
+            )
+            jobs = [(job.guild_id, job.started_at) for job in jobs]
+
+        for guild_id, started_at in jobs:
+            if guild_id not in self._role_job_tasks:
+                logger.info(f"Resuming member role backfill for guild {guild_id}.")
+                self._start_role_job(guild_id, started_at)
+
+    async def _run_role_job(self, guild_id):
+        """
+        Give all members who were there on enabling the member role.
+
+        Members are processed in ascending ID order in paced batches,
+        and progress is saved after every batch, so the job resumes after a restart.
+        Newbie restrictions only apply to @everyone once all members are done,
+        so nobody is locked out while waiting.
+        """
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            self._role_jobs.pop(guild_id, None)
+            return  # Retried on the next ready
+
+        with closing(self._sessionmaker()) as session:
+            job = await self._session.run_in_executor(_get_role_job, session, guild_id)
+            db_guild = await self._session.run_in_executor(
+                _get_newbie_guild, session, guild_id
+            )
+            if not (job and db_guild) or job.finished_at:
+                self._role_jobs.pop(guild_id, None)
+                return
+
+            role_id = db_guild.role_id
+            last_member_id, done, failed = job.last_member_id, job.done, job.failed
+
+        members = sorted(
+            (
+                member
+                for member in guild.members
+                if (last_member_id is None or member.id > last_member_id)
+                and not has_role(member, role_id)
+                and self._covered_by_role_job(member)
+            ),
+            key=lambda member: member.id,
+        )
+
+        async def add_role(member):
+            await member.add_roles(Object(role_id), reason="Enabled newbie roling.")
+
+        progress = self._role_job_progress[guild_id] = BulkProgress()
+        try:
+            for i in range(0, len(members), BACKFILL_BATCH_SIZE):
+                batch = members[i : i + BACKFILL_BATCH_SIZE]
+                await run_bulk(
+                    add_role,
+                    batch,
+                    concurrency=BACKFILL_CONCURRENCY,
+                    limiter=self._role_limiter,
+                    progress=progress,
+                )
+
+                with closing(self._sessionmaker()) as session:
+                    await self._session.run_in_executor(
+                        _update_role_job,
+                        session,
+                        guild_id,
+                        last_member_id=batch[-1].id,
+                        done=done + progress.done,
+                        failed=failed + progress.failed,
+                    )
+
+            try:
+                await guild.default_role.edit(
+                    permissions=_restricted_permissions(guild.default_role)
+                )
+            except HTTPException:
+                logger.exception(f"Failed to restrict @everyone on guild {guild}.")
+
+            with closing(self._sessionmaker()) as session:
+                await self._session.run_in_executor(
+                    _update_role_job, session, guild_id, finished_at=datetime.utcnow()
+                )
+
+            self._role_jobs.pop(guild_id, None)
+            logger.info(f"Finished member role backfill on guild {guild}: {progress}.")
+
+            for member, e in progress.errors:
+                logger.warning(f"Failed to give member role to {member}: {e}")
+        finally:
+            del self._role_job_progress[guild_id]
+            self._backfilled["done"] += progress.done
+            self._backfilled["failed"] += progress.failed
+
     async def check_timeouts(self):
         await self.bot.wait_until_ready()
         while True:
+            await self._kick_overdue_users()
+            await sleep(self._check_period)
+
+    async def _kick_overdue_users(self):
+        """
+        Kick all users whose verification timed out.
+
+        The database is only touched before and after kicking,
+        so no connection is held while waiting on Discord.
+        Users that could not be kicked are kept and retried on the next sweep.
+        """
+        with closing(self._sessionmaker()) as session:
+            overdue = await self._session.run_in_executor(_get_overdue_users, session)
+
+        processed = []
+        to_kick = []
+        for guild_id, user_id in overdue:
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+
+            member = guild.get_member(user_id)
+            if member:
+                to_kick.append(member)
+            else:
+                processed.append((guild_id, user_id))  # Already left
+
+        async def kick(member):
+            await member.kick(reason="Verification timed out.")
+            processed.append((member.guild.id, member.id))
+            logger.info(f"Kicked overdue user {member} from guild {member.guild}.")
+
+        if to_kick:
+            progress = await run_bulk(
+                kick, to_kick, concurrency=KICK_CONCURRENCY, limiter=self._kick_limiter
+            )
+            logger.info(f"Kicked overdue users: {progress}.")
+
+            for member, e in progress.errors:
+                logger.warning(
+                    f"Failed to kick user {member} from guild {member.guild}: {e}"
+                )
+
+        if processed:
             with closing(self._sessionmaker()) as session:
-                # Get users who have passed the timeout
-                # !IMPORTANT! Filter inequation must not be changed
-                # Changing it will break SQLite support (and possibly other DBMSs as well)
-                q = (
-                    session.query(NewbieUser)
-                    .join(NewbieUser.guild)
-                    .filter(
-                        datetime.utcnow() > NewbieGuild.timeout + NewbieUser.joined_at
-                    )
+                await self._session.run_in_executor(
+                    _delete_newbie_users, session, processed
                 )
 
-                for db_user in q:
-                    guild = self.bot.get_guild(db_user.guild_id)
-                    if not guild:
-                        continue
-
-                    member = guild.get_member(db_user.user_id)
-                    if not member:
-                        session.delete(db_user)
-                        continue
-
-                    try:
-                        await member.kick(reason="Verification timed out.")
-                        session.delete(db_user)
-                        logger.info(f"Kicked overdue user {member} from guild {guild}.")
-                    except Forbidden:
-                        logger.exception(
-                            f"Lacking permissions to kick user {member} from guild {guild}."
-                        )
-                    except HTTPException as e:
-                        logger.exception(
-                            f"Failed to kick user {member} from guild {guild} "
-                            f"due to HTTP error {e.response.status}."
-                        )
-
-                session.commit()
+            for guild_id, user_id in processed:
+                self._unindex_pending(guild_id, user_id)
 
-            await sleep(self._check_period)
+    async def add_member(self, db_guild, member: Member):
+        """
+        Prompt a member for verification and record them as pending.
 
-    async def add_member(self, db_guild: NewbieGuild, member: Member):
+        Args:
+            db_guild: Guild settings, either a :class:`cardinal.db.NewbieGuild`
+                or a snapshot of one from the guild config cache.
+            member (discord.Member): Member to prompt.
+        """
         # Bots are exempt from confirmation
         # This should also avoid the bot trying and failing to send messages to itself
         if member.bot and (member_role := member.guild.get_role(db_guild.role_id)):
             await member.add_roles(member_role)
             return
 
-        if self._session.query(NewbieUser).get((member.id, db_guild.guild_id)):
+        if self._pending_loaded:
+            if self._is_pending(db_guild.guild_id, member.id):
+                return
+        elif await self._session.run_sync(
+            _get_newbie_user, member.id, db_guild.guild_id
+        ):
             return  # Exit if user already in DB
 
-        message_content = db_guild.welcome_message
-
-        message_content += "\n"
-        message_content += (
-            f"Please reply with the following message to be granted access to "
-            f'"{member.guild}".\n'
-        )
-        message_content += f"```{db_guild.response_message}```"
-
         try:
-            message = await member.send(message_content)
+            message = await member.send(_make_prompt(db_guild, member))
         except Forbidden:
             logger.exception(
                 f"Cannot message user {member} and thus cannot prompt for verification."
@@ -141,50 +567,134 @@ class Newbies(Cog):
             )
             return
         else:
-            # Use utcnow() instead of join time to treat members who got the message too late fairly
-            db_user = NewbieUser(
-                guild_id=member.guild.id,
-                user_id=member.id,
-                message_id=message.id,
-                joined_at=datetime.utcnow(),
-            )
-            self._session.add(db_user)
-            self._session.commit()
+            row = _make_newbie_row(db_guild, member, message)
+            self._session.add(NewbieUser(**row))
+            await self._session.run_sync(Session.commit)
+            self._index_pending(PendingUser(**row))
             logger.info(
                 "Added new user {0} to database for guild {0.guild}.".format(member)
             )
 
             try:
                 # Necessary in compliance with Discord's latest ToS changes ¯\_(ツ)_/¯
-                await member.send(
-                    f'Please note that by staying on "{member.guild}", '
-                    "you agree that this bot stores your user ID for identification purposes.\n"
-                    "It shall be deleted once you confirm the above message or leave the server."
-                )
+                await member.send(TOS_NOTICE.format(member.guild))
             except HTTPException:
                 # First message went through, no need to further handle this, should it ever occur
                 pass
 
     @Cog.listener()
     async def on_ready(self):
-        for db_guild in self._session.query(NewbieGuild):
-            guild = self.bot.get_guild(db_guild.guild_id)
-            if not guild:
-                continue
+        if not self._pending_loaded:
+            await self._load_pending()
+
+        # Before onboarding, which leaves the members of these jobs alone
+        await self._resume_role_jobs()
+
+        # Runs in the background, as a large backlog takes hours at a safe DM rate.
+        # on_ready fires again on reconnects, so only one run is active at a time.
+        self._onboarding.start("onboarding", self._onboard_members())
+
+    async def _onboard_members(self):
+        """
+        Prompt all members who joined while the bot was offline.
 
-            member_role = guild.get_role(db_guild.role_id)
-            if not member_role:
+        Members are prompted with bounded concurrency, paced by one DM rate limit
+        shared across guilds, and recorded in batches.
+        Members already recorded are skipped, so an interrupted run resumes
+        where it stopped; at most one unsaved batch gets prompted again.
+        """
+        with closing(self._sessionmaker()) as session:
+            db_guilds = await self._session.run_in_executor(_get_newbie_guilds, session)
+            db_guilds = [
+                self._guild_config.snapshot(db_guild) for db_guild in db_guilds
+            ]
+
+        to_prompt = self._get_unprompted_members(db_guilds)
+        if not to_prompt:
+            return
+
+        logger.info(f"Onboarding {len(to_prompt)} member(s) who joined while offline.")
+
+        self._onboarding_progress = BulkProgress()
+        try:
+            await run_bulk(
+                self._onboard_member,
+                to_prompt,
+                concurrency=ONBOARDING_CONCURRENCY,
+                progress=self._onboarding_progress,
+            )
+        finally:
+            # Also save what was prompted before being cancelled
+            await self._flush_onboarded()
+
+        # Mostly members who do not accept DMs
+        logger.info(f"Onboarded members: {self._onboarding_progress}.")
+
+    def _get_unprompted_members(self, db_guilds):
+        """
+        Returns:
+            list[tuple]: Guild settings and member for every member to onboard.
+        """
+        to_prompt = []
+        for db_guild in db_guilds:
+            guild = self.bot.get_guild(db_guild.guild_id)
+            if not guild or not guild.get_role(db_guild.role_id):
                 continue
 
-            to_add = (
-                member for member in guild.members if member_role not in member.roles
+            to_prompt.extend(
+                (db_guild, member)
+                for member in guild.members
+                if not has_role(member, db_guild.role_id)
+                and not self._is_pending(guild.id, member.id)
+                and not self._covered_by_role_job(member)
             )
-            for member in to_add:
-                await self.add_member(db_guild, member)
+
+        return to_prompt
+
+    async def _onboard_member(self, item):
+        db_guild, member = item
+        if has_role(member, db_guild.role_id):
+            return  # Verified or roled manually in the meantime
+
+        if member.bot:
+            # Bots are exempt from confirmation
+            await member.add_roles(Object(db_guild.role_id))
+            return
+
+        await self._dm_limiter.acquire()
+        message = await member.send(_make_prompt(db_guild, member))
+        row = _make_newbie_row(db_guild, member, message)
+        self._unsaved.setdefault(member.id, {})[member.guild.id] = row
+        if len(self._unsaved) >= ONBOARDING_BATCH_SIZE:
+            await self._flush_onboarded()
+
+        await self._dm_limiter.acquire()
+        try:
+            # Necessary in compliance with Discord's latest ToS changes ¯\_(ツ)_/¯
+            await member.send(TOS_NOTICE.format(member.guild))
+        except HTTPException:
+            pass
+
+    async def _flush_onboarded(self):
+        """Record all prompted members and add them to the pending index."""
+        # Waiting for a running flush also guarantees its users are indexed afterwards
+        async with self._flush_lock:
+            rows = [row for guilds in self._unsaved.values() for row in guilds.values()]
+            self._unsaved.clear()
+            if not rows:
+                return
+
+            with closing(self._sessionmaker()) as session:
+                await self._session.run_in_executor(_insert_newbie_users, session, rows)
+
+            for row in rows:
+                self._index_pending(PendingUser(**row))
 
     @Cog.listener()
     async def on_member_join(self, member: Member):
-        db_guild = self._session.query(NewbieGuild).get(member.guild.id)
+        db_guild = await self._guild_config.fetch(
+            self._session, NewbieGuild, member.guild.id
+        )
 
         if db_guild is None:
             return
@@ -194,27 +704,36 @@ class Newbies(Cog):
     @Cog.listener()
     async def on_member_remove(self, member: Member):
         # Necessary in compliance with Discord's latest ToS changes ¯\_(ツ)_/¯
-        # Use query instead of object deletion to prevent redundant SELECT query
-        self._session.query(NewbieUser).filter(
-            NewbieUser.user_id == member.id, NewbieUser.guild_id == member.guild.id
-        ).delete(synchronize_session=False)
-        self._session.commit()
+        self._unsaved.get(member.id, {}).pop(member.guild.id, None)
+        self._unindex_pending(member.guild.id, member.id)
+        await self._session.run_sync(_delete_newbie_user, member.id, member.guild.id)
 
     @Cog.listener()
     async def on_member_update(self, before: Member, after: Member):
-        db_user = self._session.query(NewbieUser).get((before.id, before.guild.id))
-
-        if not db_user:
+        # Most updates are for members that are not pending, skip them without a query
+        unsaved = self._maybe_unsaved(before.id)
+        if (
+            self._pending_loaded
+            and not unsaved
+            and not self._is_pending(before.guild.id, before.id)
+        ):
             return
 
-        role = before.guild.get_role(db_user.guild.role_id)
-
-        if not role:
+        db_guild = await self._guild_config.fetch(
+            self._session, NewbieGuild, before.guild.id
+        )
+        if db_guild is None:
             return
 
-        if role not in before.roles and role in after.roles:
-            self._session.delete(db_user)
-            self._session.commit()
+        role_id = db_guild.role_id
+        if not has_role(before, role_id) and has_role(after, role_id):
+            if unsaved:
+                await self._flush_onboarded()  # Record first, so the row is deleted
+
+            self._unindex_pending(before.guild.id, before.id)
+            await self._session.run_sync(
+                _delete_newbie_user, before.id, before.guild.id
+            )
 
     @Cog.listener()
     async def on_message(self, msg: Message):
@@ -224,69 +743,90 @@ class Newbies(Cog):
         if not isinstance(msg.channel, PrivateChannel):
             return
 
-        # TODO: Clean up
-        for db_user in self._session.query(NewbieUser).filter(
-            NewbieUser.user_id == msg.author.id
-        ):
-            db_guild = db_user.guild
+        if not await self._may_be_pending(msg.author.id):
+            return  # Nearly all DMs, not worth a session
 
-            guild = self.bot.get_guild(db_user.guild_id)
-            if not guild:
-                continue
+        db_users = await self._session.run_sync(_get_pending_users, msg.author.id)
+        for db_user in db_users:
+            await self._handle_reply(msg, db_user)
 
-            member = guild.get_member(msg.author.id)
-            if not member:
-                self._session.delete(db_user)  # Delete row if user already left
-                continue
+        await self._commit_and_reindex(msg.author.id, db_users)
 
-            if db_guild.timeout:
-                # Use utcnow because discord.py's join timestamps are in UTC
-                joined_interval = datetime.utcnow() - db_user.joined_at
-                if joined_interval >= db_guild.timeout:
-                    try:
-                        await member.kick()
-                    except Forbidden:
-                        logger.exception(
-                            "Lacking permissions to kick user {0} from guild {0.guild}.".format(
-                                member
-                            )
-                        )
-                    except HTTPException as e:
-                        logger.exception(
-                            "Failed to kick user {0} from guild {0.guild} "
-                            "due to HTTP error {1}.".format(member, e.response.status)
-                        )
-                    finally:
-                        self._session.delete(db_user)
-
-                    continue
-
-            if not msg.content.lower().strip() == db_guild.response_message.lower():
-                continue
+    async def _may_be_pending(self, user_id):
+        if self._maybe_unsaved(user_id):
+            await self._flush_onboarded()  # Prompted, but not recorded yet
 
-            member_role = guild.get_role(db_guild.role_id)
-            if not member_role:
-                continue
+        return not self._pending_loaded or user_id in self._pending
 
-            try:
-                await member.add_roles(member_role)
+    async def _handle_reply(self, msg, db_user):
+        """Verify or kick a pending user who sent a DM, for one guild."""
+        db_guild = db_user.guild
 
-                self._session.delete(db_user)
-                logger.info("Verified user {0} on guild {0.guild}.".format(member))
+        guild = self.bot.get_guild(db_user.guild_id)
+        if not guild:
+            return
 
-                await msg.author.send(f"Welcome to {guild}")
-            except Forbidden:
-                logger.exception(
-                    "Lacking permissions to manage roles for "
-                    "user {0} on guild {0.guild}.".format(member)
-                )
-            except HTTPException as e:
-                logger.exception(
-                    "Failed to manage roles for user {0} on guild {0.guild} "
-                    "due to HTTP error {1}.".format(member, e.response.status)
+        member = guild.get_member(msg.author.id)
+        if not member:
+            self._session.delete(db_user)  # Delete row if user already left
+            return
+
+        # Use utcnow because discord.py's join timestamps are in UTC
+        if db_user.expires_at and datetime.utcnow() >= db_user.expires_at:
+            await self._kick_expired(member)
+            self._session.delete(db_user)
+            return
+
+        if not msg.content.lower().strip() == db_guild.response_message.lower():
+            return
+
+        member_role = guild.get_role(db_guild.role_id)
+        if not member_role:
+            return
+
+        try:
+            await member.add_roles(member_role)
+
+            self._session.delete(db_user)
+            logger.info("Verified user {0} on guild {0.guild}.".format(member))
+
+            await msg.author.send(f"Welcome to {guild}")
+        except Forbidden:
+            logger.exception(
+                "Lacking permissions to manage roles for "
+                "user {0} on guild {0.guild}.".format(member)
+            )
+        except HTTPException as e:
+            logger.exception(
+                "Failed to manage roles for user {0} on guild {0.guild} "
+                "due to HTTP error {1}.".format(member, e.response.status)
+            )
+
+    async def _kick_expired(self, member):
+        try:
+            await member.kick()
+        except Forbidden:
+            logger.exception(
+                "Lacking permissions to kick user {0} from guild {0.guild}.".format(
+                    member
                 )
+            )
+        except HTTPException as e:
+            logger.exception(
+                "Failed to kick user {0} from guild {0.guild} "
+                "due to HTTP error {1}.".format(member, e.response.status)
+            )
+
+    async def _commit_and_reindex(self, user_id, db_users):
+        # Committing expires the rows, reading them afterwards would query again
+        snapshots = [_snapshot_pending(db_user) for db_user in db_users]
+        await self._session.run_sync(Session.commit)
 
-        self._session.commit()
+        # Also corrects entries that went stale, e.g. after changing a timeout
+        self._pending.pop(user_id, None)
+        for db_user, pending_user in zip(db_users, snapshots):
+            if not inspect(db_user).was_deleted:
+                self._index_pending(pending_user)
 
     @group()
     @guild_only()
@@ -327,10 +867,6 @@ class Newbies(Cog):
             return
 
         everyone_role = ctx.guild.default_role
-        everyone_permissions = everyone_role.permissions
-        everyone_permissions.read_messages = False
-        everyone_permissions.send_messages = False
-        everyone_permissions.read_message_history = False
         member_permissions = Permissions(0x400 | 0x800 | 0x10000)
 
         bound_prompt = partial(prompt, ctx=ctx)
@@ -365,10 +901,6 @@ class Newbies(Cog):
         member_role = await ctx.guild.create_role(
             name="Member", permissions=member_permissions
         )
-        for member in ctx.guild.members:
-            await member.add_roles(member_role)
-
-        await everyone_role.edit(permissions=everyone_permissions)
 
         db_guild = NewbieGuild(
             guild_id=ctx.guild.id,
@@ -382,6 +914,10 @@ class Newbies(Cog):
 
         ctx.session.add(db_guild)
 
+        # Existing members get the member role in the background
+        started_at = datetime.utcnow()
+        ctx.session.add(NewbieRoleJob(guild_id=ctx.guild.id, started_at=started_at))
+
         for channel_string in channels_message.content.split():
             match = channel_re.match(channel_string)
             if match:
@@ -399,8 +935,17 @@ class Newbies(Cog):
                 db_channel = NewbieChannel(channel_id=channel.id, guild_id=ctx.guild.id)
                 ctx.session.add(db_channel)
 
+        # The job has to be saved before it starts
+        await ctx.session.run_sync(Session.commit)
+        self._start_role_job(ctx.guild.id, started_at)
+
         logger.info(f"Enabled newbie roling on guild {ctx.guild}.")
-        await ctx.send("Automatic newbie roling is now enabled for this server.")
+        await ctx.send(
+            "Automatic newbie roling is now enabled for this server.\n"
+            "Existing members are given the member role in the background, "
+            "newbie restrictions apply once that is done. "
+            f"Use `{clean_prefix(ctx)}newbie status` to follow the progress."
+        )
 
     @newbie.command()
     async def disable(self, ctx: Context):
@@ -441,11 +986,48 @@ class Newbies(Cog):
             everyone_overwrite.update(read_messages=None, read_message_history=None)
             await channel.set_permissions(everyone_role, overwrite=everyone_overwrite)
 
+        self._role_job_tasks.cancel(ctx.guild.id)
+        self._role_jobs.pop(ctx.guild.id, None)
         ctx.session.delete(db_guild)
 
         logger.info(f"Disabled newbie roling on guild {ctx.guild}.")
         await ctx.send("Disabled newbie roling for this server.")
 
+    @newbie.command()
+    @newbie_enabled
+    async def status(self, ctx: Context):
+        """
+        Show the progress of giving existing members the member role after enabling,
+        as well as the number of members pending verification.
+        """
+
+        lines = []
+        progress = self._role_job_progress.get(ctx.guild.id)
+        job = await ctx.session.run_sync(_get_role_job, ctx.guild.id)
+        if progress:
+            line = f"Giving existing members the member role: {progress}."
+            if progress.rate > 0:
+                minutes = progress.remaining / progress.rate / 60
+                line += f" About {minutes:.0f} minute(s) left."
+
+            lines.append(line)
+        elif job and job.finished_at:
+            lines.append(
+                f"Gave {job.done} existing member(s) the member role, "
+                f"{job.failed} failed. Finished {job.finished_at:%Y-%m-%d %H:%M} UTC."
+            )
+        elif job:
+            lines.append(
+                f"Giving existing members the member role: {job.done} done, "
+                f"{job.failed} failed so far. Waiting to resume."
+            )
+
+        if self._pending_loaded:
+            pending = sum(ctx.guild.id in guilds for guilds in self._pending.values())
+            lines.append(f"{pending} member(s) pending verification.")
+
+        await ctx.send("\n".join(lines) or "Nothing to report.")
+
     @newbie.command()
     @newbie_enabled
     async def timeout(self, ctx: Context, delay: int = 0):
@@ -458,12 +1040,8 @@ class Newbies(Cog):
             Defaults to zero, which means no timeout at all.
         """
 
-        db_guild = ctx.session.query(NewbieGuild).get(ctx.guild.id)
-
-        if delay > 0:
-            db_guild.timeout = timedelta(hours=delay)
-        else:
-            db_guild.timeout = None
+        timeout = timedelta(hours=delay) if delay > 0 else None
+        await ctx.session.run_sync(_set_timeout, ctx.guild.id, timeout)
 
         logger.info(f"Changed timeout for {ctx.guild} to {delay} hours.")
         await ctx.send(f"Successfully set timeout to {delay} hours.")
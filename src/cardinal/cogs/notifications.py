@@ -1,11 +1,15 @@
+from asyncio import sleep
+from collections import deque, namedtuple
 from string import Template
+from time import monotonic
 from typing import Optional
 
-from discord import Guild, Member, TextChannel, User, abc
+from discord import AllowedMentions, Guild, Member, TextChannel, User, abc
 from discord.ext.commands import Cog, Greedy, group, guild_only, has_permissions
 
 from ..db import Notification, NotificationKind
 from ..errors import PromptTimeout
+from ..scheduler import TaskRegistry
 from ..utils import maybe_send, prompt
 
 _DEFAULT_TEMPLATES = {
@@ -14,32 +18,168 @@ _DEFAULT_TEMPLATES = {
     NotificationKind.BAN: "$fullname has been banned.",
     NotificationKind.UNBAN: "$fullname has been unbanned.",
 }
+# Values of the placeholders available in templates, computed only if used
+_PLACEHOLDERS = {
+    "name": lambda user: user.display_name,
+    "fullname": lambda user: f"{user.name}#{user.discriminator}",
+    "mention": lambda user: user.mention,
+    "id": lambda user: user.id,
+}
+
+_DIGEST_VERBS = {
+    NotificationKind.JOIN: "joined",
+    NotificationKind.LEAVE: "left",
+    NotificationKind.BAN: "got banned",
+    NotificationKind.UNBAN: "got unbanned",
+}
+# Defaults for coalescing bursts of events, e.g. during raids
+BURST_WINDOW = 10  # Seconds
+BURST_THRESHOLD = 5  # Events per window before switching to digests
+MESSAGE_LIMIT = 2000
+
+
+def _format_digest(kind, users):
+    """
+    Summarize many events of the same kind in one message.
+
+    Args:
+        kind (cardinal.db.NotificationKind): Kind of the events.
+        users (list[discord.abc.User]): Users the events were for, in order.
+
+    Returns:
+        str: Digest listing as many users as fit into a message.
+    """
+    count = len(users)
+    text = f"{count} user{'' if count == 1 else 's'} {_DIGEST_VERBS[kind]}: "
+    # Names only, as mentioning hundreds of users would be worse than the raid
+    names = [f"{user.name}#{user.discriminator}" for user in users]
+    for i, name in enumerate(names):
+        rest = f" and {len(names) - i} more."
+        if len(text) + len(name) + len(rest) + 2 > MESSAGE_LIMIT:
+            return text.rstrip(", ") + rest
+
+        text += f"{name}, "
+
+    return text.rstrip(", ") + "."
+
+
+_CompiledNotification = namedtuple(
+    "_CompiledNotification", ["channel_id", "template", "placeholders"]
+)
+
+
+def _compile(db_notif):
+    """
+    Prepare a notification for repeated sending.
+
+    Args:
+        db_notif: :class:`cardinal.db.Notification` or a snapshot of one.
+
+    Returns:
+        _CompiledNotification: Target channel, template and the known placeholders
+            the template uses.
+    """
+    template = Template(db_notif.template)
+    used = {
+        match.group("named") or match.group("braced")
+        for match in template.pattern.finditer(template.template)
+    }
+    placeholders = tuple(name for name in _PLACEHOLDERS if name in used)
+    return _CompiledNotification(db_notif.channel_id, template, placeholders)
+
+
+def _load_compiled(session, guild_id, kind):
+    # Loader for the guild config cache, which then holds the compiled form
+    db_notif = session.query(Notification).get((guild_id, kind))
+    return db_notif and _compile(db_notif)
+
+
+class _Burst:
+    """Recent events and pending digest entries of one notification kind in a guild."""
+
+    __slots__ = ("times", "users", "channel")
+
+    def __init__(self):
+        self.times = deque()
+        self.users = []
+        self.channel = None
 
 
 class Notifications(Cog):
-    def __init__(self, scoped_session):
+    def __init__(
+        self,
+        loop,
+        guild_config,
+        scoped_session,
+        burst_window=None,
+        burst_threshold=None,
+    ):
+        self._guild_config = guild_config
         self._session = scoped_session
+        self._burst_window = burst_window or BURST_WINDOW
+        self._burst_threshold = burst_threshold or BURST_THRESHOLD
+        # Keyed by (guild ID, kind), bounded by the number of enabled notifications
+        self._bursts = {}
+        self._digests = TaskRegistry(loop)
+        guild_config.register(Notification, _load_compiled)
 
     async def _process_event(
         self, kind: NotificationKind, guild: Guild, user: abc.User
     ):
-        db_notif = self._session.query(Notification).get((guild.id, kind))
-        if not db_notif:
+        compiled = await self._get_compiled(guild.id, kind)
+        if not compiled:
             return
 
-        channel = guild.get_channel(db_notif.channel_id)
+        channel = guild.get_channel(compiled.channel_id)
         if not channel:
             return
 
-        template = Template(db_notif.template)
+        key = (guild.id, kind)
+        burst = self._bursts.setdefault(key, _Burst())
+        now = monotonic()
+        while burst.times and burst.times[0] <= now - self._burst_window:
+            burst.times.popleft()
+
+        burst.times.append(now)
+        if burst.users or len(burst.times) > self._burst_threshold:
+            # Too many events to announce one by one, fold them into a digest
+            burst.users.append(user)
+            burst.channel = channel
+            self._digests.start(key, self._send_digest(key))
+            return
+
         format_args = {
-            "name": user.display_name,
-            "fullname": f"{user.name}#{user.discriminator}",
-            "mention": user.mention,
-            "id": user.id,
+            name: _PLACEHOLDERS[name](user) for name in compiled.placeholders
         }
+        await maybe_send(channel, compiled.template.safe_substitute(format_args))
 
-        await maybe_send(channel, template.safe_substitute(format_args))
+    async def _get_compiled(self, guild_id, kind):
+        """
+        Returns:
+            typing.Optional[_CompiledNotification]: Compiled notification
+                or `None` if the kind is disabled.
+        """
+        # Expires and is invalidated on changes like any other guild config
+        return await self._guild_config.fetch(
+            self._session, Notification, guild_id, kind
+        )
+
+    async def _send_digest(self, key):
+        burst = self._bursts[key]
+        # Events during a send cannot start another digest while this one runs,
+        # so keep going until none are left
+        while True:
+            # Collect everything until the end of the window
+            await sleep(self._burst_window)
+
+            users, burst.users = burst.users, []
+            await maybe_send(
+                burst.channel,
+                _format_digest(key[1], users),
+                allowed_mentions=AllowedMentions.none(),
+            )
+            if not burst.users:
+                return
 
     @Cog.listener()
     async def on_member_join(self, member: Member):
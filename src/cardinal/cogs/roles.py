@@ -18,6 +18,9 @@ logger = getLogger(__name__)
 
 
 class Roles(Cog):
+    def __init__(self, role_counts):
+        self._role_counts = role_counts
+
     @group("role", aliases=["roles"])
     @guild_only()
     @bot_has_permissions(manage_roles=True)
@@ -107,8 +110,7 @@ class Roles(Cog):
         q = ctx.session.query(JoinRole).filter_by(guild_id=ctx.guild.id)
         role_iter = filter(None, (ctx.guild.get_role(db_role.role_id) for db_role in q))
         role_dict = {
-            role: sum(1 for member in ctx.guild.members if role in member.roles)
-            for role in role_iter
+            role: self._role_counts.count(ctx.guild, role.id) for role in role_iter
         }
 
         em = Embed(title=f"Role stats for {ctx.guild}", color=0x38CBF0)
@@ -8,6 +8,8 @@ from aioitertools import chain as achain
 from discord import Colour, Embed
 from discord.ext.commands import Cog, Context, command
 
+from ..cache import ResponseCache
+
 # from ..utils import maybe_send
 
 _SAUCENAO_URL = "https://saucenao.com/search.php"
@@ -113,13 +115,21 @@ class _SauceResult:
         return embed
 
 
+class _SauceNAOError(Exception):
+    def __init__(self, status: int):
+        super().__init__(status)
+        self.status = status
+
+
 class SauceNAO(Cog):
     """
     Look up images in the image reverse search database SauceNAO
     (https://saucenao.com/).
     """
 
-    def __init__(self, http: ClientSession, api_key: str):
+    def __init__(
+        self, http: ClientSession, api_key: str, response_cache: ResponseCache
+    ):
         # TODO: Add some kind of SauceNAO API wrapper that keeps track of the rate limit
         # That also requires figuring out when resets happen, i.e. if they happen in set intervals
         # or X time after the first request for that bucket.
@@ -129,6 +139,10 @@ class SauceNAO(Cog):
         # can't think of a sensible response to that case beyond just disabling the command and
         # emitting a warning.
         self.params = {**_SAUCENAO_PARAMS_BASE, "api_key": api_key}
+        # Every request counts against the quota, so hold on to results for a while
+        self._cache = response_cache.namespace(
+            "saucenao", ttl=24 * 3600, negative_ttl=3600
+        )
 
     async def _is_image(self, url: str) -> bool:
         """
@@ -168,6 +182,14 @@ class SauceNAO(Cog):
         Returns:
             An object describing the result if there was one, or None if not.
         """
+        try:
+            return await self._cache.fetch(url, self._fetch_url, url)
+        except _SauceNAOError as e:
+            # Errors are not cached, unlike lookups without results
+            _logger.warning('SauceNAO returned status %d for URL "%s".', e.status, url)
+            return None
+
+    async def _fetch_url(self, url: str) -> Optional[_SauceResult]:
         # This whole shebang kinda assumes SauceNAO doesn't give us garbage data
         # If it does, it'll most likely result in a KeyError bubbling up into the command.
         # I don't have any hard sources for what fields are supposed to be present either,
@@ -178,7 +200,11 @@ class SauceNAO(Cog):
         async with self._http.get(_SAUCENAO_URL, params=params) as resp:
             resp_data = await resp.json()
             # 0 indicates success, as described on the API page linked at the top of the module
-            if not (resp_data["header"]["status"] == 0 and resp_data.get("results")):
+            status = resp_data["header"]["status"]
+            if status != 0:
+                raise _SauceNAOError(status)
+
+            if not resp_data.get("results"):
                 return None
 
             result_json = resp_data["results"][0]
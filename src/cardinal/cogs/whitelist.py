@@ -1,7 +1,8 @@
 from logging import getLogger
 
 from discord import TextChannel
-from discord.ext.commands import Cog, group, guild_only, has_permissions
+from discord.ext.commands import Cog, group, guild_only, has_permissions, is_owner
+from sqlalchemy.orm import Session
 
 from ..context import Context
 from ..db import WhitelistedChannel
@@ -11,6 +12,15 @@ logger = getLogger(__name__)
 
 
 class Whitelisting(Cog):
+    def __init__(self, scoped_session, whitelist):
+        self._session = scoped_session
+        self._whitelist = whitelist
+
+    @Cog.listener()
+    async def on_ready(self):
+        await self._session.run_sync(self._whitelist.load)
+        logger.info(f"Loaded {len(self._whitelist)} whitelisted channel(s).")
+
     @group(aliases=["wl"])
     @guild_only()
     async def whitelist(self, ctx: Context):
@@ -53,6 +63,9 @@ class Whitelisting(Cog):
             channel_id=channel.id, guild_id=channel.guild.id
         )
         ctx.session.add(db_channel)
+        # Only touch the index once the row is persisted
+        await ctx.session.run_sync(Session.commit)
+        self._whitelist.add(channel.id)
 
         logger.info(f"Added channel {channel} on guild {ctx.guild} to whitelist.")
         await ctx.send(f"Whitelisted channel {channel.mention}.")
@@ -81,6 +94,8 @@ class Whitelisting(Cog):
             return
 
         ctx.session.delete(db_channel)
+        await ctx.session.run_sync(Session.commit)
+        self._whitelist.discard(channel.id)
 
         logger.info(f"Removed channel {channel} on guild {ctx.guild} from whitelist.")
         await ctx.send(f"Removed channel {channel.mention} from whitelist.")
@@ -94,6 +109,7 @@ class Whitelisting(Cog):
         answer = "Whitelisted channels on this server:```\n"
 
         channel_list = []
+        deleted = []
 
         for db_channel in ctx.session.query(WhitelistedChannel).filter_by(
             guild_id=ctx.guild.id
@@ -101,10 +117,16 @@ class Whitelisting(Cog):
             channel = ctx.guild.get_channel(db_channel.channel_id)
             if not channel:
                 ctx.session.delete(db_channel)
+                deleted.append(db_channel.channel_id)
                 continue
 
             channel_list.append(channel)
 
+        if deleted:
+            await ctx.session.run_sync(Session.commit)
+            for channel_id in deleted:
+                self._whitelist.discard(channel_id)
+
         channel_list.sort(key=lambda c: c.position)
 
         for channel in channel_list:
@@ -114,3 +136,17 @@ class Whitelisting(Cog):
 
         answer += "```"
         await ctx.send(answer)
+
+    @whitelist.command()
+    @is_owner()
+    async def reload(self, ctx: Context):
+        """
+        Reload the whitelist from the database.
+        Only needed if the database was modified without going through the bot.
+
+        Required permissions:
+            - Bot owner
+        """
+
+        await ctx.session.run_sync(self._whitelist.load)
+        await ctx.send(f"Reloaded {len(self._whitelist)} whitelisted channel(s).")
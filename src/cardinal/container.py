@@ -1,13 +1,14 @@
 from asyncio import get_event_loop
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
+from ssl import create_default_context
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, TCPConnector
 from dependency_injector.containers import DeclarativeContainer
 from dependency_injector.providers import (
     Callable,
     Configuration,
     DelegatedFactory,
-    Factory,
     Singleton,
 )
 from sqlalchemy import create_engine
@@ -15,7 +16,11 @@ from sqlalchemy.orm import scoped_session as _scoped_session
 from sqlalchemy.orm import sessionmaker as _sessionmaker
 
 from .bot import Bot, event_context
+from .cache import ResponseCache
 from .context import Context
+from .db import ExecutorScopedSession, GuildConfigCache, QueryProfiler, WhitelistIndex
+from .metrics import Metrics, MetricsServer
+from .role_counts import RoleCounts
 
 logger = getLogger(__name__)
 
@@ -24,6 +29,73 @@ def _create_engine_wrapper(connect_string, options):
     return create_engine(connect_string, **options)
 
 
+def _create_http_wrapper(loop, options):
+    options = options or {}
+    connector = TCPConnector(
+        limit=options.get("limit", 100),
+        limit_per_host=options.get("limit_per_host", 10),
+        ttl_dns_cache=options.get("dns_cache_ttl", 300),
+        keepalive_timeout=options.get("keepalive_timeout", 60),
+        # Share one context between all connections instead of creating one per host
+        ssl=create_default_context(),
+        loop=loop,
+    )
+
+    return ClientSession(connector=connector, loop=loop, raise_for_status=True)
+
+
+def _create_executor_wrapper(workers):
+    # No workers configured => keep database calls on the event loop
+    if not workers:
+        return None
+
+    logger.info(f"Running database calls on {workers} worker thread(s).")
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cardinal-db")
+
+
+def _create_guild_config_wrapper(sessionmaker, options):
+    cache = GuildConfigCache(**(options or {}))
+    cache.install(sessionmaker)
+    return cache
+
+
+def _create_query_profiler_wrapper(engine, metrics, slow_threshold):
+    profiler = QueryProfiler(metrics, slow_threshold)
+    profiler.install(engine)
+    return profiler
+
+
+def _create_response_cache_wrapper(loop, metrics, options):
+    cache = ResponseCache(**(options or {}), loop=loop)
+    metrics.register(
+        "cardinal_response_cache_hits_total",
+        "counter",
+        lambda: cache.collect("hits"),
+        "Web API responses served from cache.",
+    )
+    metrics.register(
+        "cardinal_response_cache_misses_total",
+        "counter",
+        lambda: cache.collect("misses"),
+        "Web API responses that had to be fetched.",
+    )
+    return cache
+
+
+def _create_role_counts_wrapper(bot):
+    counts = RoleCounts()
+    counts.install(bot)
+    return counts
+
+
+def _create_metrics_server_wrapper(metrics, options):
+    # The HTTP endpoint is opt-in
+    if not options:
+        return None
+
+    return MetricsServer(metrics, **options)
+
+
 class RootContainer(DeclarativeContainer):
     """Application IoC container"""
 
@@ -35,24 +107,63 @@ class RootContainer(DeclarativeContainer):
         _create_engine_wrapper, config.db.connect_string, config.db.options
     )
 
-    http = Factory(ClientSession, loop=loop, raise_for_status=True)
+    # Shared by all cogs so connections stay warm between commands
+    http = Singleton(_create_http_wrapper, loop, config.http)
 
     sessionmaker = Singleton(_sessionmaker, bind=engine)
 
-    scoped_session = Singleton(
+    db_executor = Singleton(_create_executor_wrapper, config.db.executor_workers)
+
+    sync_scoped_session = Singleton(
         _scoped_session, sessionmaker, scopefunc=event_context.get
     )
 
-    context_factory = DelegatedFactory(Context, scoped_session=scoped_session)
+    scoped_session = Singleton(
+        ExecutorScopedSession, sync_scoped_session, executor=db_executor, loop=loop
+    )
+
+    metrics = Singleton(Metrics)
+
+    metrics_server = Singleton(_create_metrics_server_wrapper, metrics, config.metrics)
+
+    query_profiler = Singleton(
+        _create_query_profiler_wrapper,
+        engine,
+        metrics,
+        config.db.slow_query_threshold,
+    )
+
+    # In-memory caches
+    whitelist = Singleton(WhitelistIndex)
+
+    guild_config = Singleton(
+        _create_guild_config_wrapper, sessionmaker, config.db.config_cache
+    )
+
+    response_cache = Singleton(
+        _create_response_cache_wrapper, loop, metrics, config.http_cache
+    )
+
+    context_factory = DelegatedFactory(
+        Context, scoped_session=scoped_session, whitelist=whitelist
+    )
 
     bot = Singleton(
         Bot,
         command_prefix=config.cmd_prefix,
         context_factory=context_factory,
         default_game=config.default_game,
+        http_session=http,
         loop=loop,
+        metrics=metrics,
+        metrics_server=metrics_server,
+        query_profiler=query_profiler,
+        response_cache=response_cache,
         scoped_session=scoped_session,
     )
 
+    # Maintained from the bot's events
+    role_counts = Singleton(_create_role_counts_wrapper, bot)
+
     # Main
     run_bot = Callable(Bot.run, bot, config.token)
@@ -2,8 +2,9 @@ from discord.ext.commands import Context as BaseContext
 
 
 class Context(BaseContext):
-    def __init__(self, scoped_session, **kwargs):
+    def __init__(self, scoped_session, whitelist, **kwargs):
         super().__init__(**kwargs)
         self.session = (
             scoped_session  # TODO: Ensure everything actually commits its changes
         )
+        self.whitelist = whitelist
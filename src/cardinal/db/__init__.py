@@ -1,21 +1,29 @@
 from .base import Base
+from .cache import GuildConfigCache
 from .channels import OptinChannel
 from .mute import MuteGuild, MuteUser
-from .newbie import NewbieChannel, NewbieGuild, NewbieUser
+from .newbie import NewbieChannel, NewbieGuild, NewbieRoleJob, NewbieUser
 from .notifications import Notification, NotificationKind
+from .profiling import QueryProfiler
 from .roles import JoinRole
-from .whitelist import WhitelistedChannel
+from .session import ExecutorScopedSession
+from .whitelist import WhitelistedChannel, WhitelistIndex
 
 __all__ = [
     "Base",
+    "ExecutorScopedSession",
+    "GuildConfigCache",
     "JoinRole",
     "MuteGuild",
     "MuteUser",
     "NewbieChannel",
     "NewbieGuild",
+    "NewbieRoleJob",
     "NewbieUser",
     "Notification",
     "NotificationKind",
     "OptinChannel",
+    "QueryProfiler",
     "WhitelistedChannel",
+    "WhitelistIndex",
 ]
@@ -0,0 +1,179 @@
+from collections import namedtuple
+from functools import partial
+from logging import getLogger
+
+from sqlalchemy import event, inspect
+
+from ..cache import TTLCache
+
+logger = getLogger(__name__)
+_MISSING = object()
+# Key in `Session.info` to remember flushed rows until the transaction ends
+_PENDING_KEY = "cardinal_guild_config_pending"
+
+
+def _ident_key(model, ident):
+    return (model, *ident)
+
+
+class GuildConfigCache:
+    """
+    Read-through cache for small, rarely changing per-guild configuration rows.
+
+    Rows are cached as immutable snapshots of their column values,
+    so they can safely outlive the session they were loaded with.
+    Misses, i.e. rows that do not exist, are cached as well.
+
+    Entries are invalidated automatically when a session the cache is installed on
+    flushes or bulk-modifies a registered model, and expire after `ttl` seconds regardless,
+    to bound staleness if the database is changed behind the bot's back.
+
+    Args:
+        maxsize (int): Maximum number of cached rows across all models.
+        ttl (typing.Optional[float]): Lifetime of entries in seconds.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300):
+        self._cache = TTLCache(maxsize, ttl)
+        self._loaders = {}
+        self._snapshot_types = {}
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    def register(self, model, loader=None):
+        """
+        Register a model for caching. Registering a model twice is a no-op.
+
+        Args:
+            model (type): Mapped class to cache rows of.
+            loader (typing.Optional[typing.Callable]): Function taking a session
+                and the primary key values and returning the value to cache.
+                Defaults to a primary key lookup returning a snapshot or `None`.
+        """
+        if model in self._loaders:
+            return
+
+        columns = [attr.key for attr in inspect(model).column_attrs]
+        self._snapshot_types[model] = namedtuple(f"{model.__name__}Snapshot", columns)
+        self._loaders[model] = loader or partial(self._load_by_pk, model)
+
+    def _load_by_pk(self, model, session, *ident):
+        instance = session.query(model).get(ident if len(ident) > 1 else ident[0])
+        return self.snapshot(instance)
+
+    def snapshot(self, instance):
+        """
+        Copy the column values of an instance of a registered model.
+
+        Args:
+            instance: Instance to copy, may be `None`.
+
+        Returns:
+            typing.Optional[tuple]: Named tuple of column values or `None`.
+        """
+        if instance is None:
+            return None
+
+        snapshot_type = self._snapshot_types[type(instance)]
+        return snapshot_type(*(getattr(instance, key) for key in snapshot_type._fields))
+
+    def get(self, session, model, *ident):
+        """
+        Look up a row, loading it with the given session on a miss.
+
+        Args:
+            session (sqlalchemy.orm.Session): Session to load with.
+            model (type): Registered model to look up.
+            *ident: Primary key values of the row.
+
+        Returns:
+            Cached value for the row, `None` if it does not exist.
+        """
+        value = self._cache.get(_ident_key(model, ident), _MISSING)
+        if value is _MISSING:
+            value = self._load(session, model, *ident)
+
+        return value
+
+    def _load(self, session, model, *ident):
+        # Bypasses the lookup, so misses are only counted once by the caller
+        value = self._loaders[model](session, *ident)
+        self._cache.set(_ident_key(model, ident), value)
+        return value
+
+    async def fetch(self, scoped_session, model, *ident):
+        """
+        Like :meth:`get`, but loads through a
+        :class:`cardinal.db.ExecutorScopedSession` without blocking on a miss.
+        Hits are served without touching the session.
+        """
+        value = self._cache.get(_ident_key(model, ident), _MISSING)
+        if value is _MISSING:
+            value = await scoped_session.run_sync(self._load, model, *ident)
+
+        return value
+
+    def invalidate(self, model, *ident):
+        """
+        Drop a cached row, or all rows of a model if no primary key is given.
+        """
+        if ident:
+            self._cache.pop(_ident_key(model, ident))
+        else:
+            self._cache.discard_where(lambda key: key[0] is model)
+
+    def clear(self):
+        self._cache.clear()
+
+    def install(self, session_factory):
+        """
+        Hook into the sessions created by a factory to invalidate modified rows.
+
+        Args:
+            session_factory (sqlalchemy.orm.sessionmaker): Factory to hook into.
+        """
+        event.listen(session_factory, "after_flush", self._after_flush)
+        event.listen(session_factory, "after_commit", self._after_commit)
+        event.listen(session_factory, "after_rollback", self._after_rollback)
+        event.listen(session_factory, "after_bulk_update", self._after_bulk)
+        event.listen(session_factory, "after_bulk_delete", self._after_bulk)
+
+    def _after_flush(self, session, flush_context):
+        pending = session.info.setdefault(_PENDING_KEY, set())
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            model = type(instance)
+            if model not in self._loaders:
+                continue
+
+            mapper = inspect(model)
+            ident = tuple(mapper.primary_key_from_instance(instance))
+            self.invalidate(model, *ident)
+            pending.add((model, ident))
+
+    def _after_commit(self, session):
+        # Invalidate again in case another session re-cached the old row
+        # between the flush and the commit
+        self._invalidate_pending(session)
+
+    def _after_rollback(self, session):
+        # Rows may have been cached from the flushed state that was just discarded
+        self._invalidate_pending(session)
+
+    def _invalidate_pending(self, session):
+        # An empty ident stands for all rows of the model, see _after_bulk
+        for model, ident in session.info.pop(_PENDING_KEY, ()):
+            self.invalidate(model, *ident)
+
+    def _after_bulk(self, bulk_context):
+        model = bulk_context.mapper.class_
+        if model in self._loaders:
+            logger.debug(f"Bulk operation on {model.__name__}, dropping cached rows.")
+            self.invalidate(model)
+            pending = bulk_context.session.info.setdefault(_PENDING_KEY, set())
+            pending.add((model, ()))
@@ -0,0 +1,78 @@
+"""Add indexed expiry column for newbie verification timeouts
+
+Revision ID: 33096e9fba36
+Revises: d3915e15063e
+Create Date: 2026-10-16 12:04:31.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "33096e9fba36"
+down_revision = "d3915e15063e"
+branch_labels = None
+depends_on = None
+
+newbie_guilds = sa.table(
+    "newbie_guilds",
+    sa.column("guild_id", sa.BigInteger),
+    sa.column("timeout", sa.Interval),
+)
+newbie_users = sa.table(
+    "newbie_users",
+    sa.column("user_id", sa.BigInteger),
+    sa.column("guild_id", sa.BigInteger),
+    sa.column("joined_at", sa.DateTime),
+    sa.column("expires_at", sa.DateTime),
+)
+
+
+def upgrade():
+    op.add_column("newbie_users", sa.Column("expires_at", sa.DateTime(), nullable=True))
+    op.create_index(
+        op.f("ix_newbie_users_expires_at"), "newbie_users", ["expires_at"], unique=False
+    )
+
+    # Backfill in Python, as interval arithmetic differs between databases
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(
+            newbie_users.c.user_id,
+            newbie_users.c.guild_id,
+            newbie_users.c.joined_at,
+            newbie_guilds.c.timeout,
+        )
+        .select_from(
+            newbie_users.join(
+                newbie_guilds, newbie_users.c.guild_id == newbie_guilds.c.guild_id
+            )
+        )
+        .where(newbie_guilds.c.timeout.isnot(None))
+    ).fetchall()
+
+    if rows:
+        conn.execute(
+            newbie_users.update()
+            .where(
+                sa.and_(
+                    newbie_users.c.user_id == sa.bindparam("b_user_id"),
+                    newbie_users.c.guild_id == sa.bindparam("b_guild_id"),
+                )
+            )
+            .values(expires_at=sa.bindparam("b_expires_at")),
+            [
+                {
+                    "b_user_id": user_id,
+                    "b_guild_id": guild_id,
+                    "b_expires_at": joined_at + timeout,
+                }
+                for user_id, guild_id, joined_at, timeout in rows
+            ],
+        )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_newbie_users_expires_at"), table_name="newbie_users")
+    op.drop_column("newbie_users", "expires_at")
@@ -0,0 +1,38 @@
+"""Add table tracking member role assignment after enabling newbie roling
+
+Revision ID: 9c4e7b21d5a8
+Revises: 33096e9fba36
+Create Date: 2026-10-16 15:22:08.734190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c4e7b21d5a8"
+down_revision = "33096e9fba36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "newbie_role_jobs",
+        sa.Column("guild_id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("last_member_id", sa.BigInteger(), nullable=True),
+        sa.Column("done", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["guild_id"],
+            ["newbie_guilds.guild_id"],
+            name=op.f("fk_newbie_role_jobs_guild_id_newbie_guilds"),
+        ),
+        sa.PrimaryKeyConstraint("guild_id", name=op.f("pk_newbie_role_jobs")),
+    )
+
+
+def downgrade():
+    op.drop_table("newbie_role_jobs")
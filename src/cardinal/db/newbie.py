@@ -1,4 +1,12 @@
-from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Interval, UnicodeText
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Interval,
+    UnicodeText,
+)
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -26,6 +34,8 @@ class NewbieUser(Base):
     )
     message_id = Column(BigInteger, unique=True, nullable=False)
     joined_at = Column(DateTime, nullable=False)
+    # Materialised `joined_at + guild.timeout`, so overdue users can be found by index
+    expires_at = Column(DateTime, index=True, nullable=True)
 
 
 class NewbieChannel(Base):
@@ -35,6 +45,25 @@ class NewbieChannel(Base):
     guild_id = Column(BigInteger, ForeignKey(NewbieGuild.guild_id), nullable=False)
 
 
+class NewbieRoleJob(Base):
+    """Progress of giving existing members the member role after enabling."""
+
+    __tablename__ = "newbie_role_jobs"
+
+    guild_id = Column(
+        BigInteger,
+        ForeignKey(NewbieGuild.guild_id),
+        primary_key=True,
+        autoincrement=False,
+    )
+    started_at = Column(DateTime, nullable=False)
+    # Members are processed in ascending ID order, all up to this one are done
+    last_member_id = Column(BigInteger, nullable=True)
+    done = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    finished_at = Column(DateTime, nullable=True)
+
+
 # TODO: Decide on lazy (True) or eager (False) loading
 NewbieGuild.users = relationship(
     NewbieUser, backref="guild", innerjoin=True, cascade="all, delete-orphan", lazy=True
@@ -42,3 +71,10 @@ NewbieGuild.users = relationship(
 NewbieGuild.channels = relationship(
     NewbieChannel, backref="guild", cascade="all, delete-orphan", lazy=True
 )
+NewbieGuild.role_job = relationship(
+    NewbieRoleJob,
+    backref="guild",
+    uselist=False,
+    cascade="all, delete-orphan",
+    lazy=True,
+)
@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from time import perf_counter
+
+from sqlalchemy import event
+
+logger = getLogger(__name__)
+# Statistics object of the innermost tracked scope
+query_stats = ContextVar("query_stats", default=None)
+# Key in `Connection.info` for a stack of statement start times
+_START_KEY = "cardinal_query_start"
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class QueryStats:
+    """
+    Number of statements and time spent executing them within a scope.
+    Statements are also attributed to all enclosing scopes,
+    e.g. a command's queries count towards the event that invoked it.
+    """
+
+    __slots__ = ("scope", "ident", "labels", "parent", "count", "duration")
+
+    def __init__(self, scope, ident, labels, parent=None):
+        self.scope = scope
+        self.ident = ident
+        self.labels = labels
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+
+    def __str__(self):
+        labels = ", ".join(f"{key}={value}" for key, value in self.labels.items())
+        return f"{self.scope} #{self.ident} ({labels})"
+
+    def add(self, duration):
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats = stats.parent
+
+
+class QueryProfiler:
+    """
+    Count and time SQL statements per event and per command invocation.
+
+    Statements are attributed through a context variable,
+    which the database executor propagates to its worker threads.
+
+    Args:
+        metrics (cardinal.metrics.Metrics): Registry to record statistics in.
+        slow_threshold (typing.Optional[float]): Statements taking at least this
+            many seconds are logged as warnings. `None` disables logging.
+    """
+
+    def __init__(self, metrics, slow_threshold=None):
+        self._metrics = metrics
+        self._slow_threshold = slow_threshold
+
+        for scope in ("event", "command"):
+            metrics.describe(
+                f"cardinal_{scope}_queries",
+                f"SQL statements executed per {scope}.",
+                buckets=QUERY_COUNT_BUCKETS,
+            )
+            metrics.describe(
+                f"cardinal_{scope}_db_seconds",
+                f"Time spent executing SQL statements per {scope}.",
+            )
+
+    def install(self, engine):
+        """
+        Hook into statement execution on an engine.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): Engine to profile.
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    @contextmanager
+    def track(self, scope, ident, **labels):
+        """
+        Attribute statements executed within a with block to a scope
+        and record the totals once it exits.
+
+        Args:
+            scope (str): Kind of scope, i.e. "event" or "command".
+            ident: Identifier for this particular scope, used for logging.
+            **labels: Labels to record the totals under.
+
+        Yields:
+            QueryStats: Statistics for the scope.
+        """
+        stats = QueryStats(scope, ident, labels, query_stats.get())
+        token = query_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            query_stats.reset(token)
+            self._metrics.observe(f"cardinal_{scope}_queries", stats.count, **labels)
+            if stats.count:
+                self._metrics.observe(
+                    f"cardinal_{scope}_db_seconds", stats.duration, **labels
+                )
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault(_START_KEY, []).append(perf_counter())
+
+    def _handle_error(self, exception_context):
+        # Failed statements never reach _after_cursor_execute,
+        # drop their start time so pooled connections do not accumulate them
+        starts = exception_context.connection.info.get(_START_KEY)
+        if starts:
+            starts.pop()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = perf_counter() - conn.info[_START_KEY].pop()
+        stats = query_stats.get()
+        if stats is not None:
+            stats.add(duration)
+
+        if self._slow_threshold is not None and duration >= self._slow_threshold:
+            logger.warning(
+                f"Slow query ({duration * 1000:.1f} ms) "
+                f"in {stats or 'untracked scope'}: {statement}"
+            )
@@ -0,0 +1,79 @@
+from asyncio import get_event_loop
+from contextvars import copy_context
+from functools import partial
+
+
+class ExecutorScopedSession:
+    """
+    Wrapper around a :class:`sqlalchemy.orm.scoped_session` that can run database work
+    on a dedicated executor instead of blocking the event loop.
+
+    Any attribute not defined here is forwarded to the wrapped registry,
+    so existing synchronous code keeps working unchanged.
+    Without an executor, the awaitable methods simply call their argument inline,
+    which is the synchronous fallback mode.
+
+    Args:
+        scoped_session (sqlalchemy.orm.scoped_session): Session registry to wrap.
+        executor (typing.Optional[concurrent.futures.Executor]): Executor to run
+            database calls on. `None` runs them on the event loop thread.
+        loop (typing.Optional[asyncio.AbstractEventLoop]): Loop to schedule executor calls from.
+    """
+
+    def __init__(self, scoped_session, executor=None, loop=None):
+        self._scoped_session = scoped_session
+        self._executor = executor
+        self._loop = loop
+
+    def __call__(self):
+        return self._scoped_session()
+
+    def __getattr__(self, name):
+        return getattr(self._scoped_session, name)
+
+    @property
+    def is_async(self):
+        """bool: Whether database calls are offloaded to an executor."""
+        return self._executor is not None
+
+    async def run_in_executor(self, fn, *args, **kwargs):
+        """
+        Run an arbitrary callable on the database executor.
+        Meant for code that manages its own sessions, e.g. background tasks.
+
+        Args:
+            fn (typing.Callable): Callable to run.
+            *args, **kwargs: Passed through to `fn`.
+
+        Returns:
+            Whatever `fn` returns.
+        """
+        if self._executor is None:
+            return fn(*args, **kwargs)
+
+        # Executor threads do not inherit context variables,
+        # so copy them to keep event-scoped state visible to `fn`
+        ctx = copy_context()
+        loop = self._loop or get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(ctx.run, fn, *args, **kwargs)
+        )
+
+    async def run_sync(self, fn, *args, **kwargs):
+        """
+        Run a callable taking the current scoped session as its first argument
+        on the database executor.
+
+        The session is resolved on the calling thread,
+        so it belongs to the event that awaits this.
+        Do not run multiple calls for the same event concurrently,
+        as sessions are not thread-safe.
+
+        Args:
+            fn (typing.Callable): Callable to run, e.g. :meth:`sqlalchemy.orm.Session.commit`.
+            *args, **kwargs: Passed through to `fn` after the session.
+
+        Returns:
+            Whatever `fn` returns.
+        """
+        return await self.run_in_executor(fn, self._scoped_session(), *args, **kwargs)
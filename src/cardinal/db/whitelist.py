@@ -8,3 +8,50 @@ class WhitelistedChannel(Base):
 
     channel_id = Column(BigInteger, primary_key=True, autoincrement=False)
     guild_id = Column(BigInteger)  # Added to simplify querying for all items in a guild
+
+
+class WhitelistIndex:
+    """
+    In-memory set of whitelisted channel IDs, mirroring the whitelisted_channels table.
+
+    The set is loaded in full by :meth:`load` and then kept up to date by whoever
+    changes the table through the bot.
+    Changes made behind the bot's back require a call to :meth:`invalidate`,
+    which causes the next user to reload it.
+    """
+
+    def __init__(self):
+        self._channel_ids = set()
+        self._loaded = False
+
+    def __contains__(self, channel_id):
+        return channel_id in self._channel_ids
+
+    def __len__(self):
+        return len(self._channel_ids)
+
+    @property
+    def loaded(self):
+        """bool: Whether the index is populated and up to date."""
+        return self._loaded
+
+    def load(self, session):
+        """
+        (Re)load the index from the database.
+
+        Args:
+            session (sqlalchemy.orm.Session): Session to query with.
+        """
+        q = session.query(WhitelistedChannel.channel_id)
+        self._channel_ids = {channel_id for channel_id, in q}
+        self._loaded = True
+
+    def invalidate(self):
+        """Mark the index as stale, forcing a reload on next use."""
+        self._loaded = False
+
+    def add(self, channel_id):
+        self._channel_ids.add(channel_id)
+
+    def discard(self, channel_id):
+        self._channel_ids.discard(channel_id)
@@ -0,0 +1,262 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from logging import getLogger
+from time import perf_counter
+
+from aiohttp import web
+
+logger = getLogger(__name__)
+
+# Upper bounds in seconds, same as the default ones of the official Prometheus clients
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with constant memory usage.
+
+    Args:
+        bounds (typing.Sequence[float]): Sorted inclusive upper bounds of the buckets.
+            An implicit overflow bucket catches everything above the last bound.
+    """
+
+    __slots__ = ("bounds", "buckets", "count", "sum")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket it falls into.
+
+        Args:
+            q (float): Quantile to estimate, between 0 and 1.
+
+        Returns:
+            float: Estimated value, infinity if it lies in the overflow bucket.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket in zip(self.bounds, self.buckets):
+            cumulative += bucket
+            if cumulative >= rank:
+                return bound
+
+        return float("inf")
+
+    def cumulative(self):
+        """
+        Yields:
+            tuple[float, int]: Upper bound and cumulative count for each bucket,
+            ending with the overflow bucket.
+        """
+        cumulative = 0
+        for bound, bucket in zip((*self.bounds, float("inf")), self.buckets):
+            cumulative += bucket
+            yield bound, cumulative
+
+
+class Metrics:
+    """
+    In-memory metrics registry that renders to Prometheus' text exposition format.
+
+    Histograms are created on first observation.
+    Other values are exposed by registering collector callbacks,
+    which are only called when rendering.
+
+    Args:
+        buckets (typing.Sequence[float]): Bucket bounds for new histograms.
+        max_series (int): Maximum number of distinct histogram label sets.
+            Observations for new label sets beyond that are dropped.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_series=2000):
+        self._buckets = tuple(buckets)
+        self._max_series = max_series
+        self._histograms = {}  # name -> {labels tuple: Histogram}
+        self._num_series = 0
+        self._help = {}
+        self._metric_buckets = {}  # name -> bucket bounds, if not the default
+        self._collectors = {}  # name -> (type, callable)
+
+    def describe(self, name, help_text, buckets=None):
+        """
+        Set the help text of a metric and optionally the bucket bounds of its histograms.
+        Bucket bounds only affect histograms created afterwards.
+        """
+        self._help[name] = help_text
+        if buckets is not None:
+            self._metric_buckets[name] = tuple(buckets)
+
+    def observe(self, name, value, **labels):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Metric name.
+            value (float): Value to record.
+            **labels: Labels identifying the series.
+        """
+        series = self._histograms.setdefault(name, {})
+        key = tuple(labels.items())
+
+        try:
+            histogram = series[key]
+        except KeyError:
+            if self._num_series >= self._max_series:
+                logger.debug(
+                    f"Dropping observation for {name}{labels}, too many series."
+                )
+                return
+
+            buckets = self._metric_buckets.get(name, self._buckets)
+            histogram = series[key] = Histogram(buckets)
+            self._num_series += 1
+
+        histogram.observe(value)
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Record the wall-clock time spent in a with block."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start, **labels)
+
+    def histograms(self, name):
+        """
+        Returns:
+            dict[tuple, Histogram]: Histograms of a metric, keyed by label items.
+        """
+        return self._histograms.get(name, {})
+
+    def register(self, name, kind, collect, help_text=None):
+        """
+        Register a callback providing the values of a counter or gauge.
+
+        Args:
+            name (str): Metric name.
+            kind (str): Prometheus metric type, i.e. "counter" or "gauge".
+            collect (typing.Callable): Callable returning an iterable of
+                `(labels, value)` pairs, where `labels` is a dict.
+            help_text (typing.Optional[str]): Help text of the metric.
+        """
+        self._collectors[name] = (kind, collect)
+        if help_text:
+            self._help[name] = help_text
+
+    def render(self):
+        """
+        Returns:
+            str: All metrics in Prometheus' text exposition format.
+        """
+        lines = []
+
+        for name, (kind, collect) in self._collectors.items():
+            self._render_header(lines, name, kind)
+            for labels, value in collect():
+                lines.append(
+                    f"{name}{_format_labels(labels.items())} {_format_value(value)}"
+                )
+
+        for name, series in self._histograms.items():
+            self._render_header(lines, name, "histogram")
+            for labels, histogram in series.items():
+                for bound, count in histogram.cumulative():
+                    bucket_labels = _format_labels(
+                        (*labels, ("le", _format_value(bound)))
+                    )
+                    lines.append(f"{name}_bucket{bucket_labels} {count}")
+
+                label_str = _format_labels(labels)
+                lines.append(f"{name}_sum{label_str} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{label_str} {histogram.count}")
+
+        lines.append("")
+        return "\n".join(lines)
+
+    def _render_header(self, lines, name, kind):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+
+        lines.append(f"# TYPE {name} {kind}")
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server exposing a metrics registry under `/metrics`.
+
+    Args:
+        metrics (Metrics): Registry to expose.
+        host (str): Address to bind to. Defaults to localhost only.
+        port (int): Port to bind to.
+    """
+
+    def __init__(self, metrics, host="127.0.0.1", port=9464):
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+        self._runner = None
+
+    async def _handle(self, request):
+        return web.Response(text=self._metrics.render(), content_type="text/plain")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+        logger.info(f"Serving metrics on http://{self._host}:{self._port}/metrics.")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
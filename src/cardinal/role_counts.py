@@ -0,0 +1,95 @@
+from collections import Counter
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class RoleCounts:
+    """
+    Number of members per role, kept up to date from gateway events.
+
+    Counting a role's members from scratch takes a pass over all members of a guild,
+    so counts are built once per guild and then adjusted for every member update.
+    Guilds are counted on ready, or on first use if they became available later.
+    """
+
+    def __init__(self):
+        self._counts = {}  # Guild ID -> Counter of role IDs
+        self._bot = None
+
+    def install(self, bot):
+        """
+        Listen to the events needed to keep the counts up to date.
+
+        Args:
+            bot (discord.Client): Bot to listen on.
+        """
+        self._bot = bot
+        bot.add_listener(self.on_ready)
+        bot.add_listener(self.on_guild_available)
+        bot.add_listener(self.on_guild_remove)
+        bot.add_listener(self.on_guild_unavailable)
+        bot.add_listener(self.on_member_join)
+        bot.add_listener(self.on_member_remove)
+        bot.add_listener(self.on_member_update)
+
+    def _build(self, guild):
+        counts = Counter()
+        for member in guild.members:
+            # Private discord.py API: Member._roles is a SnowflakeList of role IDs,
+            # so no role objects are involved. Checked against discord.py 1.7
+            # (pinned as ^1.5), test_member_roles_compat guards it.
+            counts.update(member._roles)
+
+        self._counts[guild.id] = counts
+        return counts
+
+    def count(self, guild, role_id):
+        """
+        Args:
+            guild (discord.Guild): Guild the role belongs to.
+            role_id (int): Snowflake ID of the role.
+
+        Returns:
+            int: Number of members with the role.
+        """
+        counts = self._counts.get(guild.id)
+        if counts is None:
+            counts = self._build(guild)
+
+        return counts[role_id]
+
+    async def on_ready(self):
+        for guild in self._bot.guilds:
+            self._build(guild)
+
+        logger.info(f"Counted role members of {len(self._counts)} guild(s).")
+
+    async def on_guild_available(self, guild):
+        # Recount lazily, as members may have changed while it was unavailable
+        self._counts.pop(guild.id, None)
+
+    async def on_guild_unavailable(self, guild):
+        self._counts.pop(guild.id, None)
+
+    async def on_guild_remove(self, guild):
+        self._counts.pop(guild.id, None)
+
+    async def on_member_join(self, member):
+        counts = self._counts.get(member.guild.id)
+        if counts is not None:
+            counts.update(member._roles)  # Private, see _build
+
+    async def on_member_remove(self, member):
+        counts = self._counts.get(member.guild.id)
+        if counts is not None:
+            counts.subtract(member._roles)  # Private, see _build
+
+    async def on_member_update(self, before, after):
+        counts = self._counts.get(after.guild.id)
+        if counts is None or before._roles == after._roles:
+            return
+
+        # Private, see _build
+        counts.subtract(before._roles)
+        counts.update(after._roles)
@@ -0,0 +1,227 @@
+from asyncio import get_event_loop
+from datetime import datetime
+from functools import partial
+from heapq import heapify, heappop, heappush
+from itertools import count
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """
+    Call a function for keys whose deadline has passed,
+    driven by a single timer for the earliest pending deadline.
+
+    Deadlines live in a min-heap. Rescheduling or cancelling a key leaves
+    its old heap entry behind, which is skipped once it surfaces
+    and compacted away if stale entries start to dominate.
+
+    All methods must be called from the event loop thread.
+
+    Args:
+        callback (typing.Callable[[typing.Hashable], None]): Function called with each
+            key whose deadline passed. Spawn a task from it for asynchronous work.
+        loop (typing.Optional[asyncio.AbstractEventLoop]): Loop to arm the timer on.
+        clock (typing.Callable[[], datetime.datetime]): Source of the current time.
+            Defaults to naive UTC, matching the timestamps stored in the database.
+    """
+
+    def __init__(self, callback, loop=None, clock=datetime.utcnow):
+        self._callback = callback
+        self._loop = loop
+        self._clock = clock
+        self._heap = []  # (deadline, tiebreaker, key)
+        self._deadlines = {}  # key -> deadline, only these heap entries are live
+        self._tiebreaker = count()
+        self._timer = None
+        self._armed_for = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def deadline(self, key):
+        """
+        Returns:
+            typing.Optional[datetime.datetime]: Pending deadline of a key, if any.
+        """
+        return self._deadlines.get(key)
+
+    def items(self):
+        """
+        Returns:
+            list[tuple[typing.Hashable, datetime.datetime]]: Pending keys and their deadlines,
+            earliest first.
+        """
+        return sorted(self._deadlines.items(), key=lambda item: item[1])
+
+    def schedule(self, key, deadline):
+        """
+        Schedule a key, replacing its previous deadline if it has one.
+
+        Args:
+            key (typing.Hashable): Key to pass to the callback.
+            deadline (datetime.datetime): Time after which to call the callback.
+        """
+        if self._deadlines.get(key) == deadline:
+            return
+
+        self._deadlines[key] = deadline
+        heappush(self._heap, (deadline, next(self._tiebreaker), key))
+        self._compact()
+        self._arm()
+
+    def cancel(self, key):
+        """
+        Unschedule a key.
+
+        Returns:
+            bool: Whether the key was scheduled.
+        """
+        if self._deadlines.pop(key, None) is None:
+            return False
+
+        self._compact()
+        self._arm()
+        return True
+
+    def clear(self):
+        self._deadlines.clear()
+        self._heap.clear()
+        self._arm()
+
+    def run_due(self):
+        """
+        Call the callback for all keys whose deadline has passed.
+
+        Returns:
+            int: Number of keys that were due.
+        """
+        now = self._clock()
+        due = 0
+        if self._timer:
+            self._timer.cancel()  # No-op if this is the timer firing
+            self._timer = None
+
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heappop(self._heap)
+            if self._deadlines.get(key) != deadline:
+                continue  # Stale entry
+
+            del self._deadlines[key]
+            due += 1
+            try:
+                self._callback(key)
+            except Exception:
+                logger.exception(f"Scheduled callback for {key} failed.")
+
+        self._arm()
+        return due
+
+    def _compact(self):
+        # Bound memory if keys are rescheduled or cancelled a lot
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [
+                entry
+                for entry in self._heap
+                if self._deadlines.get(entry[2]) == entry[0]
+            ]
+            heapify(self._heap)
+
+    def _arm(self):
+        # Drop stale entries so the timer targets a live deadline
+        while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+            heappop(self._heap)
+
+        deadline = self._heap[0][0] if self._heap else None
+        if self._timer and self._armed_for == deadline:
+            return  # Still targeting the earliest deadline
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if deadline is None:
+            return
+
+        delay = (deadline - self._clock()).total_seconds()
+        loop = self._loop or get_event_loop()
+        self._timer = loop.call_later(max(delay, 0), self.run_due)
+        self._armed_for = deadline
+
+
+class TaskRegistry:
+    """
+    Keep track of at most one running task per key.
+
+    Starting a task for a key that already has one either keeps
+    the existing task or replaces it, so work is never duplicated.
+    Finished tasks are forgotten automatically.
+
+    Args:
+        loop (typing.Optional[asyncio.AbstractEventLoop]): Loop to create tasks on.
+    """
+
+    def __init__(self, loop=None):
+        self._loop = loop
+        self._tasks = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, key):
+        return key in self._tasks
+
+    def keys(self):
+        return self._tasks.keys()
+
+    def start(self, key, coro, replace=False):
+        """
+        Run a coroutine as the task for a key.
+
+        Args:
+            key (typing.Hashable): Key to register the task under.
+            coro (typing.Coroutine): Coroutine to run.
+            replace (bool): Whether to cancel a running task for the key.
+                If `False` and a task is running, `coro` is closed without running.
+
+        Returns:
+            asyncio.Task: The task now registered for the key.
+        """
+        existing = self._tasks.get(key)
+        # Finished tasks are only forgotten on the next loop iteration
+        if existing and not existing.done():
+            if not replace:
+                coro.close()
+                return existing
+
+            existing.cancel()
+
+        loop = self._loop or get_event_loop()
+        task = self._tasks[key] = loop.create_task(coro)
+        task.add_done_callback(partial(self._forget, key))
+        return task
+
+    def cancel(self, key):
+        """
+        Cancel the task for a key.
+
+        Returns:
+            bool: Whether a task was running.
+        """
+        task = self._tasks.pop(key, None)
+        if not task:
+            return False
+
+        task.cancel()
+        return True
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+        if not task.cancelled() and task.exception():
+            logger.error(f"Task for {key} failed.", exc_info=task.exception())
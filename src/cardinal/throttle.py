@@ -0,0 +1,150 @@
+from asyncio import gather, sleep
+from logging import getLogger
+from time import monotonic
+
+from discord import HTTPException
+
+logger = getLogger(__name__)
+
+
+def _is_transient(exc):
+    # Rate limits that outlasted discord.py's own retries and server-side errors
+    return isinstance(exc, HTTPException) and (exc.status == 429 or exc.status >= 500)
+
+
+class RateLimiter:
+    """
+    Space out operations evenly to at most `rate` per second.
+
+    Args:
+        rate (float): Maximum number of operations per second.
+        clock (typing.Callable[[], float]): Monotonic time source, mainly for testing.
+    """
+
+    def __init__(self, rate, clock=monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be strictly positive.")
+
+        self._interval = 1 / rate
+        self._clock = clock
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        """Wait until the next operation may start."""
+        now = self._clock()
+        slot = max(self._next_slot, now)
+        self._next_slot = slot + self._interval
+
+        if slot > now:
+            await sleep(slot - now)
+
+
+class BulkProgress:
+    """
+    Progress and throughput of a bulk operation.
+
+    Attributes:
+        total (int): Number of items queued so far.
+        done (int): Number of items processed successfully.
+        failed (int): Number of items that failed for good.
+        errors (list[tuple]): `(item, exception)` of the first few failures.
+    """
+
+    max_errors = 10
+
+    def __init__(self, clock=monotonic):
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.errors = []
+        self._clock = clock
+        self._started = clock()
+
+    @property
+    def remaining(self):
+        return self.total - self.done - self.failed
+
+    @property
+    def elapsed(self):
+        return self._clock() - self._started
+
+    @property
+    def rate(self):
+        """float: Processed items per second."""
+        elapsed = self.elapsed
+        return (self.done + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.done}/{self.total} done, {self.failed} failed "
+            f"in {self.elapsed:.1f}s ({self.rate:.1f}/s)"
+        )
+
+    def add_error(self, item, exc):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((item, exc))
+
+
+async def run_bulk(
+    fn,
+    items,
+    *,
+    concurrency=1,
+    limiter=None,
+    retries=3,
+    backoff=1.0,
+    progress=None,
+):
+    """
+    Call an async function for many items with bounded concurrency and pacing.
+
+    Failures do not abort the run. Rate limits and server errors are retried
+    with exponential backoff, everything else is recorded as failed right away.
+    Items that already succeeded stay done, so re-running with the remaining
+    items resumes the operation.
+
+    Args:
+        fn (typing.Callable[[typing.Any], typing.Awaitable]): Function to call per item.
+        items (typing.Iterable): Items to process.
+        concurrency (int): Maximum number of calls in flight.
+        limiter (typing.Optional[RateLimiter]): Limiter to acquire before every call.
+        retries (int): Maximum number of retries for transient errors per item.
+        backoff (float): Delay before the first retry in seconds, doubled for each one.
+        progress (typing.Optional[BulkProgress]): Progress object to update,
+            e.g. to observe a running operation.
+
+    Returns:
+        BulkProgress: Final progress of the operation.
+    """
+    items = list(items)
+    progress = progress or BulkProgress()
+    progress.total += len(items)
+    queue = iter(items)
+
+    async def call(item):
+        for attempt in range(retries + 1):
+            if limiter:
+                await limiter.acquire()
+
+            try:
+                await fn(item)
+            except Exception as e:
+                if attempt < retries and _is_transient(e):
+                    await sleep(backoff * 2 ** attempt)
+                    continue
+
+                logger.debug(f"Bulk operation failed for {item}.", exc_info=e)
+                progress.add_error(item, e)
+                return
+
+            progress.done += 1
+            return
+
+    async def worker():
+        # Workers share one iterator, so each item is processed exactly once
+        for item in queue:
+            await call(item)
+
+    await gather(*(worker() for _ in range(min(concurrency, len(items)))))
+    return progress
@@ -33,6 +33,23 @@ def format_message(msg):
         )
 
 
+def has_role(member, role_id):
+    """
+    Check if a member has a role without resolving the member's role objects.
+
+    Args:
+        member (discord.Member): Member to check.
+        role_id (int): Snowflake ID of the role.
+
+    Returns:
+        bool: Whether the member has the role.
+    """
+    # Private discord.py API: Member._roles is a SnowflakeList, a sorted array
+    # of role IDs searched by bisection. Checked against discord.py 1.7
+    # (pinned as ^1.5), test_has_role_compat in test_utils.py guards it.
+    return member._roles.has(role_id)
+
+
 async def prompt(msg, ctx, timeout=60.0):
     """
     Prompt a user with a given message
@@ -19,10 +19,13 @@ from discord.ext.commands import (
     UserInputError,
 )
 from pytest import fixture, mark, raises
+from sqlalchemy.orm import Session
 
 from cardinal.bot import Bot, intents
 from cardinal.context import Context
+from cardinal.db import QueryProfiler
 from cardinal.errors import UserBlacklisted
+from cardinal.metrics import Metrics
 
 
 @fixture
@@ -36,8 +39,18 @@ def scoped_session(mocker):
 
 
 @fixture
-def context_factory(scoped_session):
-    return partial(Context, scoped_session)
+def context_factory(mocker, scoped_session):
+    return partial(Context, scoped_session, mocker.Mock())
+
+
+@fixture
+def metrics():
+    return Metrics()
+
+
+@fixture
+def query_profiler(metrics):
+    return QueryProfiler(metrics)
 
 
 @fixture
@@ -46,10 +59,20 @@ def baseclass_ctor(mocker):
 
 
 @fixture
-def bot(baseclass_ctor, context_factory, mocker, request, scoped_session):
+def bot(
+    baseclass_ctor,
+    context_factory,
+    metrics,
+    mocker,
+    query_profiler,
+    request,
+    scoped_session,
+):
     kwargs = {
         "context_factory": context_factory,
         "default_game": None,
+        "metrics": metrics,
+        "query_profiler": query_profiler,
         "scoped_session": scoped_session,
     }
     kwargs.update(getattr(request, "param", {}))  # Use request param if provided
@@ -74,6 +97,8 @@ class TestCtor:
         assert bot._context_factory is context_factory
         assert bot._event_counter == 0
         assert bot._session is scoped_session
+        assert not bot.event_counts
+        assert not bot.session_event_counts
 
 
 @mark.asyncio
@@ -94,14 +119,108 @@ class TestRunEvent:
         run_event.assert_called_once_with(*args, **kwargs)
         event_context.set.assert_called_once_with(bot._event_counter)
         scoped_session.remove.assert_called_once_with()
+        assert bot.event_counts[2] == 1
+        assert bot.session_event_counts[2] == 1
 
     @mark.parametrize(["run_event"], [[{"side_effect": Exception()}]], indirect=True)
     async def test_exception(self, run_event, bot, scoped_session):
         with raises(Exception):
-            await bot._run_event()
+            await bot._run_event(None, "test")
 
         scoped_session.remove.assert_called_once_with()
 
+    async def test_no_session(self, bot, event_context, run_event, scoped_session):
+        scoped_session.registry.has.return_value = False
+
+        await bot._run_event(None, "test")
+
+        scoped_session.remove.assert_not_called()
+        assert bot.event_counts["test"] == 1
+        assert bot.session_event_counts["test"] == 0
+
+    async def test_latency(self, bot, metrics, mocker, run_event):
+        listener = mocker.Mock(__qualname__="Cog.on_test")
+
+        await bot._run_event(listener, "on_test")
+
+        key = (("event", "on_test"), ("listener", "Cog.on_test"))
+        assert metrics.histograms("cardinal_event_duration_seconds")[key].count == 1
+        assert metrics.histograms("cardinal_event_queries")[key].count == 1
+
+
+@mark.asyncio
+class TestInvoke:
+    @fixture
+    def invoke(self, mocker):
+        return mocker.patch("cardinal.bot.BaseBot.invoke", new_callable=mocker.CoroMock)
+
+    async def test_command(self, bot, invoke, metrics, mocker):
+        ctx = mocker.Mock()
+        ctx.command.qualified_name = "test command"
+
+        await bot.invoke(ctx)
+
+        invoke.assert_called_once_with(ctx)
+        key = (("command", "test command"),)
+        assert metrics.histograms("cardinal_command_duration_seconds")[key].count == 1
+        assert metrics.histograms("cardinal_command_queries")[key].count == 1
+
+    async def test_no_command(self, bot, invoke, metrics, mocker):
+        ctx = mocker.Mock()
+        ctx.command = None
+
+        await bot.invoke(ctx)
+
+        invoke.assert_called_once_with(ctx)
+        assert not metrics.histograms("cardinal_command_duration_seconds")
+
+
+@mark.asyncio
+class TestMetricsServer:
+    @fixture
+    def metrics_server(self, mocker):
+        server = mocker.Mock()
+        server.start = mocker.CoroMock()
+        server.stop = mocker.CoroMock()
+        return server
+
+    async def test_start(self, bot, metrics_server, mocker):
+        start = mocker.patch("cardinal.bot.BaseBot.start", new_callable=mocker.CoroMock)
+        bot._metrics_server = metrics_server
+
+        await bot.start("token")
+
+        metrics_server.start.assert_called_once_with()
+        start.assert_called_once_with("token")
+
+    async def test_close(self, bot, metrics_server, mocker):
+        close = mocker.patch("cardinal.bot.BaseBot.close", new_callable=mocker.CoroMock)
+        bot._metrics_server = metrics_server
+
+        await bot.close()
+
+        close.assert_called_once_with()
+        metrics_server.stop.assert_called_once_with()
+
+    async def test_close_http_session(self, bot, mocker):
+        mocker.patch("cardinal.bot.BaseBot.close", new_callable=mocker.CoroMock)
+        http_session = mocker.Mock()
+        http_session.close = mocker.CoroMock()
+        bot._http_session = http_session
+
+        await bot.close()
+
+        http_session.close.assert_called_once_with()
+
+    async def test_close_response_cache(self, bot, mocker):
+        mocker.patch("cardinal.bot.BaseBot.close", new_callable=mocker.CoroMock)
+        response_cache = mocker.Mock()
+        bot._response_cache = response_cache
+
+        await bot.close()
+
+        response_cache.close.assert_called_once_with()
+
 
 @mark.asyncio
 async def test_on_ready(bot, caplog, mocker):
@@ -121,7 +240,9 @@ async def test_on_ready(bot, caplog, mocker):
 class TestOnMessage:
     @fixture
     def ctx(self, mocker):
-        return mocker.Mock()
+        ctx = mocker.Mock()
+        ctx.session.run_sync = mocker.CoroMock()
+        return ctx
 
     @fixture
     def msg(self, mocker):
@@ -155,7 +276,7 @@ class TestOnMessage:
         ctx.command_failed = True
 
         await bot.on_message(msg)
-        ctx.session.commit.assert_not_called()
+        ctx.session.run_sync.assert_not_called()
 
     async def test_commit_no_session(self, bot, ctx, msg):
         ctx.command_failed = False
@@ -171,7 +292,7 @@ class TestOnMessage:
 
         await bot.on_message(msg)
         ctx.session.registry.has.assert_called_once_with()
-        ctx.session.commit.assert_called_once_with()
+        ctx.session.run_sync.assert_called_once_with(Session.commit)
 
 
 @mark.asyncio
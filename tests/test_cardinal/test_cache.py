@@ -0,0 +1,150 @@
+from pytest import fixture, mark, raises
+
+from cardinal.cache import ResponseCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@fixture
+def clock():
+    return FakeClock()
+
+
+@fixture
+def cache(clock):
+    return TTLCache(maxsize=2, ttl=10, clock=clock)
+
+
+def test_invalid_maxsize():
+    with raises(ValueError):
+        TTLCache(maxsize=0)
+
+
+def test_get_set(cache):
+    sentinel = object()
+    assert cache.get("a", sentinel) is sentinel
+
+    cache.set("a", None)
+    assert cache.get("a", sentinel) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # Mark as recently used
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_expiry(cache, clock):
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=20)
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_pop_discard_clear(cache):
+    cache.set(("x", 1), 1)
+    cache.set(("y", 1), 2)
+
+    assert cache.pop(("x", 1)) == 1
+    assert cache.pop(("x", 1), "default") == "default"
+
+    cache.set(("x", 2), 3)
+    assert cache.discard_where(lambda key: key[0] == "x") == 1
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+@mark.asyncio
+class TestResponseCache:
+    @fixture
+    def fetch(self, mocker):
+        return mocker.CoroMock(side_effect=lambda key: [key] if key else [])
+
+    async def test_hit(self, fetch):
+        namespace = ResponseCache().namespace("test", ttl=60)
+
+        assert await namespace.fetch("a", fetch, "a") == ["a"]
+        assert await namespace.fetch("a", fetch, "a") == ["a"]
+
+        fetch.assert_called_once_with("a")
+        assert (namespace.hits, namespace.misses) == (1, 1)
+
+    async def test_set(self, fetch):
+        namespace = ResponseCache().namespace("test", ttl=60)
+
+        await namespace.set("a", ["stored"])
+
+        assert await namespace.fetch("a", fetch, "a") == ["stored"]
+        fetch.assert_not_called()
+
+    async def test_namespaces_separate(self, fetch):
+        cache = ResponseCache()
+        first = cache.namespace("first", ttl=60)
+        second = cache.namespace("second", ttl=60)
+
+        await first.fetch("a", fetch, "a")
+        await second.fetch("a", fetch, "a")
+
+        assert fetch.call_count == 2
+        assert cache.namespace("first", ttl=0) is first
+        assert list(cache.collect("misses")) == [
+            ({"namespace": "first"}, 1),
+            ({"namespace": "second"}, 1),
+        ]
+
+    async def test_negative_disabled(self, fetch):
+        namespace = ResponseCache().namespace("test", ttl=60)
+
+        await namespace.fetch("", fetch, "")
+        await namespace.fetch("", fetch, "")
+
+        assert fetch.call_count == 2
+
+    async def test_negative(self, fetch):
+        namespace = ResponseCache().namespace("test", ttl=60, negative_ttl=60)
+
+        await namespace.fetch("", fetch, "")
+        await namespace.fetch("", fetch, "")
+
+        fetch.assert_called_once_with("")
+
+    async def test_error_not_cached(self, mocker):
+        fetch = mocker.CoroMock(side_effect=[ValueError, ["a"]])
+        namespace = ResponseCache().namespace("test", ttl=60)
+
+        with raises(ValueError):
+            await namespace.fetch("a", fetch)
+
+        assert await namespace.fetch("a", fetch) == ["a"]
+
+    async def test_persistent(self, fetch, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = ResponseCache(path=path)
+        await cache.namespace("test", ttl=60).fetch("a", fetch, "a")
+        cache.close()
+
+        cache = ResponseCache(path=path)
+        namespace = cache.namespace("test", ttl=60)
+        assert await namespace.fetch("a", fetch, "a") == ["a"]
+        cache.close()
+
+        fetch.assert_called_once_with("a")
+        assert namespace.hits == 1
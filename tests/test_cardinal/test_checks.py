@@ -1,13 +1,14 @@
-from pytest import fixture, raises
+from pytest import fixture, mark, raises
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
 from cardinal.checks import channel_whitelisted
-from cardinal.db import Base
-from cardinal.db.whitelist import WhitelistedChannel
+from cardinal.db import Base, ExecutorScopedSession
+from cardinal.db.whitelist import WhitelistedChannel, WhitelistIndex
 from cardinal.errors import ChannelNotWhitelisted
 
 
+@mark.asyncio
 class TestChannelWhitelisted:
     @fixture(scope="class")
     def engine(self):
@@ -26,7 +27,8 @@ class TestChannelWhitelisted:
     @fixture
     def ctx(self, mocker, session):
         ctx = mocker.Mock()
-        ctx.session = session
+        ctx.session = ExecutorScopedSession(lambda: session)
+        ctx.whitelist = WhitelistIndex()
         ctx.channel.id = 123456789
         ctx.channel.mention = "<#123456789>"
 
@@ -38,66 +40,100 @@ class TestChannelWhitelisted:
 
     # Helpers
     @staticmethod
-    def expect_fail(command, ctx):
+    async def expect_fail(command, ctx):
         pred = command.__commands_checks__[0]
         with raises(ChannelNotWhitelisted) as exc_info:
-            pred(ctx)
+            await pred(ctx)
 
         exc = exc_info.value
         assert ctx.channel is exc.channel
 
     @staticmethod
-    def expect_success(command, ctx):
+    async def expect_success(command, ctx):
         pred = command.__commands_checks__[0]
-        assert pred(ctx)
+        assert await pred(ctx)
 
     @staticmethod
     def whitelist_channel(session, ctx):
         session.add(WhitelistedChannel(channel_id=ctx.channel.id))
 
     # Tests
-    def test_not_whitelisted_no_predicate(self, command, ctx):
+    async def test_not_whitelisted_no_predicate(self, command, ctx):
         wrapped_command = (channel_whitelisted())(command)
-        self.expect_fail(wrapped_command, ctx)
+        await self.expect_fail(wrapped_command, ctx)
 
-    def test_not_whitelisted_uncallable_predicate(self, command, ctx, mocker):
+    async def test_not_whitelisted_uncallable_predicate(self, command, ctx, mocker):
         exc_pred = mocker.NonCallableMock()
         wrapped_command = (channel_whitelisted(exc_pred))(command)
-        self.expect_fail(wrapped_command, ctx)
+        await self.expect_fail(wrapped_command, ctx)
 
-    def test_not_whitelisted_predicate_no_exception(self, command, ctx, mocker):
+    async def test_not_whitelisted_predicate_no_exception(self, command, ctx, mocker):
         exc_pred = mocker.Mock(return_value=False)
         wrapped_command = (channel_whitelisted(exc_pred))(command)
-        self.expect_fail(wrapped_command, ctx)
+        await self.expect_fail(wrapped_command, ctx)
         exc_pred.assert_called_once_with(ctx)
 
-    def test_not_whitelisted_predicate_exception(self, command, ctx, mocker):
+    async def test_not_whitelisted_predicate_exception(self, command, ctx, mocker):
         exc_pred = mocker.Mock(return_value=True)
         wrapped_command = (channel_whitelisted(exc_pred))(command)
-        self.expect_success(wrapped_command, ctx)
+        await self.expect_success(wrapped_command, ctx)
         exc_pred.assert_called_once_with(ctx)
 
-    def test_whitelisted_no_predicate(self, command, ctx, session):
+    async def test_whitelisted_no_predicate(self, command, ctx, session):
         self.whitelist_channel(session, ctx)
         wrapped_command = (channel_whitelisted())(command)
-        self.expect_success(wrapped_command, ctx)
+        await self.expect_success(wrapped_command, ctx)
 
-    def test_whitelisted_uncallable_predicate(self, command, ctx, mocker, session):
+    async def test_whitelisted_uncallable_predicate(
+        self, command, ctx, mocker, session
+    ):
         self.whitelist_channel(session, ctx)
         exc_pred = mocker.NonCallableMock()
         wrapped_command = (channel_whitelisted(exc_pred))(command)
-        self.expect_success(wrapped_command, ctx)
+        await self.expect_success(wrapped_command, ctx)
 
-    def test_whitelisted_predicate_no_exception(self, command, ctx, mocker, session):
+    async def test_whitelisted_predicate_no_exception(
+        self, command, ctx, mocker, session
+    ):
         self.whitelist_channel(session, ctx)
         exc_pred = mocker.Mock(return_value=False)
         wrapped_command = (channel_whitelisted(exc_pred))(command)
-        self.expect_success(wrapped_command, ctx)
+        await self.expect_success(wrapped_command, ctx)
         exc_pred.assert_not_called()
 
-    def test_whitelisted_predicate_exception(self, command, ctx, mocker, session):
+    async def test_whitelisted_predicate_exception(self, command, ctx, mocker, session):
         self.whitelist_channel(session, ctx)
         exc_pred = mocker.Mock(return_value=True)
         wrapped_command = (channel_whitelisted(exc_pred))(command)
-        self.expect_success(wrapped_command, ctx)
+        await self.expect_success(wrapped_command, ctx)
         exc_pred.assert_not_called()
+
+    async def test_index_loaded_once(self, command, ctx, mocker, session):
+        self.whitelist_channel(session, ctx)
+        wrapped_command = (channel_whitelisted())(command)
+        await self.expect_success(wrapped_command, ctx)
+
+        query = mocker.spy(session, "query")
+        await self.expect_success(wrapped_command, ctx)
+        query.assert_not_called()
+
+    async def test_index_invalidate(self, command, ctx, session):
+        wrapped_command = (channel_whitelisted())(command)
+        await self.expect_fail(wrapped_command, ctx)
+
+        # Out-of-band change is invisible until the index is invalidated
+        self.whitelist_channel(session, ctx)
+        await self.expect_fail(wrapped_command, ctx)
+
+        ctx.whitelist.invalidate()
+        await self.expect_success(wrapped_command, ctx)
+
+    async def test_index_add_discard(self, command, ctx):
+        wrapped_command = (channel_whitelisted())(command)
+        await self.expect_fail(wrapped_command, ctx)
+
+        ctx.whitelist.add(ctx.channel.id)
+        await self.expect_success(wrapped_command, ctx)
+
+        ctx.whitelist.discard(ctx.channel.id)
+        await self.expect_fail(wrapped_command, ctx)
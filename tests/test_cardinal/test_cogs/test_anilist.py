@@ -0,0 +1,166 @@
+from asyncio import gather
+
+from pytest import fixture, mark
+
+from cardinal.cache import ResponseCache
+from cardinal.cogs.anilist import Anilist, AnilistClient, _build_query, make_embed
+
+
+def media(media_id):
+    return {"id": media_id, "episodes": 12}
+
+
+def test_build_query():
+    query, variables = _build_query(
+        [("search", "a", True, ()), ("search", "b", False, ("NOVEL",)), ("id", 5, True)]
+    )
+
+    assert "q0: Media(type: ANIME, search: $search0" in query
+    assert "q1: Media(type: MANGA, format_in: $format1, search: $search1" in query
+    assert "q2: Media(id: $id2) { ...baseFields ...animeFields }" in query
+    assert "fragment baseFields on Media" in query
+    assert variables == {"search0": "a", "search1": "b", "format1": ["NOVEL"], "id2": 5}
+
+
+@mark.asyncio
+class TestAnilistClient:
+    @fixture
+    def responses(self):
+        # (status, headers, data) per request, data maps search terms to results
+        return []
+
+    @fixture
+    def http(self, mocker, responses):
+        http = mocker.Mock()
+
+        def post(url, json, raise_for_status):
+            status, headers, data = responses.pop(0)
+            variables = json["variables"]
+            body = {
+                "data": {
+                    f"q{i}": data.get(variables[f"search{i}"])
+                    for i in range(len(variables))
+                }
+            }
+            resp = mocker.Mock(status=status, headers=headers)
+            resp.json = mocker.CoroMock(return_value=body)
+            context = mocker.MagicMock()
+            context.__aenter__.return_value = resp
+            return context
+
+        http.post.side_effect = post
+        return http
+
+    @fixture
+    def client(self, http):
+        return AnilistClient(http, ResponseCache(), batch_delay=0)
+
+    async def test_batch(self, client, http, responses):
+        responses.append((404, {}, {"a": media(1), "b": media(2)}))
+
+        results = await gather(
+            client.search("a", True),
+            client.search("b", True),
+            client.search("a", True),
+            client.search("c", True),
+        )
+
+        assert results == [media(1), media(2), media(1), None]
+        http.post.assert_called_once()
+        assert len(http.post.call_args[1]["json"]["variables"]) == 3
+
+    async def test_cached(self, client, http, responses):
+        responses.append((200, {}, {"a": media(1)}))
+
+        await client.search("a", True)
+        assert await client.search("a", True) == media(1)
+
+        http.post.assert_called_once()
+
+    async def test_max_batch_size(self, client, http, responses):
+        client._max_batch_size = 2
+        responses.extend([(200, {}, {"a": media(1), "b": media(2)})] * 2)
+
+        await gather(*(client.search(term, True) for term in "abc"))
+
+        assert http.post.call_count == 2
+
+    @fixture
+    def sleep(self, mocker):
+        mocker.patch("cardinal.cogs.anilist.monotonic", return_value=100.0)
+        return mocker.patch("cardinal.cogs.anilist.sleep", new_callable=mocker.CoroMock)
+
+    async def test_rate_limited(self, client, responses, sleep):
+        responses.extend(
+            [
+                (429, {"Retry-After": "30"}, {}),
+                (200, {}, {"a": media(1)}),
+            ]
+        )
+
+        assert await client.search("a", True) == media(1)
+        sleep.assert_called_once_with(30.0)
+
+    async def test_pacing(self, client, responses, sleep):
+        responses.append(
+            (200, {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "3"}, {})
+        )
+        await client.search("a", True)
+        sleep.assert_not_called()
+
+        # Close to the limit, requests are spaced out to one per second
+        await client._pace()
+        await client._pace()
+        sleep.assert_called_once_with(1.0)
+        assert client._not_before == 102.0
+
+
+class TestRenderEmbed:
+    @fixture
+    def item(self):
+        return {
+            "id": 1,
+            "title": {"english": "Title", "romaji": "Taitoru"},
+            "coverImage": {"large": "https://example.com/cover.jpg"},
+            "meanScore": 80,
+            "genres": ["Drama"],
+            "description": "Description<br>",
+            "format": "TV",
+            "source": "ORIGINAL",
+            "status": "FINISHED",
+            "startDate": {"year": 2020, "month": 1, "day": 1},
+            "endDate": {"year": 2020, "month": 3, "day": 25},
+            "nextAiringEpisode": None,
+            "idMal": 1,
+            "siteUrl": "https://anilist.co/anime/1",
+            "episodes": 12,
+        }
+
+    @fixture
+    def cog(self, mocker):
+        return Anilist(mocker.Mock(), ResponseCache())
+
+    @fixture
+    def render(self, mocker):
+        return mocker.patch("cardinal.cogs.anilist.make_embed", wraps=make_embed)
+
+    def test_cached(self, cog, item, render):
+        first = cog._render_embed(item)
+        second = cog._render_embed(dict(item))
+
+        render.assert_called_once()
+        assert first.to_dict() == second.to_dict() == make_embed(item).to_dict()
+
+    def test_changed(self, cog, item, render):
+        cog._render_embed(item)
+        item["meanScore"] = 81
+
+        embed = cog._render_embed(item)
+
+        assert render.call_count == 2
+        assert embed.fields[0].value == "81 %"
+
+    def test_copies(self, cog, item):
+        cog._render_embed(item).set_field_at(0, name="Changed", value="-")
+
+        assert cog._render_embed(item).fields[0].name == "Mean Score"
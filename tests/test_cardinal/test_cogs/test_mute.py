@@ -0,0 +1,291 @@
+import tracemalloc
+from asyncio import CancelledError, gather, sleep
+from types import SimpleNamespace
+
+from discord.utils import SnowflakeList
+from pytest import fixture, mark, raises
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from cardinal.cogs.mute import (
+    Mute,
+    _apply_overwrites,
+    _sync_mute_users,
+    new_channel_overwrite,
+)
+from cardinal.db import Base, ExecutorScopedSession, MuteGuild, MuteUser
+from cardinal.metrics import Metrics
+from cardinal.scheduler import TaskRegistry
+from cardinal.throttle import RateLimiter
+
+ROLE_ID = 100
+
+
+@fixture
+def metrics():
+    return Metrics()
+
+
+@fixture
+def session(mocker):
+    # Doubles as its own scoped session registry
+    session = mocker.Mock()
+    session.return_value = session
+    return session
+
+
+@fixture
+def guild_config(mocker):
+    guild_config = mocker.Mock()
+    guild_config.fetch = mocker.CoroMock(return_value=SimpleNamespace(role_id=ROLE_ID))
+    return guild_config
+
+
+@fixture
+def cog(guild_config, metrics, mocker, session):
+    loop = mocker.Mock()
+    cog = Mute(
+        bot=mocker.Mock(),
+        loop=loop,
+        guild_config=guild_config,
+        scoped_session=ExecutorScopedSession(session),
+        sessionmaker=mocker.Mock(),
+        metrics=metrics,
+    )
+
+    # Background task is never run
+    loop.create_task.call_args[0][0].close()
+    return cog
+
+
+def make_member(member_id, guild_id=1, role_ids=()):
+    return SimpleNamespace(
+        id=member_id,
+        guild=SimpleNamespace(id=guild_id),
+        _roles=SnowflakeList(role_ids),
+    )
+
+
+def test_lock_member(cog):
+    member = make_member(1)
+
+    with cog._lock_member(member):
+        with cog._lock_member(member):
+            assert cog._member_is_locked(member)
+
+        assert cog._member_is_locked(member)
+
+    assert not cog._member_is_locked(member)
+    assert not cog._locks
+
+
+def test_locked_members_metric(cog, metrics):
+    with cog._lock_member(make_member(1)):
+        assert "cardinal_mute_locked_members 1" in metrics.render()
+
+    assert "cardinal_mute_locked_members 0" in metrics.render()
+
+
+def test_lock_table_memory_flat(cog):
+    # Simulate a day of member updates on a large guild:
+    # every update checks the lock, a few of them lock a member meanwhile
+    member = make_member(0)
+    locked = make_member(-1)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        for i in range(1_000_000):
+            member.id = i
+            if i % 1000 == 0:
+                with cog._lock_member(locked):
+                    cog._member_is_locked(member)
+            else:
+                cog._member_is_locked(member)
+
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert not cog._locks
+    assert current - baseline < 64 * 1024
+
+
+@mark.asyncio
+class TestOnMemberUpdate:
+    @fixture
+    def get_mute_user(self, mocker):
+        return mocker.patch("cardinal.cogs.mute._get_mute_user", return_value=None)
+
+    @fixture
+    def commit(self, mocker):
+        return mocker.patch("cardinal.cogs.mute.Session.commit")
+
+    async def test_unrelated_update(self, cog, commit, get_mute_user):
+        await cog.on_member_update(make_member(1, role_ids=[1]), make_member(1))
+
+        get_mute_user.assert_not_called()
+        commit.assert_not_called()
+
+    async def test_no_config(self, cog, get_mute_user, guild_config):
+        guild_config.fetch.coro.return_value = None
+
+        await cog.on_member_update(make_member(1), make_member(1, role_ids=[ROLE_ID]))
+
+        get_mute_user.assert_not_called()
+
+    async def test_locked(self, cog, get_mute_user):
+        before = make_member(1)
+
+        with cog._lock_member(before):
+            await cog.on_member_update(before, make_member(1, role_ids=[ROLE_ID]))
+
+        get_mute_user.assert_not_called()
+
+    async def test_mute_added(self, cog, commit, get_mute_user, session):
+        await cog.on_member_update(make_member(1), make_member(1, role_ids=[ROLE_ID]))
+
+        (db_mute,), _ = session.add.call_args
+        assert isinstance(db_mute, MuteUser)
+        assert (db_mute.user_id, db_mute.guild_id) == (1, 1)
+        commit.assert_called_once_with(session)
+
+    async def test_mute_removed(self, cog, commit, get_mute_user, session):
+        db_mute = get_mute_user.return_value = MuteUser(user_id=1, guild_id=1)
+
+        await cog.on_member_update(make_member(1, role_ids=[ROLE_ID]), make_member(1))
+
+        session.delete.assert_called_once_with(db_mute)
+        commit.assert_called_once_with(session)
+
+    async def test_row_matches(self, cog, commit, get_mute_user, session):
+        get_mute_user.return_value = MuteUser(user_id=1, guild_id=1)
+
+        await cog.on_member_update(make_member(1), make_member(1, role_ids=[ROLE_ID]))
+
+        session.add.assert_not_called()
+        commit.assert_not_called()
+
+
+@mark.asyncio
+async def test_apply_overwrites(mocker):
+    mocker.patch("cardinal.cogs.mute.OVERWRITE_RATE", 1000)
+    role = mocker.Mock()
+
+    def make_channel(done=False, error=None):
+        channel = mocker.Mock()
+        channel.overwrites_for.return_value = new_channel_overwrite if done else None
+        channel.set_permissions = mocker.CoroMock(side_effect=error)
+        return channel
+
+    category = make_channel()
+    text_channels = [make_channel(), make_channel(done=True)]
+    voice_channel = make_channel(error=ValueError)
+    guild = mocker.Mock(
+        categories=[category],
+        text_channels=text_channels,
+        voice_channels=[voice_channel],
+    )
+
+    progress = await _apply_overwrites(guild, role)
+
+    category.set_permissions.assert_called_once()
+    text_channels[0].set_permissions.assert_called_once()
+    text_channels[1].set_permissions.assert_not_called()
+    assert (progress.total, progress.done, progress.failed) == (3, 2, 1)
+
+
+def test_sync_mute_users():
+    engine = create_engine("sqlite:///")
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    session.add_all(
+        [
+            MuteGuild(guild_id=1, role_id=10),
+            MuteGuild(guild_id=2, role_id=20),
+            MuteUser(guild_id=1, user_id=1),
+            MuteUser(guild_id=1, user_id=2),
+            MuteUser(guild_id=2, user_id=3),
+        ]
+    )
+    session.commit()
+
+    added, deleted = _sync_mute_users(session, 1, [2, 3, 4, 5, 6], chunk_size=2)
+    session.commit()
+
+    assert (added, deleted) == (4, 1)
+    rows = session.query(MuteUser.guild_id, MuteUser.user_id).order_by(
+        MuteUser.guild_id, MuteUser.user_id
+    )
+    assert rows.all() == [(1, 2), (1, 3), (1, 4), (1, 5), (1, 6), (2, 3)]
+
+    # Temporary table is gone, so syncing again works
+    assert _sync_mute_users(session, 1, []) == (0, 5)
+
+
+@mark.asyncio
+async def test_catch_up_unmutes(cog, metrics):
+    in_flight = 0
+    max_in_flight = 0
+    unmuted = []
+
+    async def expire_mute(guild_id, user_id):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await sleep(0.01)  # Outlasts the 1ms pacing, so unmutes overlap
+        unmuted.append((guild_id, user_id))
+        in_flight -= 1
+
+    cog._expire_mute = expire_mute
+    cog._unmute_tasks = TaskRegistry()
+    cog._catch_up_limiter = RateLimiter(1000)
+    keys = [(1, user_id) for user_id in range(10)]
+
+    await cog._catch_up_unmutes(keys)
+
+    assert sorted(unmuted) == keys
+    assert max_in_flight == cog._catch_up_concurrency
+    rendered = metrics.render()
+    assert "cardinal_mute_catch_up_remaining 0" in rendered
+    assert 'cardinal_mute_catch_up_total{status="done"} 10' in rendered
+
+
+@mark.asyncio
+async def test_catch_up_unmute_cancelled(cog, metrics):
+    unmuted = []
+
+    async def expire_mute(guild_id, user_id):
+        await sleep(0.01)
+        unmuted.append((guild_id, user_id))
+
+    async def cancel_unmute():
+        await sleep(0)
+        assert cog._cancel_unmute(1, 0)  # A moderator unmuted the member
+
+    cog._expire_mute = expire_mute
+    cog._unmute_tasks = TaskRegistry()
+    cog._catch_up_limiter = RateLimiter(1000)
+    keys = [(1, user_id) for user_id in range(5)]
+
+    await gather(cog._catch_up_unmutes(keys), cancel_unmute())
+
+    assert sorted(unmuted) == keys[1:]
+    assert 'cardinal_mute_catch_up_total{status="done"} 5' in metrics.render()
+
+
+@mark.asyncio
+async def test_reconcile_mutes_survives_errors(mocker, cog):
+    cog._bot.wait_until_ready = mocker.CoroMock()
+    cog._reconcile_once = mocker.CoroMock(side_effect=[ValueError(), None])
+    mocker.patch(
+        "cardinal.cogs.mute.sleep",
+        new_callable=mocker.CoroMock,
+        side_effect=[None, CancelledError()],
+    )
+
+    with raises(CancelledError):
+        await cog._reconcile_mutes()
+
+    assert cog._reconcile_once.call_count == 2
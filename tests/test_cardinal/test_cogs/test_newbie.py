@@ -0,0 +1,438 @@
+from datetime import datetime, timedelta
+
+from discord import DMChannel, Forbidden
+from pytest import fixture, mark
+from sqlalchemy import create_engine
+from sqlalchemy.event import listen
+from sqlalchemy.orm import Session
+
+from cardinal.cogs.newbie import (
+    Newbies,
+    PendingUser,
+    _delete_newbie_user,
+    _delete_newbie_users,
+    _get_overdue_users,
+    _insert_newbie_users,
+    _set_timeout,
+    _update_expiry,
+)
+from cardinal.db import Base, GuildConfigCache, NewbieGuild, NewbieRoleJob, NewbieUser
+from cardinal.metrics import Metrics
+
+JOINED_AT = datetime(2020, 1, 1)
+
+
+@fixture
+def session():
+    engine = create_engine("sqlite:///")
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    session.add(
+        NewbieGuild(guild_id=1, role_id=1, welcome_message="", response_message="")
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_user(session, user_id, expires_at=None):
+    session.add(
+        NewbieUser(
+            user_id=user_id,
+            guild_id=1,
+            message_id=user_id,
+            joined_at=JOINED_AT,
+            expires_at=expires_at,
+        )
+    )
+    session.commit()
+
+
+def test_get_overdue_users(session):
+    add_user(session, 1, datetime.utcnow() - timedelta(minutes=1))
+    add_user(session, 2, datetime.utcnow() + timedelta(minutes=1))
+    add_user(session, 3)
+
+    assert _get_overdue_users(session) == [(1, 1)]
+
+
+def test_delete_newbie_users(session):
+    for user_id in range(1, 4):
+        add_user(session, user_id)
+
+    _delete_newbie_users(session, [(1, 1), (1, 3), (2, 2)])
+    assert session.query(NewbieUser.user_id).all() == [(2,)]
+
+
+def test_update_expiry(session):
+    add_user(session, 1)
+    add_user(session, 2)
+
+    _update_expiry(session, 1, timedelta(hours=2))
+    session.commit()
+    expiry = session.query(NewbieUser.expires_at).distinct().all()
+    assert expiry == [(JOINED_AT + timedelta(hours=2),)]
+
+    _update_expiry(session, 1, None)
+    session.commit()
+    assert session.query(NewbieUser.expires_at).distinct().all() == [(None,)]
+
+
+def test_set_timeout(session):
+    add_user(session, 1)
+
+    _set_timeout(session, 1, timedelta(hours=2))
+    session.commit()
+
+    assert session.query(NewbieGuild).get(1).timeout == timedelta(hours=2)
+    assert session.query(NewbieUser.expires_at).scalar() == JOINED_AT + timedelta(
+        hours=2
+    )
+
+
+def test_insert_newbie_users(session):
+    add_user(session, 1)
+    rows = [
+        {"guild_id": 1, "user_id": user_id, "message_id": 0, "joined_at": JOINED_AT}
+        for user_id in (1, 2)
+    ]
+
+    _insert_newbie_users(session, rows)
+
+    # The already recorded user keeps their message
+    assert session.query(NewbieUser.user_id, NewbieUser.message_id).order_by(
+        NewbieUser.user_id
+    ).all() == [(1, 1), (2, 0)]
+
+
+@fixture
+def bot(mocker):
+    return mocker.Mock()
+
+
+@fixture
+def guild_config(mocker):
+    guild_config = GuildConfigCache()
+    guild_config.fetch = mocker.CoroMock(return_value=mocker.Mock(role_id=10))
+    return guild_config
+
+
+@fixture
+def cog(mocker, bot, guild_config, session):
+    scoped_session = mocker.Mock()
+    scoped_session.run_in_executor = mocker.CoroMock(
+        side_effect=lambda fn, *args, **kwargs: fn(*args, **kwargs)
+    )
+    scoped_session.run_sync = mocker.CoroMock()
+    sessionmaker = mocker.Mock(return_value=mocker.Mock(wraps=session))
+    loop = mocker.Mock()
+    cog = Newbies(bot, loop, guild_config, scoped_session, sessionmaker, Metrics())
+
+    # Background task is never run
+    loop.create_task.call_args[0][0].close()
+    return cog
+
+
+def http_error(mocker, cls=Forbidden):
+    response = mocker.Mock(status=403, reason="reason")
+    return cls(response, "message")
+
+
+def make_member(mocker, guild, user_id, roled=False, bot=False):
+    member = mocker.Mock(id=user_id, guild=guild, bot=bot, joined_at=JOINED_AT)
+    member._roles.has.return_value = roled
+    member.send = mocker.CoroMock(return_value=mocker.Mock(id=100 + user_id))
+    member.add_roles = mocker.CoroMock()
+    member.kick = mocker.CoroMock()
+    return member
+
+
+@mark.asyncio
+async def test_kick_overdue_users(mocker, bot, cog, session):
+    guild = mocker.Mock(id=1)
+    members = {uid: make_member(mocker, guild, uid) for uid in (1, 2)}
+    members[2].kick.coro.side_effect = http_error(mocker)
+    guild.get_member.side_effect = members.get
+    bot.get_guild.side_effect = {1: guild}.get
+
+    for user_id in range(1, 4):
+        add_user(session, user_id, datetime.utcnow() - timedelta(minutes=1))
+    session.add(
+        NewbieGuild(guild_id=2, role_id=1, welcome_message="", response_message="")
+    )
+    session.add(NewbieUser(user_id=4, guild_id=2, message_id=4, joined_at=JOINED_AT))
+    session.commit()
+
+    await cog._kick_overdue_users()
+
+    members[1].kick.assert_called_once()
+    # Kicked and already gone users are removed, failed kicks are kept for retry
+    remaining = session.query(NewbieUser.user_id).order_by(NewbieUser.user_id).all()
+    assert remaining == [(2,), (4,)]
+
+
+@mark.asyncio
+async def test_onboard_members(mocker, bot, cog, session):
+    mocker.patch("cardinal.cogs.newbie.ONBOARDING_BATCH_SIZE", 1)
+    guild = mocker.Mock(id=1)
+    guild.members = [
+        make_member(mocker, guild, 1, roled=True),
+        make_member(mocker, guild, 2),
+        make_member(mocker, guild, 3, bot=True),
+        make_member(mocker, guild, 4),
+        make_member(mocker, guild, 5),  # Already prompted before a restart
+    ]
+    guild.members[3].send.coro.side_effect = http_error(mocker)
+    add_user(session, 5)
+    bot.get_guild.side_effect = {1: guild}.get
+    cog._dm_limiter = mocker.Mock(acquire=mocker.CoroMock())
+
+    await cog._load_pending()
+    await cog._onboard_members()
+
+    guild.members[0].send.assert_not_called()
+    assert guild.members[1].send.call_count == 2  # Prompt and ToS notice
+    guild.members[2].add_roles.assert_called_once()
+    guild.members[4].send.assert_not_called()
+    assert cog._onboarding_progress.failed == 1
+    rows = session.query(NewbieUser.user_id, NewbieUser.message_id).order_by(
+        NewbieUser.user_id
+    )
+    assert rows.all() == [(2, 102), (5, 5)]
+    assert cog._is_pending(1, 2)
+
+
+class TestPendingIndex:
+    @mark.asyncio
+    async def test_load(self, cog, session):
+        add_user(session, 1)
+        add_user(session, 2)
+
+        await cog._load_pending()
+
+        assert cog._is_pending(1, 1) and cog._is_pending(1, 2)
+        assert not cog._is_pending(2, 1)
+        assert cog._pending[1][1].message_id == 1
+
+    @mark.asyncio
+    async def test_add_member(self, mocker, cog, session):
+        cog._pending_loaded = True
+        cog._session.add = session.add
+        cog._session.run_sync.coro.side_effect = lambda fn, *args: fn(session, *args)
+        db_guild = session.query(NewbieGuild).get(1)
+        queries = []
+        listen(session.bind, "before_cursor_execute", lambda *args: queries.append(1))
+        member = make_member(mocker, mocker.Mock(id=1), 5)
+
+        await cog.add_member(db_guild, member)
+
+        # Only the insert, the committed row is not refreshed to index it
+        assert len(queries) == 1
+        assert cog._pending[5][1].message_id == 105
+
+    def test_unindex(self, cog):
+        cog._index_pending(PendingUser(1, 5, 0, JOINED_AT, None))
+        cog._index_pending(PendingUser(2, 5, 0, JOINED_AT, None))
+
+        cog._unindex_pending(1, 5)
+        assert cog._pending[5].keys() == {2}
+        cog._unindex_pending(2, 5)
+        assert 5 not in cog._pending
+
+    @mark.asyncio
+    async def test_message_not_pending(self, mocker, cog):
+        cog._pending_loaded = True
+        msg = mocker.Mock(channel=mocker.Mock(spec=DMChannel))
+
+        await cog.on_message(msg)
+
+        cog._session.run_sync.assert_not_called()
+
+    @mark.asyncio
+    async def test_member_update_not_pending(self, mocker, cog):
+        cog._pending_loaded = True
+        member = mocker.Mock()
+
+        await cog.on_member_update(member, member)
+
+        cog._guild_config.fetch.assert_not_called()
+        cog._session.run_sync.assert_not_called()
+
+    @mark.asyncio
+    async def test_member_update_verified(self, mocker, cog):
+        cog._pending_loaded = True
+        cog._index_pending(PendingUser(1, 5, 0, JOINED_AT, None))
+        before = mocker.Mock(id=5, guild=mocker.Mock(id=1))
+        before._roles.has.return_value = False
+        after = mocker.Mock()
+        after._roles.has.return_value = True
+
+        await cog.on_member_update(before, after)
+
+        assert not cog._is_pending(1, 5)
+        cog._session.run_sync.assert_called_once_with(_delete_newbie_user, 5, 1)
+
+    @mark.asyncio
+    async def test_member_update_unsaved(self, mocker, cog, session):
+        cog._pending_loaded = True
+        # Prompted by onboarding, but not recorded yet
+        cog._unsaved[5] = {
+            1: {
+                "guild_id": 1,
+                "user_id": 5,
+                "message_id": 0,
+                "joined_at": JOINED_AT,
+                "expires_at": None,
+            }
+        }
+        before = mocker.Mock(id=5, guild=mocker.Mock(id=1))
+        before._roles.has.return_value = False
+        after = mocker.Mock()
+        after._roles.has.return_value = True
+
+        await cog.on_member_update(before, after)
+
+        assert not cog._unsaved and not cog._is_pending(1, 5)
+        assert session.query(NewbieUser.user_id).all() == [(5,)]
+        cog._session.run_sync.assert_called_once_with(_delete_newbie_user, 5, 1)
+
+
+class TestReply:
+    @fixture
+    def guild(self, mocker, bot):
+        guild = mocker.Mock(id=1)
+        guild.get_member.return_value = make_member(mocker, guild, 5)
+        bot.get_guild.side_effect = {1: guild}.get
+        bot.user.id = 0
+        return guild
+
+    @fixture
+    def msg(self, mocker):
+        msg = mocker.Mock(channel=mocker.Mock(spec=DMChannel), content=" Yes")
+        msg.author.id = 5
+        msg.author.send = mocker.CoroMock()
+        return msg
+
+    @fixture(autouse=True)
+    def db(self, cog, session):
+        session.query(NewbieGuild).get(1).response_message = "yes"
+        session.commit()
+        cog._session.run_sync.coro.side_effect = lambda fn, *args: fn(session, *args)
+        cog._session.delete = session.delete
+
+    @mark.asyncio
+    async def test_verified(self, cog, guild, msg, session):
+        add_user(session, 5)
+        await cog._load_pending()
+
+        await cog.on_message(msg)
+
+        guild.get_member.return_value.add_roles.assert_called_once()
+        msg.author.send.assert_called_once()
+        assert session.query(NewbieUser).count() == 0
+        assert not cog._is_pending(1, 5)
+
+    @mark.asyncio
+    async def test_wrong_response(self, cog, guild, msg, session):
+        add_user(session, 5)
+        await cog._load_pending()
+        msg.content = "no"
+
+        await cog.on_message(msg)
+
+        guild.get_member.return_value.add_roles.assert_not_called()
+        assert cog._is_pending(1, 5)
+
+    @mark.asyncio
+    async def test_expired(self, cog, guild, msg, session):
+        add_user(session, 5, datetime.utcnow() - timedelta(minutes=1))
+        await cog._load_pending()
+
+        await cog.on_message(msg)
+
+        member = guild.get_member.return_value
+        member.kick.assert_called_once()
+        member.add_roles.assert_not_called()
+        assert session.query(NewbieUser).count() == 0
+        assert not cog._is_pending(1, 5)
+
+
+class TestRoleJob:
+    @fixture
+    def guild(self, mocker, bot):
+        guild = mocker.Mock(id=1)
+        guild.default_role.edit = mocker.CoroMock()
+        guild.members = [
+            make_member(mocker, guild, 3),
+            make_member(mocker, guild, 1),
+            make_member(mocker, guild, 2, roled=True),
+            make_member(mocker, guild, 4),
+        ]
+        guild.members[3].joined_at = JOINED_AT + timedelta(days=1)  # A newbie
+        bot.get_guild.side_effect = {1: guild}.get
+        return guild
+
+    @fixture
+    def members(self, guild):
+        return {member.id: member for member in guild.members}
+
+    @fixture(autouse=True)
+    def role_limiter(self, mocker, cog):
+        cog._role_limiter = mocker.Mock(acquire=mocker.CoroMock())
+
+    def add_job(self, session, **values):
+        session.add(NewbieRoleJob(guild_id=1, started_at=JOINED_AT, **values))
+        session.commit()
+
+    def get_job(self, session):
+        session.expire_all()
+        return session.query(NewbieRoleJob).get(1)
+
+    @mark.asyncio
+    async def test_run(self, mocker, cog, guild, members, session):
+        mocker.patch("cardinal.cogs.newbie.BACKFILL_BATCH_SIZE", 1)
+        members[3].add_roles.coro.side_effect = http_error(mocker)
+        self.add_job(session)
+        cog._role_jobs[1] = JOINED_AT
+
+        await cog._run_role_job(1)
+
+        members[1].add_roles.assert_called_once()
+        members[2].add_roles.assert_not_called()
+        members[4].add_roles.assert_not_called()
+        guild.default_role.edit.assert_called_once()
+        job = self.get_job(session)
+        assert (job.last_member_id, job.done, job.failed) == (3, 1, 1)
+        assert job.finished_at is not None
+        assert 1 not in cog._role_jobs
+        assert cog._backfilled_count("done") == 1
+
+    @mark.asyncio
+    async def test_resume(self, cog, guild, members, session):
+        self.add_job(session, last_member_id=1, done=1)
+
+        await cog._resume_role_jobs()
+        # Run the started job here instead of on the loop
+        await cog._role_job_tasks._loop.create_task.call_args[0][0]
+
+        members[1].add_roles.assert_not_called()
+        members[3].add_roles.assert_called_once()
+        assert self.get_job(session).done == 2
+
+    @mark.asyncio
+    async def test_onboarding_skips_covered(self, mocker, cog, guild, members):
+        cog._role_jobs[1] = JOINED_AT
+        guild_config = mocker.Mock()
+        cog._guild_config = guild_config
+        mocker.patch(
+            "cardinal.cogs.newbie._get_newbie_guilds",
+            return_value=[mocker.Mock(guild_id=1, role_id=10)],
+        )
+        cog._dm_limiter = mocker.Mock(acquire=mocker.CoroMock())
+        guild_config.snapshot.side_effect = lambda db_guild: db_guild
+        cog._flush_onboarded = mocker.CoroMock()
+
+        await cog._onboard_members()
+
+        members[1].send.assert_not_called()
+        members[4].send.assert_called()
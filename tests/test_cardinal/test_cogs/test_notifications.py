@@ -0,0 +1,186 @@
+from pytest import fixture, mark
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from cardinal.cogs.notifications import (
+    MESSAGE_LIMIT,
+    Notifications,
+    _compile,
+    _format_digest,
+)
+from cardinal.db import (
+    Base,
+    ExecutorScopedSession,
+    GuildConfigCache,
+    Notification,
+    NotificationKind,
+)
+
+
+def make_user(mocker, i):
+    user = mocker.Mock(id=i, discriminator="0001", display_name=f"user{i}")
+    user.name = f"user{i}"
+    return user
+
+
+def test_compile(mocker):
+    db_notif = mocker.Mock(channel_id=1, template="$$name ${mention}, $id and $foo")
+
+    compiled = _compile(db_notif)
+
+    assert compiled.channel_id == 1
+    assert compiled.placeholders == ("mention", "id")
+
+
+def test_format_digest(mocker):
+    users = [make_user(mocker, i) for i in range(2)]
+
+    digest = _format_digest(NotificationKind.JOIN, users)
+
+    assert digest == "2 users joined: user0#0001, user1#0001."
+
+
+def test_format_digest_truncated(mocker):
+    users = [make_user(mocker, i) for i in range(1000)]
+
+    digest = _format_digest(NotificationKind.BAN, users)
+
+    assert digest.startswith("1000 users got banned: user0#0001, ")
+    assert digest.endswith(" more.")
+    assert len(digest) <= MESSAGE_LIMIT
+
+
+@mark.asyncio
+class TestBursts:
+    @fixture
+    def channel(self, mocker):
+        channel = mocker.Mock()
+        channel.send = mocker.CoroMock()
+        return channel
+
+    @fixture
+    def guild(self, mocker, channel):
+        guild = mocker.Mock(id=1)
+        guild.get_channel.return_value = channel
+        return guild
+
+    @fixture
+    def cog(self, mocker):
+        guild_config = mocker.Mock()
+        guild_config.fetch = mocker.CoroMock(
+            return_value=_compile(mocker.Mock(channel_id=2, template="Hi $name"))
+        )
+        return Notifications(None, guild_config, mocker.Mock(), burst_threshold=2)
+
+    @fixture(autouse=True)
+    def sleep(self, mocker):
+        return mocker.patch(
+            "cardinal.cogs.notifications.sleep", new_callable=mocker.CoroMock
+        )
+
+    async def join(self, cog, guild, users):
+        for user in users:
+            await cog._process_event(NotificationKind.JOIN, guild, user)
+
+    async def test_below_threshold(self, mocker, cog, guild, channel):
+        await self.join(cog, guild, [make_user(mocker, i) for i in range(2)])
+
+        assert [call[0][0] for call in channel.send.call_args_list] == [
+            "Hi user0",
+            "Hi user1",
+        ]
+        assert len(cog._digests) == 0
+
+    async def test_digest(self, mocker, cog, guild, channel, sleep):
+        await self.join(cog, guild, [make_user(mocker, i) for i in range(5)])
+        await cog._digests._tasks[(1, NotificationKind.JOIN)]
+
+        sleep.assert_called_once_with(cog._burst_window)
+        assert [call[0][0] for call in channel.send.call_args_list] == [
+            "Hi user0",
+            "Hi user1",
+            "3 users joined: user2#0001, user3#0001, user4#0001.",
+        ]
+
+    async def test_event_during_digest(self, mocker, cog, guild, channel, sleep):
+        sent = []
+
+        async def send(content, **kwargs):
+            sent.append(content)
+            if len(sent) == 3:
+                # Arrives while the first digest is being sent
+                await self.join(cog, guild, [make_user(mocker, 5)])
+
+        channel.send = send
+        await self.join(cog, guild, [make_user(mocker, i) for i in range(5)])
+        await cog._digests._tasks[(1, NotificationKind.JOIN)]
+
+        assert sleep.call_count == 2
+        assert sent[2:] == [
+            "3 users joined: user2#0001, user3#0001, user4#0001.",
+            "1 user joined: user5#0001.",
+        ]
+        assert not cog._bursts[(1, NotificationKind.JOIN)].users
+
+    async def test_window_expired(self, mocker, cog, guild, channel):
+        now = [0.0]
+        mocker.patch("cardinal.cogs.notifications.monotonic", lambda: now[0])
+
+        await self.join(cog, guild, [make_user(mocker, i) for i in range(2)])
+        now[0] = cog._burst_window
+        await self.join(cog, guild, [make_user(mocker, 2)])
+
+        assert channel.send.call_count == 3
+        assert len(cog._digests) == 0
+
+
+@mark.asyncio
+class TestCompiledCache:
+    @fixture
+    def session_factory(self):
+        engine = create_engine("sqlite:///")
+        Base.metadata.create_all(engine)
+        return sessionmaker(bind=engine)
+
+    @fixture
+    def session(self, session_factory):
+        session = session_factory()
+        session.add(
+            Notification(
+                guild_id=1,
+                kind=NotificationKind.JOIN,
+                channel_id=2,
+                template="Hi $name",
+            )
+        )
+        session.commit()
+        yield session
+        session.close()
+
+    @fixture
+    def cog(self, session_factory, session):
+        guild_config = GuildConfigCache()
+        guild_config.install(session_factory)
+        return Notifications(None, guild_config, ExecutorScopedSession(lambda: session))
+
+    async def test_cached(self, cog):
+        first = await cog._get_compiled(1, NotificationKind.JOIN)
+        second = await cog._get_compiled(1, NotificationKind.JOIN)
+
+        assert first is second
+        assert first.placeholders == ("name",)
+
+    async def test_disabled(self, cog):
+        assert await cog._get_compiled(1, NotificationKind.BAN) is None
+
+    async def test_recompiled_on_change(self, cog, session_factory):
+        await cog._get_compiled(1, NotificationKind.JOIN)
+
+        # Any session of the factory invalidates, not only the cog's commands
+        other = session_factory()
+        other.query(Notification).get((1, NotificationKind.JOIN)).template = "Hey"
+        other.commit()
+        other.close()
+
+        compiled = await cog._get_compiled(1, NotificationKind.JOIN)
+        assert compiled.template.template == "Hey"
@@ -0,0 +1,52 @@
+from pytest import fixture, mark, raises
+
+from cardinal.cogs.whitelist import Whitelisting
+from cardinal.db import WhitelistIndex
+
+
+@fixture
+def whitelist():
+    return WhitelistIndex()
+
+
+@fixture
+def cog(mocker, whitelist):
+    return Whitelisting(mocker.Mock(), whitelist)
+
+
+@fixture
+def ctx(mocker):
+    ctx = mocker.Mock()
+    ctx.session.query.return_value.get.return_value = None
+    ctx.session.run_sync = mocker.CoroMock()
+    ctx.send = mocker.CoroMock()
+    return ctx
+
+
+@mark.asyncio
+async def test_add(cog, ctx, whitelist):
+    await Whitelisting.add.callback(cog, ctx, channel=ctx.channel)
+
+    assert ctx.channel.id in whitelist
+
+
+@mark.asyncio
+async def test_add_commit_failed(cog, ctx, whitelist):
+    ctx.session.run_sync.coro.side_effect = RuntimeError()
+
+    with raises(RuntimeError):
+        await Whitelisting.add.callback(cog, ctx, channel=ctx.channel)
+
+    assert ctx.channel.id not in whitelist
+
+
+@mark.asyncio
+async def test_remove_commit_failed(cog, ctx, whitelist):
+    whitelist.add(ctx.channel.id)
+    ctx.session.query.return_value.get.return_value = object()
+    ctx.session.run_sync.coro.side_effect = RuntimeError()
+
+    with raises(RuntimeError):
+        await Whitelisting.remove.callback(cog, ctx, channel=ctx.channel)
+
+    assert ctx.channel.id in whitelist
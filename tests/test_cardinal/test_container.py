@@ -1,4 +1,9 @@
-from cardinal.container import RootContainer, _create_engine_wrapper
+from cardinal.container import (
+    RootContainer,
+    _create_engine_wrapper,
+    _create_executor_wrapper,
+    _create_http_wrapper,
+)
 
 
 def test_create_engine_wrapper(mocker):
@@ -9,3 +14,30 @@ def test_create_engine_wrapper(mocker):
 
     assert ret is create_engine.return_value
     create_engine.assert_called_once_with(connect_string, **opts)
+
+
+def test_create_executor_wrapper_disabled():
+    assert _create_executor_wrapper(None) is None
+    assert _create_executor_wrapper(0) is None
+
+
+def test_create_executor_wrapper(mocker):
+    executor = mocker.patch("cardinal.container.ThreadPoolExecutor")
+    ret = _create_executor_wrapper(4)
+
+    assert ret is executor.return_value
+    executor.assert_called_once_with(max_workers=4, thread_name_prefix="cardinal-db")
+
+
+def test_create_http_wrapper(mocker):
+    connector = mocker.patch("cardinal.container.TCPConnector")
+    session = mocker.patch("cardinal.container.ClientSession")
+    loop = mocker.Mock()
+    ret = _create_http_wrapper(loop, {"limit_per_host": 4})
+
+    assert ret is session.return_value
+    session.assert_called_once_with(
+        connector=connector.return_value, loop=loop, raise_for_status=True
+    )
+    assert connector.call_args.kwargs["limit_per_host"] == 4
+    assert connector.call_args.kwargs["limit"] == 100
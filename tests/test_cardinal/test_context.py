@@ -8,20 +8,26 @@ def scoped_session(mocker):
     return mocker.Mock()
 
 
+@fixture
+def whitelist(mocker):
+    return mocker.Mock()
+
+
 @fixture
 def base_ctor(mocker):
     return mocker.patch("cardinal.context.BaseContext.__init__")
 
 
 @fixture
-def ctx(base_ctor, request, scoped_session):
+def ctx(base_ctor, request, scoped_session, whitelist):
     kwargs = getattr(request, "param", {})
 
-    yield Context(scoped_session, **kwargs)
+    yield Context(scoped_session, whitelist, **kwargs)
     if hasattr(request, "param"):  # Skip unnecessary assertions
         base_ctor.assert_called_once_with(**kwargs)
 
 
 @mark.parametrize(["ctx"], [({},), ({"asdf": 123},)], indirect=True)
-def test_ctor(ctx, scoped_session):
+def test_ctor(ctx, scoped_session, whitelist):
     assert ctx.session is scoped_session
+    assert ctx.whitelist is whitelist
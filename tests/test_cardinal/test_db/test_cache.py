@@ -0,0 +1,137 @@
+from pytest import fixture, mark
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from cardinal.db import (
+    Base,
+    ExecutorScopedSession,
+    GuildConfigCache,
+    MuteGuild,
+    Notification,
+    NotificationKind,
+)
+
+
+@fixture
+def session_factory():
+    engine = create_engine("sqlite:///")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@fixture
+def cache(session_factory):
+    cache = GuildConfigCache()
+    cache.register(MuteGuild)
+    cache.register(Notification)
+    cache.install(session_factory)
+    return cache
+
+
+@fixture
+def session(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def test_negative_caching(cache, mocker, session):
+    query = mocker.spy(session, "query")
+
+    assert cache.get(session, MuteGuild, 1) is None
+    assert cache.get(session, MuteGuild, 1) is None
+    query.assert_called_once_with(MuteGuild)
+
+
+def test_snapshot(cache, session):
+    session.add(MuteGuild(guild_id=1, role_id=2))
+    session.commit()
+
+    db_guild = cache.get(session, MuteGuild, 1)
+    session.close()  # Snapshot must survive its session
+
+    assert db_guild.guild_id == 1
+    assert db_guild.role_id == 2
+
+
+def test_composite_key(cache, session):
+    session.add(
+        Notification(
+            guild_id=1, kind=NotificationKind.JOIN, channel_id=2, template="hi"
+        )
+    )
+    session.commit()
+
+    assert cache.get(session, Notification, 1, NotificationKind.JOIN).template == "hi"
+    assert cache.get(session, Notification, 1, NotificationKind.LEAVE) is None
+
+
+def test_flush_invalidation(cache, session):
+    assert cache.get(session, MuteGuild, 1) is None
+
+    db_guild = MuteGuild(guild_id=1, role_id=2)
+    session.add(db_guild)
+    session.commit()
+    assert cache.get(session, MuteGuild, 1).role_id == 2
+
+    db_guild.role_id = 3
+    session.commit()
+    assert cache.get(session, MuteGuild, 1).role_id == 3
+
+    session.delete(db_guild)
+    session.commit()
+    assert cache.get(session, MuteGuild, 1) is None
+
+
+def test_bulk_invalidation(cache, session):
+    session.add(MuteGuild(guild_id=1, role_id=2))
+    session.commit()
+    assert cache.get(session, MuteGuild, 1) is not None
+
+    session.query(MuteGuild).filter_by(role_id=2).delete(synchronize_session=False)
+    session.commit()
+    assert cache.get(session, MuteGuild, 1) is None
+
+
+def test_rollback_invalidation(cache, session):
+    session.add(MuteGuild(guild_id=1, role_id=2))
+    session.flush()
+    assert cache.get(session, MuteGuild, 1) is not None  # Cached uncommitted row
+
+    session.rollback()
+    assert cache.get(session, MuteGuild, 1) is None
+
+
+def test_bulk_rollback_invalidation(cache, session):
+    session.add(MuteGuild(guild_id=1, role_id=2))
+    session.commit()
+
+    session.query(MuteGuild).delete(synchronize_session=False)
+    assert cache.get(session, MuteGuild, 1) is None
+
+    session.rollback()
+    assert cache.get(session, MuteGuild, 1) is not None
+
+
+def test_custom_loader(mocker, session):
+    cache = GuildConfigCache()
+    loader = mocker.Mock(return_value="value")
+    cache.register(MuteGuild, loader)
+
+    assert cache.get(session, MuteGuild, 1) == "value"
+    loader.assert_called_once_with(session, 1)
+
+    cache.invalidate(MuteGuild)
+    cache.get(session, MuteGuild, 1)
+    assert loader.call_count == 2
+
+
+@mark.asyncio
+async def test_fetch(cache, mocker, session):
+    scoped_session = ExecutorScopedSession(lambda: session)
+    run_sync = mocker.spy(scoped_session, "run_sync")
+
+    assert await cache.fetch(scoped_session, MuteGuild, 1) is None
+    assert await cache.fetch(scoped_session, MuteGuild, 1) is None
+    run_sync.assert_called_once()
+    assert (cache.hits, cache.misses) == (1, 1)
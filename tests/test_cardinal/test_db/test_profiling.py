@@ -0,0 +1,87 @@
+import logging
+
+from pytest import fixture, raises
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from cardinal.db import QueryProfiler
+from cardinal.db.profiling import _START_KEY
+from cardinal.metrics import Metrics
+
+
+@fixture
+def metrics():
+    return Metrics()
+
+
+@fixture
+def engine():
+    return create_engine("sqlite:///")
+
+
+@fixture
+def profiler(engine, metrics, request):
+    profiler = QueryProfiler(metrics, getattr(request, "param", None))
+    profiler.install(engine)
+    return profiler
+
+
+def execute(engine, times=1):
+    with engine.connect() as conn:
+        for _ in range(times):
+            conn.exec_driver_sql("SELECT 1")
+
+
+def test_track(engine, metrics, profiler):
+    with profiler.track("command", 1, command="test") as stats:
+        execute(engine, 3)
+
+    assert stats.count == 3
+    assert stats.duration > 0
+
+    key = (("command", "test"),)
+    assert metrics.histograms("cardinal_command_queries")[key].sum == 3
+    assert metrics.histograms("cardinal_command_db_seconds")[key].count == 1
+
+
+def test_nested(engine, profiler):
+    with profiler.track("event", 1, event="on_message") as outer:
+        execute(engine)
+        with profiler.track("command", 2, command="test") as inner:
+            execute(engine, 2)
+
+    assert inner.count == 2
+    assert outer.count == 3
+
+
+def test_no_queries(metrics, profiler):
+    with profiler.track("event", 1, event="on_typing"):
+        pass
+
+    key = (("event", "on_typing"),)
+    assert metrics.histograms("cardinal_event_queries")[key].sum == 0
+    assert key not in metrics.histograms("cardinal_event_db_seconds")
+
+
+def test_failed_statement(engine, profiler):
+    with engine.connect() as conn:
+        with raises(OperationalError):
+            conn.exec_driver_sql("SELECT * FROM missing")
+
+        assert not conn.info[_START_KEY]
+
+
+def test_untracked(engine, profiler):
+    execute(engine)  # Must not fail outside of any scope
+
+
+def test_slow_query_log(caplog, engine, metrics):
+    profiler = QueryProfiler(metrics, slow_threshold=0)
+    profiler.install(engine)
+
+    with caplog.at_level(logging.WARNING, logger="cardinal.db.profiling"):
+        with profiler.track("command", 123, command="test"):
+            execute(engine)
+
+    assert "SELECT 1" in caplog.text
+    assert "command #123" in caplog.text
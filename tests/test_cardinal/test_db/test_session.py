@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from threading import get_ident
+
+from pytest import fixture, mark
+
+from cardinal.db import ExecutorScopedSession
+
+_var = ContextVar("_var")
+
+
+@fixture
+def scoped_session(mocker):
+    return mocker.Mock()
+
+
+@fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_forwarding(scoped_session):
+    session = ExecutorScopedSession(scoped_session)
+
+    assert session.registry is scoped_session.registry
+    assert session() is scoped_session.return_value
+    assert not session.is_async
+
+
+@mark.asyncio
+class TestRunSync:
+    async def test_inline(self, mocker, scoped_session):
+        session = ExecutorScopedSession(scoped_session)
+        fn = mocker.Mock()
+
+        ret = await session.run_sync(fn, 1, a=2)
+
+        assert ret is fn.return_value
+        fn.assert_called_once_with(scoped_session.return_value, 1, a=2)
+
+    async def test_executor(self, executor, scoped_session):
+        session = ExecutorScopedSession(scoped_session, executor)
+        assert session.is_async
+
+        def fn(inner_session):
+            assert inner_session is scoped_session.return_value
+            return get_ident()
+
+        assert await session.run_sync(fn) != get_ident()
+
+    async def test_executor_context(self, executor, scoped_session):
+        session = ExecutorScopedSession(scoped_session, executor)
+        _var.set(123)
+
+        assert await session.run_in_executor(_var.get) == 123
@@ -0,0 +1,80 @@
+from pytest import fixture
+
+from cardinal.metrics import Histogram, Metrics
+
+
+class TestHistogram:
+    @fixture
+    def histogram(self):
+        return Histogram((0.1, 1.0))
+
+    def test_observe(self, histogram):
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.buckets == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == 2.65
+        assert list(histogram.cumulative()) == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+
+    def test_quantile(self, histogram):
+        assert histogram.mean == 0.0
+
+        for value in (0.05, 0.05, 0.05, 0.5):
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(1.0) == 1.0
+
+        histogram.observe(5.0)
+        assert histogram.quantile(1.0) == float("inf")
+
+
+class TestMetrics:
+    @fixture
+    def metrics(self):
+        return Metrics(buckets=(1.0,), max_series=2)
+
+    def test_max_series(self, metrics):
+        metrics.observe("a", 0.5, x=1)
+        metrics.observe("a", 0.5, x=2)
+        metrics.observe("a", 0.5, x=3)
+        metrics.observe("a", 0.5, x=1)
+
+        histograms = metrics.histograms("a")
+        assert list(histograms) == [(("x", 1),), (("x", 2),)]
+        assert histograms[(("x", 1),)].count == 2
+
+    def test_time(self, metrics):
+        with metrics.time("a", x=1):
+            pass
+
+        assert metrics.histograms("a")[(("x", 1),)].count == 1
+
+    def test_render(self, metrics):
+        metrics.register(
+            "things_total", "counter", lambda: [({"kind": 'a"b'}, 3)], "Things."
+        )
+        metrics.describe("latency_seconds", "Latency.")
+        metrics.observe("latency_seconds", 0.5, op="x")
+        metrics.observe("latency_seconds", 1.5, op="x")
+
+        assert metrics.render().splitlines() == [
+            "# HELP things_total Things.",
+            "# TYPE things_total counter",
+            'things_total{kind="a\\"b"} 3',
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{op="x",le="1.0"} 1',
+            'latency_seconds_bucket{op="x",le="+Inf"} 2',
+            'latency_seconds_sum{op="x"} 2.0',
+            'latency_seconds_count{op="x"} 2',
+        ]
+
+    def test_describe_buckets(self, metrics):
+        metrics.describe("count", "Count.", buckets=(1, 2))
+        metrics.observe("count", 2)
+        metrics.observe("other", 2)
+
+        assert metrics.histograms("count")[()].bounds == (1, 2)
+        assert metrics.histograms("other")[()].bounds == (1.0,)
@@ -0,0 +1,93 @@
+from discord import Member
+from discord.utils import SnowflakeList
+from pytest import fixture, mark
+
+from cardinal.role_counts import RoleCounts
+
+
+def make_member(mocker, guild, *role_ids):
+    return mocker.Mock(guild=guild, _roles=SnowflakeList(role_ids))
+
+
+@fixture
+def guild(mocker):
+    guild = mocker.Mock(id=1)
+    guild.members = [
+        make_member(mocker, guild, 10, 20),
+        make_member(mocker, guild, 20),
+        make_member(mocker, guild),
+    ]
+    return guild
+
+
+@fixture
+def counts(mocker, guild):
+    counts = RoleCounts()
+    counts.install(mocker.Mock(guilds=[guild]))
+    return counts
+
+
+def test_member_roles_compat(mocker):
+    # Counting relies on the private Member._roles, make sure discord.py provides it
+    guild = mocker.Mock(id=1)
+    member = Member(
+        data={
+            "user": {"id": "1", "username": "user", "discriminator": "0001"},
+            "roles": ["20", "10"],
+            "joined_at": None,
+        },
+        guild=guild,
+        state=mocker.Mock(),
+    )
+    guild.members = [member]
+
+    assert RoleCounts().count(guild, 10) == 1
+
+
+def test_install(mocker):
+    bot = mocker.Mock()
+    counts = RoleCounts()
+
+    counts.install(bot)
+
+    bot.add_listener.assert_any_call(counts.on_member_update)
+
+
+def test_count_lazy(counts, guild):
+    assert counts.count(guild, 20) == 2
+    assert counts.count(guild, 10) == 1
+    assert counts.count(guild, 30) == 0
+
+
+@mark.asyncio
+async def test_ready(counts, guild):
+    await counts.on_ready()
+    guild.members = []  # Counts are not rebuilt
+
+    assert counts.count(guild, 20) == 2
+
+
+@mark.asyncio
+async def test_updates(mocker, counts, guild):
+    await counts.on_ready()
+
+    before = guild.members[1]
+    after = make_member(mocker, guild, 10)
+    await counts.on_member_update(before, after)
+    assert (counts.count(guild, 10), counts.count(guild, 20)) == (2, 1)
+
+    await counts.on_member_join(make_member(mocker, guild, 20))
+    assert counts.count(guild, 20) == 2
+
+    await counts.on_member_remove(guild.members[0])
+    assert (counts.count(guild, 10), counts.count(guild, 20)) == (1, 1)
+
+
+@mark.asyncio
+async def test_guild_available_recounts(mocker, counts, guild):
+    await counts.on_ready()
+    guild.members.append(make_member(mocker, guild, 10))
+
+    await counts.on_guild_available(guild)
+
+    assert counts.count(guild, 10) == 2
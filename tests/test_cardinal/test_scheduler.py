@@ -0,0 +1,172 @@
+from asyncio import Event, sleep
+from datetime import datetime, timedelta
+
+from pytest import fixture, mark
+
+from cardinal.scheduler import DeadlineScheduler, TaskRegistry
+
+EPOCH = datetime(2020, 1, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = EPOCH
+
+    def __call__(self):
+        return self.now
+
+
+def at(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+@fixture
+def clock():
+    return FakeClock()
+
+
+@fixture
+def loop(mocker):
+    return mocker.Mock()
+
+
+@fixture
+def callback(mocker):
+    return mocker.Mock()
+
+
+@fixture
+def scheduler(callback, clock, loop):
+    return DeadlineScheduler(callback, loop, clock)
+
+
+def test_run_due(callback, clock, scheduler):
+    scheduler.schedule("b", at(20))
+    scheduler.schedule("a", at(10))
+
+    assert scheduler.run_due() == 0
+    clock.now = at(15)
+    assert scheduler.run_due() == 1
+
+    callback.assert_called_once_with("a")
+    assert "a" not in scheduler
+    assert scheduler.deadline("b") == at(20)
+
+
+def test_reschedule(callback, clock, scheduler):
+    scheduler.schedule("a", at(10))
+    scheduler.schedule("a", at(30))
+    clock.now = at(20)
+
+    assert scheduler.run_due() == 0
+    assert len(scheduler) == 1
+
+    clock.now = at(30)
+    assert scheduler.run_due() == 1
+    callback.assert_called_once_with("a")
+
+
+def test_cancel(callback, clock, scheduler):
+    scheduler.schedule("a", at(10))
+
+    assert scheduler.cancel("a")
+    assert not scheduler.cancel("a")
+
+    clock.now = at(10)
+    assert scheduler.run_due() == 0
+    callback.assert_not_called()
+
+
+def test_items(scheduler):
+    scheduler.schedule("b", at(20))
+    scheduler.schedule("a", at(10))
+
+    assert scheduler.items() == [("a", at(10)), ("b", at(20))]
+
+
+def test_timer(loop, scheduler):
+    scheduler.schedule("b", at(20))
+    loop.call_later.assert_called_once_with(20, scheduler.run_due)
+
+    # Later deadlines keep the timer
+    scheduler.schedule("c", at(30))
+    assert loop.call_later.call_count == 1
+
+    scheduler.schedule("a", at(10))
+    loop.call_later.return_value.cancel.assert_called_once_with()
+    loop.call_later.assert_called_with(10, scheduler.run_due)
+
+
+def test_timer_disarmed(loop, scheduler):
+    scheduler.schedule("a", at(10))
+    scheduler.cancel("a")
+
+    loop.call_later.return_value.cancel.assert_called_once_with()
+
+
+def test_callback_error(callback, clock, scheduler):
+    callback.side_effect = [ValueError, None]
+    scheduler.schedule("a", at(10))
+    scheduler.schedule("b", at(10))
+    clock.now = at(10)
+
+    assert scheduler.run_due() == 2
+    assert callback.call_count == 2
+
+
+def test_compaction(scheduler):
+    for i in range(1000):
+        scheduler.schedule("a", at(i + 1))
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < 100
+
+
+@mark.asyncio
+class TestTaskRegistry:
+    @fixture
+    def registry(self):
+        return TaskRegistry()
+
+    async def test_dedupe(self, registry):
+        event = Event()
+        calls = []
+
+        async def work(i):
+            calls.append(i)
+            await event.wait()
+
+        first = registry.start("a", work(1))
+        assert registry.start("a", work(2)) is first
+        await sleep(0)
+        event.set()
+        await first
+
+        assert calls == [1]
+        assert "a" not in registry
+
+    async def test_restart_finished(self, registry):
+        first = registry.start("a", sleep(0))
+        await first
+
+        # Done, but not forgotten yet
+        second = registry.start("a", sleep(0))
+        assert second is not first
+        await second
+
+    async def test_replace(self, registry):
+        first = registry.start("a", sleep(10))
+        second = registry.start("a", sleep(0), replace=True)
+        await second
+        await sleep(0)
+
+        assert first.cancelled()
+        assert len(registry) == 0
+
+    async def test_cancel(self, registry):
+        task = registry.start("a", sleep(10))
+
+        assert registry.cancel("a")
+        assert not registry.cancel("a")
+        await sleep(0)
+        assert task.cancelled()
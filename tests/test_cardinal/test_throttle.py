@@ -0,0 +1,99 @@
+from asyncio import sleep as real_sleep
+
+from discord import Forbidden, HTTPException
+from pytest import approx, fixture, mark, raises
+
+from cardinal.throttle import BulkProgress, RateLimiter, run_bulk
+
+
+def http_error(mocker, status, cls=HTTPException):
+    response = mocker.Mock(status=status, reason="reason")
+    return cls(response, "message")
+
+
+@fixture
+def sleep(mocker):
+    return mocker.patch("cardinal.throttle.sleep", new_callable=mocker.CoroMock)
+
+
+def test_rate_limiter_invalid():
+    with raises(ValueError):
+        RateLimiter(0)
+
+
+@mark.asyncio
+async def test_rate_limiter(sleep):
+    limiter = RateLimiter(10, clock=lambda: 100.0)
+
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert [call[0][0] for call in sleep.call_args_list] == approx([0.1, 0.2])
+
+
+def test_progress():
+    now = [0.0]
+    progress = BulkProgress(clock=lambda: now[0])
+    progress.total = 4
+    progress.done = 2
+    progress.add_error("item", ValueError())
+    now[0] = 2.0
+
+    assert progress.remaining == 1
+    assert progress.rate == 1.5
+    assert progress.errors[0][0] == "item"
+    assert str(progress) == "2/4 done, 1 failed in 2.0s (1.5/s)"
+
+
+@mark.asyncio
+class TestRunBulk:
+    async def test_concurrency(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fn(item):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await real_sleep(0)
+            in_flight -= 1
+
+        progress = await run_bulk(fn, range(20), concurrency=3)
+
+        assert max_in_flight == 3
+        assert (progress.total, progress.done, progress.failed) == (20, 20, 0)
+
+    async def test_retry_transient(self, mocker, sleep):
+        fn = mocker.CoroMock(side_effect=[http_error(mocker, 429), None])
+
+        progress = await run_bulk(fn, ["a"], backoff=2)
+
+        assert fn.call_count == 2
+        sleep.assert_called_once_with(2)
+        assert progress.done == 1
+
+    async def test_retries_exhausted(self, mocker, sleep):
+        fn = mocker.CoroMock(side_effect=http_error(mocker, 502))
+
+        progress = await run_bulk(fn, ["a"], retries=2)
+
+        assert fn.call_count == 3
+        assert progress.failed == 1
+
+    async def test_permanent_failure(self, mocker, sleep):
+        error = http_error(mocker, 403, Forbidden)
+        fn = mocker.CoroMock(side_effect=[error, None])
+
+        progress = await run_bulk(fn, ["a", "b"])
+
+        sleep.assert_not_called()
+        assert (progress.done, progress.failed) == (1, 1)
+        assert progress.errors == [("a", error)]
+
+    async def test_limiter(self, mocker):
+        limiter = mocker.Mock()
+        limiter.acquire = mocker.CoroMock()
+
+        await run_bulk(mocker.CoroMock(), range(3), limiter=limiter)
+
+        assert limiter.acquire.call_count == 3
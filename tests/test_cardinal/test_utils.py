@@ -2,11 +2,11 @@ import logging
 from asyncio import TimeoutError
 from unittest import mock
 
-from discord import HTTPException
+from discord import HTTPException, Member
 from pytest import fixture, mark, raises
 
 from cardinal.errors import PromptTimeout
-from cardinal.utils import clean_prefix, format_message, maybe_send, prompt
+from cardinal.utils import clean_prefix, format_message, has_role, maybe_send, prompt
 
 
 class TestFormatMessage:
@@ -217,3 +217,19 @@ class TestMaybeSend:
 
         assert msg is None
         assert caplog.records != []
+
+
+def test_has_role_compat():
+    # Relies on the private Member._roles, make sure discord.py still provides it
+    member = Member(
+        data={
+            "user": {"id": "1", "username": "user", "discriminator": "0001"},
+            "roles": ["3", "1"],
+            "joined_at": None,
+        },
+        guild=mock.Mock(),
+        state=mock.Mock(),
+    )
+
+    assert has_role(member, 3)
+    assert not has_role(member, 2)